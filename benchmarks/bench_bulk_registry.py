@@ -0,0 +1,146 @@
+"""
+Benchmark: per-profile versus bulk registry export and import
+
+Generates a synthetic install (see benchmarks.synthetic_install) with
+many profiles and exports the key of every profile, once profile by
+profile and once as a single export of the profiles key split into
+per-profile .reg files. The .reg files are then imported again, one
+import per profile and all merged into one import. Each pass opens a
+fresh registry backend and session. With the 'wine' backend, every
+import rewrites user.reg, so a merged import writes it only once.
+
+The bulk export has to produce the same files byte for byte, otherwise
+the benchmark fails (exit code 1).
+
+Usage:
+    python -m benchmarks.bench_bulk_registry [--profiles 100]
+        [--repeat 5] [--backend file|wine]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from benchmarks.bench_discovery import CONFIG
+from benchmarks.bench_discovery import write_user_reg
+from benchmarks.synthetic_install import generate_install
+from modules.registry_operation.reg_file import dump_reg
+from modules.registry_operation.reg_file import export_keys
+from modules.registry_operation.reg_file import export_profiles
+from modules.registry_operation.reg_file import import_keys
+from modules.registry_operation.reg_file import import_payloads
+from modules.registry_operation.reg_file import parse_reg
+from modules.registry_operation.registry_session import RegistrySession
+from modules.registry_operation.registry_session import open_backend
+
+
+def export_each(session, profiles_key, profiles):
+    """
+    Returns:
+        dict: .reg file of each profile, exported one by one
+    """
+    return {
+        profile: dump_reg(export_keys(session, profiles_key + "\\" + profile))
+        for profile in profiles
+    }
+
+
+def import_each(session, payloads):
+    """
+    Imports the .reg file of each profile on its own.
+    """
+    for reg_data in payloads:
+        import_keys(session, parse_reg(reg_data))
+
+
+def time_pass(function, backend, registry_file, repeat):
+    """
+    Params:
+        function (function): Called with a fresh session
+
+    Returns:
+        tuple: Result of the last call and average time in milliseconds
+    """
+    elapsed = 0
+    for _ in range(repeat):
+        session = RegistrySession(open_backend(backend, registry_file))
+        start = time.perf_counter()
+        result = function(session)
+        elapsed += time.perf_counter() - start
+        session.close()
+
+    return result, elapsed / repeat * 1000
+
+
+def main():
+    """
+    Parses the arguments, checks the bulk export and times both paths.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--backend", choices=("file", "wine"),
+                        default="file")
+    args = parser.parse_args()
+
+    with open(CONFIG, encoding="UTF-8") as json_file:
+        conf = json.load(json_file)
+    profiles_key = (
+        conf["reg_hive"] + "\\" + conf["profiles"][0] + conf["profiles"][1])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        install = generate_install(
+            os.path.join(temp_dir, "install"), args.profiles, 1, 1, 0, 1)
+        registry_file = install["registry_file"]
+        if args.backend == "wine":
+            registry_file = os.path.join(temp_dir, "user.reg")
+            write_user_reg(install["registry_file"], registry_file)
+
+        each, each_export_ms = time_pass(
+            lambda session: export_each(
+                session, profiles_key, install["profiles"]),
+            args.backend, registry_file, args.repeat)
+        bulk, bulk_export_ms = time_pass(
+            lambda session: export_profiles(session, profiles_key),
+            args.backend, registry_file, args.repeat)
+
+        payloads = list(bulk.values())
+        _, each_import_ms = time_pass(
+            lambda session: import_each(session, payloads),
+            args.backend, registry_file, args.repeat)
+        _, bulk_import_ms = time_pass(
+            lambda session: import_payloads(session, payloads),
+            args.backend, registry_file, args.repeat)
+
+    identical = each == bulk
+    print(f"{args.backend} backend, {len(bulk)} profiles, "
+          f"bulk export identical={identical}")
+    print(f"    export each {each_export_ms:.3f}ms  "
+          f"bulk {bulk_export_ms:.3f}ms")
+    print(f"    import each {each_import_ms:.3f}ms  "
+          f"merged {bulk_import_ms:.3f}ms")
+
+    if not identical:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
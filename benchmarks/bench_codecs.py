@@ -0,0 +1,101 @@
+"""
+Benchmark: throughput and ratio of the archive codecs
+
+Archives a synthetic profile with every codec of the registry and
+restores it again with UnzipBackup.
+
+Usage:
+    python -m benchmarks.bench_codecs [--mind-mb 100] [--files 200]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from benchmarks.bench_stream_backup import MIND, PHYSIQUE, PROFILE
+from benchmarks.bench_stream_backup import generate_profile
+from modules.zip_operation.archive_codecs import CODECS
+from modules.zip_operation.unzip_files import UnzipBackup
+from modules.zip_operation.zip_backup import ZipBackup
+
+
+def main():
+    """
+    Parses the arguments and runs every codec.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mind-mb", type=int, default=100)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_profile(work_dir, args.mind_mb, args.files)
+        sources = [
+            (paths["profile_dir"], PROFILE),
+            (paths["mind"], MIND),
+            (paths["physique"], PHYSIQUE)
+        ]
+        total = sum(
+            os.path.getsize(os.path.join(root, file))
+            for root, _, files in os.walk(paths["profile_dir"])
+            for file in files
+        ) + os.path.getsize(paths["mind"]) + os.path.getsize(
+            paths["physique"])
+
+        print(f"{'codec':<12} {'ratio':>6} {'backup':>12} {'restore':>12}")
+        for codec in CODECS:
+            out_dir = os.path.join(work_dir, "out")
+            restore_dir = os.path.join(work_dir, "restore")
+            os.makedirs(out_dir)
+            os.makedirs(restore_dir)
+
+            zip_backup = ZipBackup()
+            zip_backup.set_data(None, PROFILE, out_dir, None)
+            zip_backup.set_codec(codec)
+            zip_backup.set_workers(args.workers)
+            zip_backup.set_sources(sources)
+
+            start = time.perf_counter()
+            zip_backup.zip_backup()
+            backup_time = time.perf_counter() - start
+            backup_file = zip_backup.get_backup_file()
+
+            unzip_backup = UnzipBackup()
+            unzip_backup.set_data(
+                backup_file, restore_dir, "backup_info.json")
+
+            start = time.perf_counter()
+            unzip_backup.unzip_backup()
+            restore_time = time.perf_counter() - start
+
+            ratio = os.path.getsize(backup_file) / total
+            print(
+                f"{codec:<12} {ratio:>6.3f} "
+                f"{total / 2**20 / backup_time:>8.1f}MB/s "
+                f"{total / 2**20 / restore_time:>8.1f}MB/s"
+            )
+
+            shutil.rmtree(out_dir)
+            shutil.rmtree(restore_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Benchmark: copy engine versus shutil
+
+Copies a profile of many small files and a single huge creature mind
+file with shutil.copytree/copy2 and with the copy engine, once with
+each copy method on its own and once with the automatic fallback and
+a thread pool. Methods the filesystem does not support are reported
+as such.
+
+Usage:
+    python -m benchmarks.bench_copy [--files 5000] [--file-kb 8]
+        [--mind-mb 512] [--workers 0] [--dir DIR]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from benchmarks.bench_stream_backup import write_synthetic_file
+from modules.file_operation import copy_engine
+
+
+def generate_files(root, files, file_kb, mind_mb):
+    """
+    Generates the small profile files and the huge mind file.
+
+    Returns:
+        tuple: Profile directory and mind file
+    """
+    profile_dir = os.path.join(root, "profile")
+    for index in range(files):
+        sub_dir = os.path.join(profile_dir, f"land{index % 16}")
+        os.makedirs(sub_dir, exist_ok=True)
+        write_synthetic_file(
+            os.path.join(sub_dir, f"save{index}.sav"), file_kb * 1024)
+
+    mind_file = os.path.join(root, "mind.chl")
+    write_synthetic_file(mind_file, mind_mb * 1024 * 1024)
+
+    return profile_dir, mind_file
+
+
+def run(label, copy, target, size, files):
+    """
+    Times a copy and prints its throughput.
+    """
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    elif os.path.exists(target):
+        os.remove(target)
+
+    start = time.perf_counter()
+    try:
+        detail = copy()
+    except OSError as e:
+        print(f"  {label:<34} unsupported ({e.strerror or e})")
+        return
+    seconds = time.perf_counter() - start
+
+    if isinstance(detail, dict):
+        detail = ", ".join(f"{key} {value}" for key, value in detail.items())
+    print(f"  {label:<34}{seconds:>8.3f}s {size / 2**20 / seconds:>9.1f} MB/s "
+          f"{files / seconds:>9.0f} files/s  {detail or ''}")
+
+
+def main():
+    """
+    Parses the arguments and runs the copies.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--file-kb", type=int, default=8)
+    parser.add_argument("--mind-mb", type=int, default=512)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument(
+        "--dir", help="directory on the filesystem to test "
+                      "(default: the temporary directory)")
+    args = parser.parse_args()
+    workers = args.workers or os.cpu_count() or 1
+
+    with tempfile.TemporaryDirectory(dir=args.dir) as work_dir:
+        profile_dir, mind_file = generate_files(
+            work_dir, args.files, args.file_kb, args.mind_mb)
+        profile_copy = os.path.join(work_dir, "profile_copy")
+        mind_copy = os.path.join(work_dir, "mind_copy.chl")
+        profile_size = args.files * args.file_kb * 1024
+        mind_size = args.mind_mb * 1024 * 1024
+
+        print(f"{args.files} files of {args.file_kb} KB:")
+        run("shutil.copytree",
+            lambda: shutil.copytree(profile_dir, profile_copy) and None,
+            profile_copy, profile_size, args.files)
+        for method in copy_engine.METHODS:
+            run(f"engine {method}, 1 worker",
+                lambda: dict(copy_engine.copy_tree(
+                    profile_dir, profile_copy, 1, (method,))),
+                profile_copy, profile_size, args.files)
+        run("engine automatic, 1 worker",
+            lambda: dict(copy_engine.copy_tree(
+                profile_dir, profile_copy, 1)),
+            profile_copy, profile_size, args.files)
+        run(f"engine automatic, {workers} workers",
+            lambda: dict(copy_engine.copy_tree(
+                profile_dir, profile_copy, workers)),
+            profile_copy, profile_size, args.files)
+
+        print(f"One file of {args.mind_mb} MB:")
+        run("shutil.copy2",
+            lambda: shutil.copy2(mind_file, mind_copy) and None,
+            mind_copy, mind_size, 1)
+        for method in copy_engine.METHODS:
+            run(f"engine {method}",
+                lambda: copy_engine.copy_file(
+                    mind_file, mind_copy, (method,)),
+                mind_copy, mind_size, 1)
+        run("engine automatic",
+            lambda: copy_engine.copy_file(mind_file, mind_copy),
+            mind_copy, mind_size, 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Benchmark: registry discovery with a cold and a warm discovery cache
+
+Generates a synthetic install (see benchmarks.synthetic_install) with
+many profiles and times what every run does before a backup: locating
+the game and desktop directory and reading the profile table. Each run
+opens a fresh registry backend and session like a new process. Cold
+runs start without cache file, warm runs use the file saved by the
+run before. The 'wine' backend reads the same keys from a user.reg
+file instead of the JSON file of the 'file' backend.
+
+Usage:
+    python -m benchmarks.bench_discovery [--profiles 200] [--repeat 20]
+        [--backend file|wine]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+from benchmarks.synthetic_install import generate_install
+from modules.registry_operation.discovery_cache import DiscoveryCache
+from modules.registry_operation.file_registry import decode_value
+from modules.registry_operation.locate_dir import LocateDir
+from modules.registry_operation.read_profiles import ReadProfiles
+from modules.registry_operation.registry_session import RegistrySession
+from modules.registry_operation.registry_session import open_backend
+from modules.registry_operation.wine_registry import WineRegistry
+
+CONFIG = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "../data/config.json")
+
+
+def write_user_reg(registry_file, reg_file):
+    """
+    Writes the keys of a 'file' backend registry to a Wine user.reg.
+    """
+    with open(reg_file, "w", encoding="UTF-8") as user_reg:
+        user_reg.write("WINE REGISTRY Version 2\n\n#arch=win32\n\n")
+
+    wine = WineRegistry(reg_file)
+    with open(registry_file, encoding="UTF-8") as json_file:
+        tree = json.load(json_file)
+    for entry in tree.values():
+        _, _, path = entry["name"].partition("\\")
+        if not path:
+            continue
+        key = wine.CreateKey(wine.HKEY_CURRENT_USER, path)
+        for name, value in entry["values"].items():
+            data, value_type = decode_value(value)
+            wine.SetValueEx(key, name, 0, value_type, data)
+    wine.FlushKey(wine.HKEY_CURRENT_USER)
+
+
+def discover(conf, backend, registry_file, cache_file):
+    """
+    Runs the discovery like a new run of the tool.
+
+    Returns:
+        int: Number of profiles found
+    """
+    session = RegistrySession(open_backend(backend, registry_file))
+    cache = DiscoveryCache(cache_file, f"{backend}:{registry_file}")
+
+    for reg_path in (conf["game_dir"], conf["desktop_dir"]):
+        located_dir = LocateDir()
+        located_dir.set_data(conf["reg_hive"], reg_path)
+        located_dir.set_session(session)
+        located_dir.set_cache(cache)
+        if not located_dir.locate_dir()["success"]:
+            raise ValueError(f"{reg_path} not found")
+
+    profile_list = ReadProfiles()
+    profile_list.set_data(conf["reg_hive"], conf["profiles"], None)
+    profile_list.set_session(session)
+    profile_list.set_cache(cache)
+    if not profile_list.read_profiles()["success"]:
+        raise ValueError("No profiles found")
+
+    cache.save()
+    session.close()
+    return len(profile_list.get_profile_table())
+
+
+def time_runs(function, repeat):
+    """
+    Returns:
+        float: Average time of a run in milliseconds
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    """
+    Parses the arguments and times cold and warm discovery runs.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--backend", choices=("file", "wine"),
+                        default="file")
+    args = parser.parse_args()
+
+    with open(CONFIG, encoding="UTF-8") as json_file:
+        conf = json.load(json_file)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        install = generate_install(
+            os.path.join(temp_dir, "install"), args.profiles, 1, 1, 0, 1)
+        registry_file = install["registry_file"]
+        if args.backend == "wine":
+            registry_file = os.path.join(temp_dir, "user.reg")
+            write_user_reg(install["registry_file"], registry_file)
+        cache_file = os.path.join(temp_dir, "discovery_cache.json")
+
+        def cold():
+            if os.path.exists(cache_file):
+                os.remove(cache_file)
+            return discover(conf, args.backend, registry_file, cache_file)
+
+        def warm():
+            return discover(conf, args.backend, registry_file, cache_file)
+
+        found = cold()
+        cold_ms = time_runs(cold, args.repeat)
+        warm()
+        warm_ms = time_runs(warm, args.repeat)
+
+    print(f"{args.backend} backend, {found} profiles")
+    print(f"    cold {cold_ms:.3f}ms  warm {warm_ms:.3f}ms  "
+          f"({cold_ms / warm_ms:.1f}x)")
+
+    if found != args.profiles:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
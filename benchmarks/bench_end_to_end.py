@@ -0,0 +1,310 @@
+"""
+Benchmark: complete backup and restore runs on a synthetic install
+
+Generates a synthetic install (see benchmarks.synthetic_install), then
+backs up and restores every profile through StartBackup.start_backup
+and StartRestore.start_restore, each phase in a fresh process. The
+Windows registry is replaced by the 'file' registry backend.
+
+Reported per phase: time, MB/s, files/s, peak RSS, high-water mark of
+the temporary directory and the time of every pipeline step. The
+results are written as JSON and compared against a stored baseline,
+slower runs or higher memory and temp space than the baseline plus the
+tolerance are reported as regressions (exit code 1).
+
+Usage:
+    python -m benchmarks.bench_end_to_end [--profiles 4] [--files 200]
+        [--file-kb 64] [--mind-mb 50] [--physique-kb 256]
+        [--output bench_end_to_end.json] [--baseline FILE]
+        [--save-baseline] [--tolerance 0.15]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import functools
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.synthetic_install import generate_install
+from classes.combine_loaded_files import CombineLoadedFiles
+from classes.start_backup import StartBackup
+from classes.start_restore import StartRestore
+
+BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline_end_to_end.json")
+
+# Pipeline stages whose time is reported, as (module, class, method)
+STEPS = {
+    "backup": [
+        ("classes.backup.gather_backup_data", "GatherBackupData",
+         "gather_data"),
+        ("classes.backup.create_backup", "CreateBackup", "create_backup")
+    ],
+    "restore": [
+        ("modules.file_operation.create_temp_dir", "CreateTempDir",
+         "create_temp_dir"),
+        ("classes.restore.gather_restore_data", "GatherRestoreData",
+         "gather_data"),
+        ("classes.restore.profile_exists_check", "ProfileExistsCheck",
+         "exists_check"),
+        ("classes.restore.delete_old_files", "DeleteOldFiles",
+         "delete_files"),
+        ("classes.restore.restore_backup", "RestoreBackup",
+         "restore_backup"),
+        ("modules.file_operation.delete_temp_dir", "DeleteTempDir",
+         "delete_temp_dir")
+    ]
+}
+
+# Metrics where a higher value than the baseline is a regression
+COMPARED = ("seconds", "peak_rss_mb", "temp_hwm_mb")
+
+
+def directory_size(path):
+    """
+    Returns:
+        int: Size of all files below 'path'
+    """
+    size = 0
+    for root, _, files in os.walk(path):
+        for file in files:
+            try:
+                size += os.path.getsize(os.path.join(root, file))
+            except OSError:
+                pass
+    return size
+
+
+class TempSampler(threading.Thread):
+    """
+    Samples the size of the temporary directory
+    """
+
+    def __init__(self, temp_root):
+        super().__init__(daemon=True)
+        self.temp_root = temp_root
+        self.high_water = 0
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(0.02):
+            self.high_water = max(
+                self.high_water, directory_size(self.temp_root))
+
+    def stop(self):
+        """
+        Stops sampling after a last sample.
+        """
+        self.stopped.set()
+        self.join()
+        self.high_water = max(
+            self.high_water, directory_size(self.temp_root))
+
+
+def instrument(phase, timings):
+    """
+    Wraps the pipeline stages of a phase to add up their time.
+    """
+    for module_name, class_name, method_name in STEPS[phase]:
+        cls = getattr(__import__(module_name, fromlist=[class_name]),
+                      class_name)
+        method = getattr(cls, method_name)
+
+        @functools.wraps(method)
+        def timed(self, *args, __method=method,
+                  __name=f"{class_name}.{method_name}", **kwargs):
+            start = time.perf_counter()
+            try:
+                return __method(self, *args, **kwargs)
+            finally:
+                timings[__name] = timings.get(__name, 0.0) + \
+                    time.perf_counter() - start
+
+        setattr(cls, method_name, timed)
+
+
+def run_phase(phase, install, queue):
+    """
+    Runs one phase for every profile, in its own process so its
+    peak RSS is measured on its own.
+    """
+    os.environ["tmp"] = install["temp_root"]
+
+    timings = {}
+    instrument(phase, timings)
+
+    load_files = CombineLoadedFiles()
+    load_files.set_registry("file", install["registry_file"])
+    load_files.combine_files()
+    data_files = load_files.get_files()
+    data_files.conf["catalog_file"] = os.path.join(
+        os.path.dirname(install["registry_file"]), "catalog.sqlite3")
+
+    extension = ".zip" if data_files.conf["codec"].startswith("zip") \
+        else "." + data_files.conf["codec"]
+
+    sampler = TempSampler(install["temp_root"])
+    sampler.start()
+    success = True
+    start = time.perf_counter()
+
+    # The tool's own output would drown the report
+    with open(os.devnull, "w", encoding="UTF-8") as devnull:
+        stdout, sys.stdout = sys.stdout, devnull
+        try:
+            for profile in install["profiles"]:
+                data_files.opts = {
+                    "profile": profile,
+                    "archive": os.path.join(
+                        install["desktop_dir"], profile + extension),
+                    "overwrite": True
+                }
+                if phase == "backup":
+                    starter = StartBackup()
+                    starter.set_data(data_files)
+                    result = starter.start_backup()
+                else:
+                    starter = StartRestore()
+                    starter.set_data(data_files)
+                    result = starter.start_restore()
+                success = success and result["success"]
+        finally:
+            sys.stdout = stdout
+
+    seconds = time.perf_counter() - start
+    sampler.stop()
+
+    queue.put({
+        "success": success,
+        "seconds": round(seconds, 4),
+        "mb_per_s": round(install["bytes"] / 2**20 / seconds, 2),
+        "files_per_s": round(install["files"] / seconds, 1),
+        "peak_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+        "temp_hwm_mb": round(sampler.high_water / 2**20, 2),
+        "steps": {name: round(value, 4) for name, value in timings.items()}
+    })
+
+
+def compare(results, baseline, tolerance):
+    """
+    Prints the comparison with the baseline.
+
+    Returns:
+        list: Regressed metrics as 'phase.metric'
+    """
+    regressions = []
+    for phase, metrics in results["phases"].items():
+        for metric in COMPARED:
+            old = baseline["phases"].get(phase, {}).get(metric)
+            if not old:
+                continue
+            change = metrics[metric] / old - 1
+            flag = ""
+            if change > tolerance:
+                flag = "  REGRESSION"
+                regressions.append(f"{phase}.{metric}")
+            print(f"  {phase:<8}{metric:<14}{old:>10} -> "
+                  f"{metrics[metric]:>10}  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    """
+    Parses the arguments, runs both phases and reports the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--profiles", type=int, default=4)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=64)
+    parser.add_argument("--mind-mb", type=int, default=50)
+    parser.add_argument("--physique-kb", type=int, default=256)
+    parser.add_argument("--output", default="bench_end_to_end.json")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        install = generate_install(
+            work_dir, args.profiles, args.files, args.file_kb, args.mind_mb,
+            args.physique_kb)
+
+        results = {
+            "parameters": {
+                "profiles": args.profiles,
+                "files": args.files,
+                "file_kb": args.file_kb,
+                "mind_mb": args.mind_mb,
+                "physique_kb": args.physique_kb
+            },
+            "data_mb": round(install["bytes"] / 2**20, 2),
+            "phases": {}
+        }
+
+        context = multiprocessing.get_context("spawn")
+        for phase in STEPS:
+            queue = context.Queue()
+            process = context.Process(
+                target=run_phase, args=(phase, install, queue))
+            process.start()
+            results["phases"][phase] = queue.get()
+            process.join()
+
+    for phase, metrics in results["phases"].items():
+        print(
+            f"{phase:<8} {'ok' if metrics['success'] else 'FAILED':<7}"
+            f"{metrics['seconds']:>8.2f}s {metrics['mb_per_s']:>8.1f} MB/s "
+            f"{metrics['files_per_s']:>8.1f} files/s "
+            f"rss {metrics['peak_rss_mb']:>7.1f} MB "
+            f"temp {metrics['temp_hwm_mb']:>8.1f} MB"
+        )
+        for name, seconds in metrics["steps"].items():
+            print(f"           {name:<40}{seconds:>8.3f}s")
+
+    with open(args.output, "w", encoding="UTF-8") as json_file:
+        json.dump(results, json_file, indent=4)
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="UTF-8") as json_file:
+            json.dump(results, json_file, indent=4)
+        print(f"Baseline saved: {args.baseline}")
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}, "
+              "store one with --save-baseline")
+        return
+
+    with open(args.baseline, encoding="UTF-8") as json_file:
+        baseline = json.load(json_file)
+    if baseline["parameters"] != results["parameters"]:
+        print("Baseline was measured with other parameters:",
+              baseline["parameters"])
+    print("Compared with the baseline:")
+    if compare(results, baseline, args.tolerance):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+"""
+Benchmark: reading profiles from a large offline hive file
+
+Writes a synthetic NTUSER.DAT holding the Black & White keys between
+filler keys up to the given size, then lists the profiles and reads
+their values through the 'hive' backend. Reports the time next to the
+time of reading the whole file and the part of the hive mapped into
+memory. Only the keys on the path are visited, but the kernel counts
+the whole page cache folio around each touched page as mapped. A hive
+can also be passed to time the profile listing on it.
+
+Usage:
+    python -m benchmarks.bench_hive [NTUSER.DAT] [--size-mb 100]
+        [--profiles 4] [--repeat 20]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import struct
+import sys
+import tempfile
+import time
+from modules.registry_operation.hive_registry import BIG_DATA_SEGMENT
+from modules.registry_operation.hive_registry import HBIN_START
+from modules.registry_operation.hive_registry import HiveRegistry
+from modules.registry_operation.hive_registry import name_hash
+from modules.registry_operation.reg_file import value_bytes
+from modules.registry_operation.registry_session import RegistrySession
+
+PROFILES_KEY = (
+    "Software\\Lionhead Studios Ltd\\Black & White\\LHMultiplayer\\Profiles"
+)
+
+# Size of the data of every filler value
+FILLER_BYTES = 4096
+
+
+class HiveWriter():
+    """
+    Class writing a minimal hive file, every key in one hive bin
+    """
+
+    def __init__(self):
+        self.__bins = bytearray(b"hbin" + bytes(28))
+
+    def __cell(self, data):
+        """
+        Returns:
+            int: Offset of the new cell holding the data
+        """
+        offset = len(self.__bins)
+        size = (len(data) + 4 + 7) // 8 * 8
+        self.__bins += struct.pack("<i", -size) + data
+        self.__bins += bytes(size - len(data) - 4)
+        return offset
+
+    def __data(self, raw):
+        """
+        Returns:
+            int: Offset of the data cell, a 'db' record if larger
+                 than a cell
+        """
+        if len(raw) <= BIG_DATA_SEGMENT:
+            return self.__cell(raw)
+
+        segments = [
+            self.__cell(raw[start:start + BIG_DATA_SEGMENT])
+            for start in range(0, len(raw), BIG_DATA_SEGMENT)
+        ]
+        segment_list = self.__cell(
+            struct.pack(f"<{len(segments)}I", *segments))
+        return self.__cell(
+            struct.pack("<2sHI", b"db", len(segments), segment_list))
+
+    def __value(self, name, data, value_type):
+        """
+        Returns:
+            int: Offset of the value record
+        """
+        raw = value_bytes(data, value_type)
+        encoded = name.encode("latin-1")
+        if len(raw) <= 4:
+            size = len(raw) | 0x80000000
+            data_offset = int.from_bytes(raw.ljust(4, b"\0"), "little")
+        else:
+            size = len(raw)
+            data_offset = self.__data(raw)
+
+        return self.__cell(struct.pack(
+            "<2sHIIIHH", b"vk", len(encoded), size, data_offset,
+            value_type, 1, 0) + encoded)
+
+    def write_key(self, name, node, flags=0x20):
+        """
+        Writes a key with its values and sub keys.
+
+        Params:
+            name (str): Name of the key
+            node (dict): 'values' as tuples of name, data and type and
+                         'keys' by name
+
+        Returns:
+            int: Offset of the key node
+        """
+        values = [self.__value(*value) for value in node["values"]]
+        value_list = self.__cell(
+            struct.pack(f"<{len(values)}I", *values)) if values else 0
+
+        # Sub key lists are sorted by the upper case name
+        names = sorted(node["keys"], key=str.upper)
+        sub_keys = [
+            self.write_key(sub_name, node["keys"][sub_name])
+            for sub_name in names
+        ]
+        sub_key_list = 0
+        if sub_keys:
+            sub_key_list = self.__cell(struct.pack(
+                "<2sH", b"lh", len(sub_keys)) + b"".join(
+                    struct.pack("<II", offset, name_hash(sub_name))
+                    for offset, sub_name in zip(sub_keys, names)))
+
+        encoded = name.encode("latin-1")
+        return self.__cell(struct.pack(
+            "<2sHQIIIIIIIIIIIIIIIHH", b"nk", flags, 0, 0, 0,
+            len(sub_keys), 0, sub_key_list, 0xFFFFFFFF,
+            len(values), value_list, 0xFFFFFFFF, 0xFFFFFFFF,
+            0, 0, 0, 0, 0, len(encoded), 0) + encoded)
+
+    def save(self, hive_file, root):
+        """
+        Writes the hive file with the base block in front.
+
+        Params:
+            root (int): Offset of the root key
+        """
+        self.__bins += bytes(-len(self.__bins) % 4096)
+        struct.pack_into("<II", self.__bins, 4, 0, len(self.__bins))
+
+        base = bytearray(HBIN_START)
+        struct.pack_into(
+            "<4sIIQIIIIIII", base, 0, b"regf", 1, 1, 0, 1, 5, 0, 1,
+            root, len(self.__bins), 1)
+        checksum = 0
+        for (dword,) in struct.iter_unpack("<I", base[:508]):
+            checksum ^= dword
+        struct.pack_into("<I", base, 508, checksum)
+
+        with open(hive_file, "wb") as output:
+            output.write(base)
+            output.write(self.__bins)
+
+
+def add_key(tree, path):
+    """
+    Returns:
+        dict: Node of the key, created with its parents if missing
+    """
+    node = tree
+    for part in path.split("\\"):
+        node = node["keys"].setdefault(part, {"values": [], "keys": {}})
+    return node
+
+
+def synthetic_hive(hive_file, size_mb, profiles):
+    """
+    Writes a hive of about 'size_mb' with the profile keys.
+    """
+    tree = {"values": [], "keys": {}}
+    for index in range(profiles):
+        add_key(tree, f"{PROFILES_KEY}\\Player{index + 1}")["values"] \
+            .extend([
+                ("file", f"Creature{index + 1}.chl", HiveRegistry.REG_SZ),
+                ("name", f"Player{index + 1}", HiveRegistry.REG_SZ),
+                ("Level", index, HiveRegistry.REG_DWORD),
+                ("Lands", ["Land1", "Land2"], HiveRegistry.REG_MULTI_SZ),
+                ("Mind", bytes(range(256)) * 80, HiveRegistry.REG_BINARY)
+            ])
+
+    # Filler keys before and after the game in the sorted key lists
+    filler = size_mb * 1024 * 1024 // (FILLER_BYTES * 4 + 512)
+    for index in range(filler):
+        vendor = "Classes" if index % 2 else "Zeta Software"
+        add_key(tree, f"Software\\{vendor}\\Key{index}")["values"].extend(
+            (f"Data{number}", bytes([index % 256]) * FILLER_BYTES,
+             HiveRegistry.REG_BINARY)
+            for number in range(4))
+
+    writer = HiveWriter()
+    writer.save(hive_file, writer.write_key("ROOT", tree, 0x2C))
+
+
+def mapped_kb(hive_file):
+    """
+    Returns:
+        int: Kilobytes of the hive mapped into memory, None where
+             /proc is not available
+    """
+    try:
+        with open("/proc/self/smaps", encoding="UTF-8") as smaps:
+            lines = smaps.read().splitlines()
+    except OSError:
+        return None
+
+    resident = 0
+    in_hive = False
+    for line in lines:
+        fields = line.split()
+        if "-" in fields[0] and not fields[0].endswith(":"):
+            in_hive = line.endswith(os.path.abspath(hive_file))
+        elif in_hive and fields[0] == "Rss:":
+            resident += int(fields[1])
+    return resident
+
+
+def read_profiles(hive_file):
+    """
+    Returns:
+        tuple: Values of every profile and the session used
+    """
+    session = RegistrySession(HiveRegistry(hive_file))
+    profiles = {
+        name: session.enum_values(
+            "HKEY_CURRENT_USER", PROFILES_KEY + "\\" + name)
+        for name in session.enum_keys("HKEY_CURRENT_USER", PROFILES_KEY)
+    }
+    return profiles, session
+
+
+def main():
+    """
+    Parses the arguments, writes the hive and times the reads.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("hive", nargs="?")
+    parser.add_argument("--size-mb", type=int, default=100)
+    parser.add_argument("--profiles", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        hive_file = args.hive
+        if hive_file is None:
+            hive_file = os.path.join(temp_dir, "NTUSER.DAT")
+            start = time.perf_counter()
+            synthetic_hive(hive_file, args.size_mb, args.profiles)
+            print(f"wrote {os.path.getsize(hive_file) / 2**20:.1f}MB hive "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+        profiles, session = read_profiles(hive_file)
+        print(f"profiles: {sorted(profiles)}, mapped of the hive: "
+              f"{mapped_kb(hive_file)}KB")
+        session.close()
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            read_profiles(hive_file)[1].close()
+        read_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+        start = time.perf_counter()
+        with open(hive_file, "rb") as whole:
+            while whole.read(1024 * 1024):
+                pass
+        whole_ms = (time.perf_counter() - start) * 1000
+
+        print(f"    read profiles {read_ms:.3f}ms  "
+              f"read whole file {whole_ms:.3f}ms")
+
+    if args.hive is None and len(profiles) != args.profiles:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
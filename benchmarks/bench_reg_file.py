@@ -0,0 +1,164 @@
+"""
+Benchmark: in-process .reg export and import versus the 'reg' tool
+
+Checks that .reg files survive the parser and writer byte for byte,
+each directly and through an import into and export from an in-memory
+registry. Files exported by 'reg export' can be passed as a corpus,
+without any a synthetic profile key is used. Reports the time per
+export and import next to the time of starting the 'reg' tool (or the
+Python interpreter where there is none), the fixed cost the in-process
+code saves.
+
+Usage:
+    python -m benchmarks.bench_reg_file [profile.reg ...]
+        [--values 200] [--repeat 200]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import shutil
+import subprocess
+import sys
+import time
+from modules.registry_operation.file_registry import FileRegistry
+from modules.registry_operation.reg_file import dump_reg
+from modules.registry_operation.reg_file import export_keys
+from modules.registry_operation.reg_file import import_keys
+from modules.registry_operation.reg_file import parse_reg
+from modules.registry_operation.registry_session import RegistrySession
+
+PROFILE_KEY = (
+    "HKEY_CURRENT_USER\\Software\\Lionhead Studios Ltd\\Black & White\\"
+    "LHMultiplayer\\Profiles\\Player1"
+)
+
+
+def synthetic_sample(values):
+    """
+    Returns:
+        bytes: .reg file of a profile key with values of every type
+    """
+    keys = [(PROFILE_KEY, [
+        ("file", "C:\\Games\\Black & White\\Scripts\\CreatureMind\\"
+                 "Player1.chl", FileRegistry.REG_SZ),
+        ("name", 'Player "1"', FileRegistry.REG_SZ),
+        ("", "", FileRegistry.REG_SZ),
+        ("Level", 10, FileRegistry.REG_DWORD),
+        ("Path", "%USERPROFILE%\\Desktop", FileRegistry.REG_EXPAND_SZ),
+        ("Lands", ["Land1", "Land2"], FileRegistry.REG_MULTI_SZ),
+        ("Played", 2**40, FileRegistry.REG_QWORD),
+        ("Empty", b"", FileRegistry.REG_BINARY)
+    ])]
+    keys[0][1].extend(
+        (f"Data{index}", bytes(range(index % 256)) * 2,
+         FileRegistry.REG_BINARY)
+        for index in range(values)
+    )
+    keys.append((PROFILE_KEY + "\\Creature", [
+        ("Physique", "Physique", FileRegistry.REG_SZ)
+    ]))
+
+    return dump_reg(keys)
+
+
+def round_trip(reg_data):
+    """
+    Returns:
+        tuple: True if writing the parsed file reproduces it and
+               True if an import and export reproduces it
+    """
+    keys = parse_reg(reg_data)
+    session = RegistrySession(FileRegistry())
+    import_keys(session, keys)
+
+    return (
+        dump_reg(keys) == reg_data,
+        dump_reg(export_keys(session, keys[0][0])) == reg_data
+    )
+
+
+def time_calls(function, repeat):
+    """
+    Returns:
+        float: Average time of a call in milliseconds
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def spawn_time(repeat):
+    """
+    Returns:
+        tuple: Program started and average start time in milliseconds
+    """
+    command = [shutil.which("reg"), "/?"] if shutil.which("reg") \
+        else [sys.executable, "-c", "pass"]
+
+    return command[0], time_calls(
+        lambda: subprocess.run(
+            command, stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL, check=False),
+        max(1, repeat // 10))
+
+
+def main():
+    """
+    Parses the arguments and checks and times every sample.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("samples", nargs="*")
+    parser.add_argument("--values", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    samples = {}
+    for sample in args.samples:
+        with open(sample, "rb") as reg_file:
+            samples[sample] = reg_file.read()
+    if not samples:
+        samples["synthetic"] = synthetic_sample(args.values)
+
+    failed = False
+    for name, reg_data in samples.items():
+        keys = parse_reg(reg_data)
+        session = RegistrySession(FileRegistry())
+        import_keys(session, keys)
+
+        identical, exported = round_trip(reg_data)
+        export_ms = time_calls(
+            lambda: dump_reg(export_keys(session, keys[0][0])), args.repeat)
+        import_ms = time_calls(
+            lambda: import_keys(session, parse_reg(reg_data)), args.repeat)
+
+        print(f"{name}: {len(reg_data) / 1024:.1f}KB, {len(keys)} keys, "
+              f"written identical={identical}, "
+              f"exported identical={exported}")
+        print(f"    export {export_ms:.3f}ms  import {import_ms:.3f}ms")
+        failed = failed or not (identical and exported)
+
+    program, spawn_ms = spawn_time(args.repeat)
+    print(f"process start of {program}: {spawn_ms:.3f}ms")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
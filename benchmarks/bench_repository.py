@@ -0,0 +1,126 @@
+"""
+Benchmark: chunk repository versus standalone zip archives
+
+Backs up a synthetic profile N times, changing a few regions of the
+creature mind file between the backups, and compares the total size
+and backup time of the archives with those of the chunk repository.
+
+Usage:
+    python -m benchmarks.bench_repository [--backups 10] [--mind-mb 100]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import tempfile
+import time
+from benchmarks.bench_stream_backup import MIND, PHYSIQUE, PROFILE
+from benchmarks.bench_stream_backup import generate_profile
+from modules.repository_operation.store_repository import StoreRepository
+from modules.zip_operation.unzip_files import UnzipBackup
+from modules.zip_operation.zip_backup import ZipBackup
+
+
+def directory_size(path):
+    """
+    Returns:
+        int: Size of all files below 'path'
+    """
+    return sum(
+        os.path.getsize(os.path.join(root, file))
+        for root, _, files in os.walk(path) for file in files
+    )
+
+
+def touch_mind_file(mind_file, backup):
+    """
+    Changes a few small regions of the mind file, like a game
+    updating the creature between two saves.
+    """
+    size = os.path.getsize(mind_file)
+    with open(mind_file, "r+b") as mind:
+        for region in range(4):
+            mind.seek((size // 5) * region + backup * 4096)
+            mind.write(os.urandom(512))
+
+
+def main():
+    """
+    Parses the arguments and runs both backup targets.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backups", type=int, default=10)
+    parser.add_argument("--mind-mb", type=int, default=100)
+    parser.add_argument("--files", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_profile(work_dir, args.mind_mb, args.files)
+        sources = [
+            (paths["profile_dir"], PROFILE),
+            (paths["mind"], MIND),
+            (paths["physique"], PHYSIQUE)
+        ]
+        zip_dir = os.path.join(work_dir, "archives")
+        repository_dir = os.path.join(work_dir, "repository")
+        os.makedirs(zip_dir)
+
+        zip_time = 0.0
+        repository_time = 0.0
+        manifest_file = None
+        for backup in range(args.backups):
+            touch_mind_file(paths["mind"], backup)
+
+            zip_backup = ZipBackup()
+            zip_backup.set_data(None, f"{PROFILE}{backup}", zip_dir, None)
+            zip_backup.set_sources(sources)
+            start = time.perf_counter()
+            zip_backup.zip_backup()
+            zip_time += time.perf_counter() - start
+
+            store_repository = StoreRepository()
+            store_repository.set_data(
+                repository_dir, f"{PROFILE}{backup}", sources)
+            start = time.perf_counter()
+            store_repository.store_backup()
+            repository_time += time.perf_counter() - start
+            manifest_file = store_repository.get_manifest_file()
+
+            print(
+                f"backup {backup + 1:>3}: "
+                f"archives {directory_size(zip_dir) / 2**20:>8.1f}MB  "
+                f"repository {directory_size(repository_dir) / 2**20:>8.1f}MB"
+            )
+
+        print(f"total time: archives {zip_time:.2f}s, "
+              f"repository {repository_time:.2f}s")
+
+        # The latest manifest must reassemble the current files
+        restore_dir = os.path.join(work_dir, "restore")
+        unzip_backup = UnzipBackup()
+        unzip_backup.set_data(manifest_file, restore_dir, "backup_info.json")
+        result = unzip_backup.unzip_backup()
+        with open(paths["mind"], "rb") as original, \
+                open(os.path.join(restore_dir, MIND), "rb") as restored:
+            identical = original.read() == restored.read()
+        print(f"restore from manifest: success={result['success']} "
+              f"identical={identical}")
+
+
+if __name__ == "__main__":
+    main()
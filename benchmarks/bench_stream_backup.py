@@ -0,0 +1,181 @@
+"""
+Benchmark: staged backup versus streamed backup
+
+Generates a synthetic profile (profile directory, creature mind and
+physique file) and archives it once through the temporary directory
+(copy, then zip) and once straight from the source locations.
+
+Usage:
+    python -m benchmarks.bench_stream_backup [--mind-mb 300] [--files 400]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from modules.file_operation.copy_dir import CopyDir
+from modules.file_operation.copy_file import CopyFile
+from modules.zip_operation.zip_backup import ZipBackup
+
+
+PROFILE = "Benchmark"
+MIND = "BenchmarkMind.chl"
+PHYSIQUE = "Physique" + MIND
+
+
+def io_counters():
+    """
+    Reads the characters read and written by this process.
+
+    Returns:
+        tuple: Read and written bytes, (0, 0) if /proc is not available
+    """
+    try:
+        with open("/proc/self/io", encoding="UTF-8") as io_file:
+            counters = dict(
+                line.split(": ") for line in io_file.read().splitlines()
+            )
+        return int(counters["rchar"]), int(counters["wchar"])
+    except OSError:
+        return 0, 0
+
+
+def write_synthetic_file(path, size):
+    """
+    Writes a file of the given size that compresses roughly like
+    a creature mind file (half random data, half repeated records).
+    """
+    block = os.urandom(32 * 1024) + bytes(range(256)) * 128
+    with open(path, "wb") as synthetic:
+        while size > 0:
+            synthetic.write(block[:size])
+            size -= len(block)
+
+
+def generate_profile(root, mind_mb, files):
+    """
+    Generates the synthetic profile below 'root'.
+
+    Returns:
+        dict: Paths of the generated profile directory and creature files
+    """
+    profile_dir = os.path.join(root, "Profiles", PROFILE)
+    mind_dir = os.path.join(root, "CreatureMind")
+    os.makedirs(profile_dir)
+    os.makedirs(mind_dir)
+
+    for index in range(files):
+        sub_dir = os.path.join(profile_dir, f"land{index % 8}")
+        os.makedirs(sub_dir, exist_ok=True)
+        write_synthetic_file(
+            os.path.join(sub_dir, f"save{index}.sav"), 64 * 1024)
+
+    write_synthetic_file(
+        os.path.join(mind_dir, MIND), mind_mb * 1024 * 1024)
+    write_synthetic_file(
+        os.path.join(mind_dir, PHYSIQUE), 256 * 1024)
+
+    return {
+        "profile_dir": profile_dir,
+        "mind": os.path.join(mind_dir, MIND),
+        "physique": os.path.join(mind_dir, PHYSIQUE)
+    }
+
+
+def staged_backup(paths, temp_dir, out_dir):
+    """
+    Copies everything into the temporary directory, then zips it.
+    """
+    copy_dir = CopyDir()
+    copy_dir.set_data(paths["profile_dir"], os.path.join(temp_dir, PROFILE))
+    copy_dir.copy_dir()
+    for key in ("mind", "physique"):
+        copy_file = CopyFile()
+        copy_file.set_data(paths[key], temp_dir)
+        copy_file.copy_file()
+
+    zip_backup = ZipBackup()
+    zip_backup.set_data(None, PROFILE, out_dir, temp_dir)
+    return zip_backup.zip_backup()
+
+
+def streamed_backup(paths, temp_dir, out_dir):
+    """
+    Writes the files straight from their source locations into the zip.
+    """
+    zip_backup = ZipBackup()
+    zip_backup.set_data(None, PROFILE, out_dir, temp_dir)
+    zip_backup.set_sources([
+        (paths["profile_dir"], PROFILE),
+        (paths["mind"], MIND),
+        (paths["physique"], PHYSIQUE),
+        (temp_dir, "")
+    ])
+    return zip_backup.zip_backup()
+
+
+def measure(name, backup_method, paths, work_dir):
+    """
+    Runs one backup variant and prints its cost.
+    """
+    temp_dir = os.path.join(work_dir, "bwbackup")
+    out_dir = os.path.join(work_dir, "out")
+    os.makedirs(temp_dir)
+    os.makedirs(out_dir)
+
+    read_before, written_before = io_counters()
+    start = time.perf_counter()
+    result = backup_method(paths, temp_dir, out_dir)
+    elapsed = time.perf_counter() - start
+    read_after, written_after = io_counters()
+
+    staged = sum(
+        os.path.getsize(os.path.join(root, file))
+        for root, _, files in os.walk(temp_dir) for file in files
+    )
+    print(
+        f"{name:<9} success={result['success']} "
+        f"time={elapsed:.2f}s "
+        f"read={(read_after - read_before) / 2**20:.0f}MB "
+        f"written={(written_after - written_before) / 2**20:.0f}MB "
+        f"temp={staged / 2**20:.0f}MB"
+    )
+
+    shutil.rmtree(temp_dir)
+    shutil.rmtree(out_dir)
+
+
+def main():
+    """
+    Parses the arguments and runs both variants.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--mind-mb", type=int, default=300)
+    parser.add_argument("--files", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_profile(work_dir, args.mind_mb, args.files)
+        measure("staged", staged_backup, paths, work_dir)
+        measure("streamed", streamed_backup, paths, work_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Benchmark: idle and active cost of the watch mode
+
+Generates a synthetic profile and watches it with inotify and with
+polling. While idle, the CPU time and the number of wakeups (voluntary
+context switches) of the process are measured. Then a simulated game
+writes a number of saves, each a burst of small writes to the profile
+and a chunked rewrite of the creature mind file, and the benchmark
+counts the backups that would be triggered and how long after the last
+write of a save they start.
+
+Usage:
+    python -m benchmarks.bench_watch [--idle 10] [--saves 5]
+        [--debounce 1.0] [--poll-interval 1.0]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import os
+import resource
+import tempfile
+import threading
+import time
+from benchmarks.bench_stream_backup import generate_profile
+from modules.watch_operation.watch_dirs import InotifyWatcher
+from modules.watch_operation.watch_dirs import PollWatcher
+from modules.watch_operation.watch_dirs import wait_for_save
+
+
+def usage():
+    """
+    Returns:
+        tuple: CPU seconds and voluntary context switches of the process
+    """
+    rusage = resource.getrusage(resource.RUSAGE_SELF)
+    return rusage.ru_utime + rusage.ru_stime, rusage.ru_nvcsw
+
+
+def write_save(paths, save):
+    """
+    Writes one save like the game: the profile files one after the
+    other, then the creature mind file in chunks.
+    """
+    for root, _, files in os.walk(paths["profile_dir"]):
+        for file in files[:4]:
+            with open(os.path.join(root, file), "r+b") as save_file:
+                save_file.write(os.urandom(4096))
+            time.sleep(0.005)
+
+    with open(paths["mind"], "r+b") as mind:
+        for chunk in range(8):
+            mind.seek(chunk * 64 * 1024 + save * 512)
+            mind.write(os.urandom(512))
+            mind.flush()
+            time.sleep(0.02)
+
+    return time.monotonic()
+
+
+def run_watcher(name, watcher, paths, args):
+    """
+    Measures one watcher while idle and while saves are written.
+    """
+    triggers = []
+
+    def watch():
+        while True:
+            wait_for_save(watcher, args.debounce)
+            if stop.is_set():
+                return
+            triggers.append(time.monotonic())
+
+    stop = threading.Event()
+    thread = threading.Thread(target=watch, daemon=True)
+    thread.start()
+
+    cpu, wakeups = usage()
+    time.sleep(args.idle)
+    idle_cpu, idle_wakeups = usage()
+    idle_cpu -= cpu
+    idle_wakeups -= wakeups
+
+    last_writes = []
+    for save in range(args.saves):
+        last_writes.append(write_save(paths, save))
+        time.sleep(args.debounce + args.poll_interval + 0.5)
+    active_cpu = usage()[0] - idle_cpu - cpu
+
+    # One more write wakes the watch thread up so it can end
+    stop.set()
+    with open(os.path.join(paths["profile_dir"], "stop"), "wb"):
+        pass
+    thread.join()
+    watcher.close()
+
+    delays = [
+        trigger - last_write
+        for trigger, last_write in zip(triggers, last_writes)
+    ]
+    print(
+        f"{name:>8}: idle {idle_cpu * 1000 / args.idle:6.2f} ms CPU/s, "
+        f"{idle_wakeups / args.idle:6.1f} wakeups/s | "
+        f"{len(triggers)}/{args.saves} backups triggered, "
+        f"delay after last write "
+        f"{(sum(delays) / len(delays)) if delays else 0:.2f}s "
+        f"(debounce {args.debounce}s), "
+        f"active {active_cpu * 1000:.1f} ms CPU"
+    )
+
+
+def main():
+    """
+    Parses the arguments and measures both watchers.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--idle", type=float, default=10.0)
+    parser.add_argument("--saves", type=int, default=5)
+    parser.add_argument("--debounce", type=float, default=1.0)
+    parser.add_argument("--poll-interval", type=float, default=1.0)
+    parser.add_argument("--mind-mb", type=int, default=20)
+    parser.add_argument("--files", type=int, default=400)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_profile(work_dir, args.mind_mb, args.files)
+        watched = [
+            paths["profile_dir"], os.path.dirname(paths["mind"])]
+
+        try:
+            run_watcher("inotify", InotifyWatcher(watched), paths, args)
+        except OSError as e:
+            print(f" inotify: not available ({e})")
+
+        run_watcher(
+            "polling", PollWatcher(watched, args.poll_interval), paths, args)
+
+
+if __name__ == "__main__":
+    main()
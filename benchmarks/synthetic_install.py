@@ -0,0 +1,130 @@
+"""
+Generates a synthetic Black & White install for the benchmarks
+
+Creates a game directory with any number of profiles, each with its
+profile directory, creature mind and physique file, a desktop and a
+temporary directory, and the registry keys the tool reads, written to
+a JSON file for the 'file' registry backend.
+
+Usage:
+    python -m benchmarks.synthetic_install DIR [--profiles 4]
+        [--files 200] [--file-kb 64] [--mind-mb 50] [--physique-kb 256]
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import argparse
+import json
+import os
+from benchmarks.bench_stream_backup import write_synthetic_file
+from modules.registry_operation.file_registry import FileRegistry
+from modules.registry_operation.file_registry import build_tree
+
+# Registry locations, as in data/config.json
+GAME_KEY = "HKEY_CURRENT_USER\\Software\\Lionhead Studios Ltd\\Black & White"
+PROFILES_KEY = GAME_KEY + "\\LHMultiplayer\\Profiles"
+DESKTOP_KEY = (
+    "HKEY_CURRENT_USER\\Software\\Microsoft\\Windows\\CurrentVersion"
+    "\\Explorer\\User Shell Folders"
+)
+
+
+def generate_install(root, profiles=4, files=200, file_kb=64, mind_mb=50,
+                     physique_kb=256):
+    """
+    Generates the install below 'root'.
+
+    Returns:
+        dict: Paths of the game, desktop and temporary directory and
+              the registry file, names of the profiles and their
+              creature mind files, number and size of generated files
+    """
+    game_dir = os.path.join(root, "Black & White")
+    desktop_dir = os.path.join(root, "Desktop")
+    temp_root = os.path.join(root, "Temp")
+    mind_dir = os.path.join(game_dir, "Scripts", "CreatureMind")
+    for path in (desktop_dir, temp_root, mind_dir):
+        os.makedirs(path)
+
+    keys = {
+        GAME_KEY: {"GameDir": (FileRegistry.REG_SZ, game_dir)},
+        GAME_KEY + "\\LHMultiplayer": {},
+        DESKTOP_KEY: {"Desktop": (FileRegistry.REG_SZ, desktop_dir)}
+    }
+    install = {
+        "game_dir": game_dir,
+        "desktop_dir": desktop_dir,
+        "temp_root": temp_root,
+        "registry_file": os.path.join(root, "registry.json"),
+        "profiles": {},
+        "files": 0,
+        "bytes": 0
+    }
+
+    for index in range(profiles):
+        profile = f"Player{index + 1}"
+        mind = f"Creature{index + 1}.chl"
+        profile_dir = os.path.join(game_dir, "Profiles", profile)
+
+        for number in range(files):
+            sub_dir = os.path.join(profile_dir, f"land{number % 8}")
+            os.makedirs(sub_dir, exist_ok=True)
+            write_synthetic_file(
+                os.path.join(sub_dir, f"save{number}.sav"), file_kb * 1024)
+        write_synthetic_file(
+            os.path.join(mind_dir, mind), mind_mb * 1024 * 1024)
+        write_synthetic_file(
+            os.path.join(mind_dir, "Physique" + mind), physique_kb * 1024)
+
+        keys[PROFILES_KEY + "\\" + profile] = {
+            "file": (FileRegistry.REG_SZ, mind),
+            "name": (FileRegistry.REG_SZ, profile)
+        }
+        install["profiles"][profile] = mind
+        install["files"] += files + 2
+        install["bytes"] += (
+            files * file_kb * 1024 + mind_mb * 1024 * 1024 +
+            physique_kb * 1024
+        )
+
+    with open(install["registry_file"], "w", encoding="UTF-8") as json_file:
+        json.dump(build_tree(keys), json_file)
+
+    return install
+
+
+def main():
+    """
+    Parses the arguments and generates the install.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("root")
+    parser.add_argument("--profiles", type=int, default=4)
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--file-kb", type=int, default=64)
+    parser.add_argument("--mind-mb", type=int, default=50)
+    parser.add_argument("--physique-kb", type=int, default=256)
+    args = parser.parse_args()
+
+    install = generate_install(
+        args.root, args.profiles, args.files, args.file_kb, args.mind_mb,
+        args.physique_kb)
+    print(json.dumps(install, indent=4))
+
+
+if __name__ == "__main__":
+    main()
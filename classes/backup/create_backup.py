@@ -3,6 +3,20 @@ Perform the backup.
 
 Creates a temporary directory, copies important files,
 and then archives them in a ZIP file.
+
+With 'stream_backup' enabled in the configuration, the profile directory
+and the creature files are not copied. They are written into the archive
+straight from the game directory, the temporary directory then only
+holds the exported registry key and the backup information.
+
+With 'backup_target' set to 'repository', the same files are stored in
+the deduplicating chunk repository instead of an archive.
+
+With 'incremental' enabled, every file is recorded in a manifest and
+only files that changed since the latest incremental backup of the
+profile (the parent) are archived.
+
+Every created backup is recorded in the local backup catalog.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -22,12 +36,18 @@ and then archives them in a ZIP file.
 # If not, see <http://www.gnu.org/licenses/>.
 
 import os
+from datetime import datetime
+from modules.catalog_operation.record_backup import RecordBackup
 from modules.file_operation.copy_dir import CopyDir
 from modules.file_operation.copy_file import CopyFile
 from modules.file_operation.create_temp_dir import CreateTempDir
 from modules.file_operation.delete_temp_dir import DeleteTempDir
+from modules.misc.file_manifest import FileManifest
+from modules.misc.locate_parent_backup import LocateParentBackup
 from modules.misc.write_backup_data import WriteBackupData
 from modules.registry_operation.export_regkey import ExportRegkey
+from modules.repository_operation.store_repository import StoreRepository
+from modules.zip_operation.archive_codecs import get_codec
 from modules.zip_operation.zip_backup import ZipBackup
 
 
@@ -41,6 +61,11 @@ class CreateBackup():
         self.__backup_data = None
         self.__temp_dir = None
         self.__backup_file = None
+        self.__archive_name = None
+        self.__manifest = None
+        self.__overwrite = None
+        self.__temp_name = None
+        self.__reg_data = None
 
     def create_backup(self):
         """
@@ -54,21 +79,51 @@ class CreateBackup():
         }
 
         # Steps to be completed
-        steps = [
-            self.__create_temp_dir,
-            self.__copy_profile_dir,
-            self.__copy_mind_file,
-            self.__copy_physique_file,
-            self.__export_reg_key,
-            self.__write_backup_data,
-            self.__zip_backup,
-            self.__delete_temp_dir
-        ]
+        if self.__data_files.conf["backup_target"] == "repository":
+            steps = [
+                self.__create_temp_dir,
+                self.__export_reg_key,
+                self.__write_backup_data,
+                self.__store_repository,
+                self.__record_catalog,
+                self.__delete_temp_dir
+            ]
+        elif self.__data_files.conf["incremental"]:
+            steps = [
+                self.__create_temp_dir,
+                self.__export_reg_key,
+                self.__build_manifest,
+                self.__write_backup_data,
+                self.__zip_backup,
+                self.__record_catalog,
+                self.__delete_temp_dir
+            ]
+        elif self.__data_files.conf["stream_backup"]:
+            steps = [
+                self.__create_temp_dir,
+                self.__export_reg_key,
+                self.__write_backup_data,
+                self.__zip_backup,
+                self.__record_catalog,
+                self.__delete_temp_dir
+            ]
+        else:
+            steps = [
+                self.__create_temp_dir,
+                self.__copy_profile_dir,
+                self.__copy_mind_file,
+                self.__copy_physique_file,
+                self.__export_reg_key,
+                self.__write_backup_data,
+                self.__zip_backup,
+                self.__record_catalog,
+                self.__delete_temp_dir
+            ]
 
         # Check each step for success, return failure message
         # if any step fails and delete the temp directory
         for step_method in steps:
-            step_result = step_method()
+            step_result = self.__data_files.trace.run_step(step_method)
             if not step_result["success"]:
                 result["message"] = \
                     self.__data_files.lang["create_backup"][1]
@@ -90,7 +145,7 @@ class CreateBackup():
         """
         create_dir = CreateTempDir()
         create_dir.set_data(
-            self.__data_files.conf["temp"],
+            self.__temp_name or self.__data_files.conf["temp"],
             self.__data_files.lang["create_temp"][2]
             )
         result = create_dir.create_temp_dir()
@@ -108,16 +163,83 @@ class CreateBackup():
 
         return result
 
-    def __copy_profile_dir(self):
+    def __profile_dir_path(self):
         """
-        Copies the profile directory
+        Returns:
+            str: Path to the profile directory in the game directory
         """
-        src_dir = os.path.join(
+        return os.path.join(
             self.__backup_data["game_dir"],
             self.__data_files.conf["profile_dir"],
             self.__backup_data["backup_profile"]
         )
 
+    def __creature_file_path(self, key):
+        """
+        Params:
+            key (str): 'creature_mind' or 'creature_physique'
+
+        Returns:
+            str: Path to the creature file in the game directory
+        """
+        return os.path.join(
+            self.__backup_data["game_dir"],
+            self.__data_files.conf["mind_files"],
+            self.__backup_data[key]
+        )
+
+    def __game_sources(self):
+        """
+        Lists the profile directory and creature files
+        at their original locations.
+
+        Returns:
+            list: Tuples of source path and name inside the backup
+        """
+        return [
+            (self.__profile_dir_path(),
+             self.__backup_data["backup_profile"]),
+            (self.__creature_file_path("creature_mind"),
+             self.__backup_data["creature_mind"]),
+            (self.__creature_file_path("creature_physique"),
+             self.__backup_data["creature_physique"])
+        ]
+
+    def __backup_sources(self):
+        """
+        Lists the files and directories of the backup
+        at their original locations.
+
+        Returns:
+            list: Tuples of source path and name inside the backup
+        """
+        return self.__game_sources() + [(self.__temp_dir, "")]
+
+    def __archive_sources(self):
+        """
+        Lists what goes into the archive or repository.
+
+        Returns:
+            list: Tuples of source path and name inside the backup
+        """
+        # Only new and changed files go into an incremental backup
+        if self.__manifest is not None:
+            return self.__manifest["changed"] + [(self.__temp_dir, "")]
+
+        # Stream the game files directly into the archive
+        if self.__data_files.conf["stream_backup"] or \
+                self.__data_files.conf["backup_target"] == "repository":
+            return self.__backup_sources()
+
+        # The copied files are all in the temporary directory
+        return [(self.__temp_dir, "")]
+
+    def __copy_profile_dir(self):
+        """
+        Copies the profile directory
+        """
+        src_dir = self.__profile_dir_path()
+
         dst_dir = os.path.join(
             self.__temp_dir,
             self.__backup_data["backup_profile"]
@@ -125,6 +247,7 @@ class CreateBackup():
 
         profile_dir = CopyDir()
         profile_dir.set_data(src_dir, dst_dir)
+        profile_dir.set_workers(self.__data_files.conf["copy_workers"])
         result = profile_dir.copy_dir()
         if result["success"]:
             print(self.__data_files.lang["copy_profile"][0])
@@ -140,11 +263,7 @@ class CreateBackup():
         """
         Copies the creature mind file
         """
-        src_file = os.path.join(
-            self.__backup_data["game_dir"],
-            self.__data_files.conf["mind_files"],
-            self.__backup_data["creature_mind"]
-        )
+        src_file = self.__creature_file_path("creature_mind")
 
         mind_file = CopyFile()
         mind_file.set_data(src_file, self.__temp_dir)
@@ -163,11 +282,7 @@ class CreateBackup():
         """
         Copies the creature physique file
         """
-        src_file = os.path.join(
-            self.__backup_data["game_dir"],
-            self.__data_files.conf["mind_files"],
-            self.__backup_data["creature_physique"]
-        )
+        src_file = self.__creature_file_path("creature_physique")
 
         physique_file = CopyFile()
         physique_file.set_data(src_file, self.__temp_dir)
@@ -194,6 +309,8 @@ class CreateBackup():
             self.__backup_data["backup_profile"],
             self.__temp_dir
             )
+        key_export.set_session(self.__data_files.registry)
+        key_export.set_reg_data(self.__reg_data)
         result = key_export.export_regkey()
         if result["success"]:
             print(self.__data_files.lang["export_reg_key"][0])
@@ -205,6 +322,73 @@ class CreateBackup():
 
         return result
 
+    def __build_manifest(self):
+        """
+        Locates the parent backup and builds the file manifest.
+
+        Stores the manifest in 'self.__manifest'.
+        """
+        # Incremental backups are told apart by their creation time,
+        # backups within the same second by the microseconds
+        self.__archive_name = (
+            self.__backup_data["backup_profile"] + "_" +
+            datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        )
+        archive_file = self.__archive_name + \
+            get_codec(self.__data_files.conf["codec"])["extension"]
+
+        parent = LocateParentBackup()
+        parent.set_data(
+            self.__backup_data["desktop_dir"],
+            self.__backup_data["backup_profile"],
+            self.__data_files.conf["backup_info"]
+        )
+        result = parent.locate_parent()
+        if not result["success"]:
+            print(
+                f"{self.__data_files.lang['file_manifest'][2]} "
+                f"({result['message']})"
+            )
+            return result
+
+        # The new backup must never replace the archive it builds on
+        if parent.get_parent_file() == archive_file:
+            result["success"] = False
+            result["message"] = \
+                f"Backup would overwrite its parent: {archive_file}"
+            print(
+                f"{self.__data_files.lang['file_manifest'][2]} "
+                f"({result['message']})"
+            )
+            return result
+
+        manifest = FileManifest()
+        manifest.set_data(
+            self.__game_sources(),
+            parent.get_parent_files(),
+            archive_file
+        )
+        result = manifest.build_manifest()
+        if result["success"]:
+            self.__manifest = {
+                "files": manifest.get_files(),
+                "changed": manifest.get_changed(),
+                "parent": parent.get_parent_file()
+            }
+            print(
+                self.__data_files.lang["file_manifest"][0],
+                len(self.__manifest["changed"]),
+                "/",
+                len(self.__manifest["files"])
+            )
+        else:
+            print(
+                f"{self.__data_files.lang['file_manifest'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
     def __write_backup_data(self):
         """
         Writes backup information,
@@ -218,6 +402,9 @@ class CreateBackup():
             self.__data_files.conf["backup_info"],
             self.__temp_dir
             )
+        if self.__manifest is not None:
+            write_data.set_manifest(
+                self.__manifest["files"], self.__manifest["parent"])
         result = write_data.write_data()
         if result["success"]:
             print(self.__data_files.lang["backup_info"][0])
@@ -242,6 +429,16 @@ class CreateBackup():
             self.__backup_data["desktop_dir"],
             self.__temp_dir
         )
+        zip_backup.set_overwrite(self.__overwrite)
+        zip_backup.set_codec(self.__data_files.conf["codec"])
+        zip_backup.set_workers(self.__data_files.conf["compression_workers"])
+        zip_backup.set_policy(self.__data_files.conf["compression_policy"])
+        zip_backup.set_backup_info(self.__data_files.conf["backup_info"])
+
+        if self.__manifest is not None:
+            zip_backup.set_archive_name(self.__archive_name)
+        zip_backup.set_sources(self.__archive_sources())
+
         result = zip_backup.zip_backup()
         if result["success"]:
             self.__backup_file = zip_backup.get_backup_file()
@@ -255,6 +452,70 @@ class CreateBackup():
 
         return result
 
+    def __store_repository(self):
+        """
+        Stores the backup in the chunk repository.
+
+        Stores the created manifest in 'self.__backup_file'.
+        """
+        store_repository = StoreRepository()
+        store_repository.set_data(
+            os.path.join(
+                self.__backup_data["desktop_dir"],
+                self.__data_files.conf["repository_dir"]
+            ),
+            self.__backup_data["backup_profile"],
+            self.__archive_sources()
+        )
+        store_repository.set_backup_info(
+            self.__data_files.conf["backup_info"])
+        result = store_repository.store_backup()
+        if result["success"]:
+            self.__backup_file = store_repository.get_manifest_file()
+            print(self.__data_files.lang["store_repository"][0],
+                  self.__backup_file)
+        else:
+            print(
+                f"{self.__data_files.lang['store_repository'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __record_catalog(self):
+        """
+        Records the created backup in the catalog.
+
+        The catalog can be rebuilt by a rescan, so a failure here
+        is reported but does not fail the backup.
+        """
+        if self.__data_files.conf["backup_target"] == "repository":
+            codec = "repository"
+        else:
+            codec = self.__data_files.conf["codec"]
+
+        record_backup = RecordBackup()
+        record_backup.set_data(
+            self.__data_files.conf["catalog_file"],
+            self.__backup_file,
+            self.__temp_dir,
+            self.__data_files.conf["backup_info"],
+            codec
+        )
+        result = record_backup.record_backup()
+        if result["success"]:
+            print(self.__data_files.lang["catalog"][0])
+        else:
+            print(
+                f"{self.__data_files.lang['catalog'][1]} "
+                f"({result['message']})"
+            )
+
+        return {
+            "success": True,
+            "message": result["message"]
+        }
+
     def __delete_temp_dir(self):
         """
         Delete the temporary directory
@@ -273,6 +534,15 @@ class CreateBackup():
 
         return result
 
+    def get_backup_file(self):
+        """
+        Getter
+
+        Returns:
+            str: Path to the created archive or repository manifest
+        """
+        return self.__backup_file
+
     def set_data(self, data_files, backup_data):
         """
         Setter
@@ -283,3 +553,33 @@ class CreateBackup():
         """
         self.__data_files = data_files
         self.__backup_data = backup_data
+
+    def set_overwrite(self, overwrite):
+        """
+        Setter
+
+        Params:
+            overwrite (bool): Replace an existing archive (True), keep it
+                              (False) or ask the user (None, default)
+        """
+        self.__overwrite = overwrite
+
+    def set_temp_name(self, temp_name):
+        """
+        Setter
+
+        Params:
+            temp_name (str): Name of the temporary directory, so backups
+                             running side by side do not share it
+        """
+        self.__temp_name = temp_name
+
+    def set_reg_data(self, reg_data):
+        """
+        Setter
+
+        Params:
+            reg_data (bytes): .reg file of the profile exported together
+                              with other profiles, None to export it
+        """
+        self.__reg_data = reg_data
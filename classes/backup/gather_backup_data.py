@@ -4,6 +4,9 @@ Gathers the necessary backup data:
 - Desktop directory
 - Backup profile
 - Creature mind file
+
+In batch mode, every profile matching a glob pattern is backed up
+instead of a single profile selected by the user.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -37,10 +40,12 @@ class GatherBackupData():
         self.__data_files = None
         self.__game_dir = None
         self.__desktop_dir = None
-        self.__profile_list = None
+        self.__profile_table = None
         self.__backup_profile = None
         self.__creature_mind = None
         self.__backup_data = None
+        self.__pattern = None
+        self.__batch_data = None
 
     def gather_data(self):
         """
@@ -54,17 +59,25 @@ class GatherBackupData():
         }
 
         # Steps to be completed
-        steps = [
-            self.__locate_game_dir,
-            self.__locate_desktop_dir,
-            self.__read_profiles,
-            self.__select_backup_profile,
-            self.__locate_creature_mind
-        ]
+        if self.__pattern is not None:
+            steps = [
+                self.__locate_game_dir,
+                self.__locate_desktop_dir,
+                self.__read_profiles,
+                self.__gather_batch_data
+            ]
+        else:
+            steps = [
+                self.__locate_game_dir,
+                self.__locate_desktop_dir,
+                self.__read_profiles,
+                self.__select_backup_profile,
+                self.__locate_creature_mind
+            ]
 
         # Check each step for success, return failure message if any step fails
         for step_method in steps:
-            step_result = step_method()
+            step_result = self.__data_files.trace.run_step(step_method)
             if not step_result["success"]:
                 result["message"] = \
                     self.__data_files.lang["gather_backup_data"][1]
@@ -72,7 +85,21 @@ class GatherBackupData():
                 return result
 
         # If all steps succeeded, collect and return backup data
-        self.__backup_data = {
+        if self.__pattern is None:
+            self.__backup_data = self.__combine_data()
+
+        # when everything has been successfully completed
+        result["success"] = True
+        result["message"] = self.__data_files.lang["gather_backup_data"][0]
+
+        return result
+
+    def __combine_data(self):
+        """
+        Returns:
+            dict: Backup data of the current profile
+        """
+        return {
             "game_dir": self.__game_dir,
             "desktop_dir": self.__desktop_dir,
             "backup_profile": self.__backup_profile,
@@ -83,9 +110,29 @@ class GatherBackupData():
                 )
         }
 
-        # when everything has been successfully completed
-        result["success"] = True
-        result["message"] = self.__data_files.lang["gather_backup_data"][0]
+    def __gather_batch_data(self):
+        """
+        Collects the backup data of every profile matching the pattern.
+        Profiles whose creature mind file cannot be located are skipped.
+
+        Stores the list in 'self.__batch_data'.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        self.__batch_data = []
+        for profile in self.__profile_table.match(self.__pattern):
+            self.__backup_profile = profile
+            print(self.__data_files.lang["select_profile"][3], profile)
+            if self.__locate_creature_mind()["success"]:
+                self.__batch_data.append(self.__combine_data())
+
+        if self.__batch_data:
+            result["success"] = True
+        else:
+            print(self.__data_files.lang["batch"][2], self.__pattern)
 
         return result
 
@@ -99,6 +146,8 @@ class GatherBackupData():
         game_dir.set_data(
             self.__data_files.conf["reg_hive"],
             self.__data_files.conf["game_dir"])
+        game_dir.set_session(self.__data_files.registry)
+        game_dir.set_cache(self.__data_files.discovery)
         result = game_dir.locate_dir()
         if result["success"]:
             self.__game_dir = game_dir.get_dir()
@@ -120,10 +169,24 @@ class GatherBackupData():
 
         Stores the path in 'self.__desktop_dir'.
         """
+        # A destination given on the command line replaces the desktop
+        if self.__data_files.opts.get("dest") is not None:
+            self.__desktop_dir = self.__data_files.opts["dest"]
+            print(
+                self.__data_files.lang['desktop_dir'][0],
+                self.__desktop_dir
+            )
+            return {
+                "success": True,
+                "message": None
+            }
+
         desktop_dir = LocateDir()
         desktop_dir.set_data(
             self.__data_files.conf["reg_hive"],
             self.__data_files.conf["desktop_dir"])
+        desktop_dir.set_session(self.__data_files.registry)
+        desktop_dir.set_cache(self.__data_files.discovery)
         result = desktop_dir.locate_dir()
         if result["success"]:
             self.__desktop_dir = desktop_dir.get_dir()
@@ -143,7 +206,7 @@ class GatherBackupData():
         """
         Lists available profiles.
 
-        Stores the list in 'self.__profile_list'.
+        Stores the profiles in 'self.__profile_table'.
         """
         profile_list = ReadProfiles()
         profile_list.set_data(
@@ -151,12 +214,14 @@ class GatherBackupData():
             self.__data_files.conf["profiles"],
             self.__data_files.lang["profile_list"][2]
         )
+        profile_list.set_session(self.__data_files.registry)
+        profile_list.set_cache(self.__data_files.discovery)
         result = profile_list.read_profiles()
         if result["success"]:
-            self.__profile_list = profile_list.get_profile_list()
+            self.__profile_table = profile_list.get_profile_table()
             print(
                 self.__data_files.lang["profile_list"][0],
-                self.__profile_list
+                self.__profile_table.get_names()
             )
         else:
             print(
@@ -175,8 +240,9 @@ class GatherBackupData():
         backup_profile = SelectBackupProfile()
         backup_profile.set_data(
             self.__data_files.lang["select_profile"],
-            self.__profile_list
+            self.__profile_table.get_names()
         )
+        backup_profile.set_preset(self.__data_files.opts.get("profile"))
         result = backup_profile.select_profile()
         if result["success"]:
             self.__backup_profile = backup_profile.get_backup_profile()
@@ -201,6 +267,8 @@ class GatherBackupData():
             self.__data_files.conf["profiles"],
             self.__backup_profile
         )
+        creature_mind.set_session(self.__data_files.registry)
+        creature_mind.set_table(self.__profile_table)
         result = creature_mind.locate_file()
         if result["success"]:
             self.__creature_mind = creature_mind.get_mind_file()
@@ -229,6 +297,25 @@ class GatherBackupData():
         """
         return self.__backup_data
 
+    def get_batch_data(self):
+        """
+        Getter
+
+        Returns:
+            list: Necessary backup data of every matching profile
+        """
+        return self.__batch_data
+
+    def set_pattern(self, pattern):
+        """
+        Setter
+
+        Params:
+            pattern (str): Glob pattern of the profiles to back up
+                           in batch mode, None to select one profile
+        """
+        self.__pattern = pattern
+
     def set_data(self, data_files):
         """
         Setter
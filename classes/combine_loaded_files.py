@@ -18,7 +18,13 @@ Combines loaded language and configuration files
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import os
 from dataclasses import dataclass
+from dataclasses import field
+from modules.misc.step_trace import StepTrace
+from modules.registry_operation.discovery_cache import DiscoveryCache
+from modules.registry_operation.registry_session import RegistrySession
+from modules.registry_operation.registry_session import open_backend
 from modules.settings.load_config import LoadConfig
 from modules.settings.load_language import LoadLanguage
 
@@ -27,9 +33,22 @@ from modules.settings.load_language import LoadLanguage
 class CombinedData:
     """
     Dataclass to hold combined files.
+
+    'opts' holds the command line options (profile, archive, dest,
+    overwrite, pattern, components, differential) and whether an action
+    runs without prompts (unattended).
+    'trace' records the pipeline steps once tracing is enabled.
+    'registry' is the registry session all modules read and write
+    the registry through.
+    'discovery' holds the located directories and profiles of earlier
+    runs, None if the cache is disabled.
     """
     conf: dict
     lang: dict
+    opts: dict = field(default_factory=dict)
+    trace: StepTrace = field(default_factory=StepTrace)
+    registry: RegistrySession = None
+    discovery: DiscoveryCache = None
 
 
 class CombineLoadedFiles():
@@ -39,6 +58,10 @@ class CombineLoadedFiles():
 
     def __init__(self):
         self.__data_files = None
+        self.__registry = None
+        self.__discovery = None
+        self.__registry_backend = None
+        self.__registry_file = None
 
     def combine_files(self):
         """
@@ -56,8 +79,17 @@ class CombineLoadedFiles():
         lang_file = None
 
         try:
-            # Loads the language file
+            # Loads the config file, it selects the registry backend
+            config_loader = LoadConfig()
+            config_loader_result = config_loader.load_config_file()
+            if config_loader_result["success"]:
+                config_file = config_loader.get_config_file()
+            registry_result = self.__open_registry(config_file)
+
+            # Loads the language file, the system language is read
+            # from the registry
             lang_loader = LoadLanguage()
+            lang_loader.set_session(self.__registry)
             lang_loader_result = lang_loader.load_lang_file()
             if lang_loader_result["success"]:
                 lang_file = lang_loader.get_lang_file()
@@ -69,11 +101,7 @@ class CombineLoadedFiles():
                     )
                 return result
 
-            # Loads the config file
-            config_loader = LoadConfig()
-            config_loader_result = config_loader.load_config_file()
             if config_loader_result["success"]:
-                config_file = config_loader.get_config_file()
                 print(lang_file["load_config"][0])
             else:
                 print(
@@ -82,8 +110,19 @@ class CombineLoadedFiles():
                     )
                 return result
 
+            if registry_result["success"]:
+                print(lang_file["open_registry"][0])
+            else:
+                print(
+                    f"{lang_file['open_registry'][1]} "
+                    f"({registry_result['message']})"
+                    )
+                return result
+
             # Combine and store files
-            self.__data_files = CombinedData(config_file, lang_file)
+            self.__data_files = CombinedData(
+                config_file, lang_file, registry=self.__registry,
+                discovery=self.__discovery)
             result["success"] = True
 
         except OSError as e:
@@ -91,6 +130,46 @@ class CombineLoadedFiles():
 
         return result
 
+    def __open_registry(self, config_file):
+        """
+        Attempts to open the registry session with the configured backend.
+
+        If successful, the session will be stored in 'self.__registry'
+        and the discovery cache in 'self.__discovery'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        # Without configuration there is no backend to open
+        if config_file is None:
+            return result
+
+        try:
+            registry_backend = \
+                self.__registry_backend or config_file["registry_backend"]
+            registry_file = \
+                self.__registry_file or config_file["registry_file"]
+            self.__registry = RegistrySession(
+                open_backend(registry_backend, registry_file))
+
+            # Cached results are only valid for the same registry
+            if config_file["discovery_cache"]:
+                registry_id = f"{registry_backend}:"
+                if registry_file:
+                    registry_id += os.path.abspath(registry_file)
+                self.__discovery = DiscoveryCache(
+                    config_file["discovery_cache"], registry_id)
+            result["success"] = True
+
+        except (KeyError, ValueError) as e:
+            result["message"] = str(e)
+
+        return result
+
     def get_files(self):
         """
         Getter
@@ -99,3 +178,15 @@ class CombineLoadedFiles():
             dict: Combined configuration and language files
         """
         return self.__data_files
+
+    def set_registry(self, registry_backend, registry_file):
+        """
+        Setter
+
+        Params:
+            registry_backend (str): Registry backend replacing the
+                                    configured one
+            registry_file (str): JSON file of the 'file' backend
+        """
+        self.__registry_backend = registry_backend
+        self.__registry_file = registry_file
@@ -20,7 +20,7 @@ Deletes existing profile data when overwrite is selected by the user.
 
 import os
 import shutil
-import winreg
+from modules.zip_operation.extract_direct import COMPONENTS
 
 
 class DeleteOldFiles():
@@ -31,6 +31,7 @@ class DeleteOldFiles():
     def __init__(self):
         self.__data_files = None
         self.__restore_data = None
+        self.__components = COMPONENTS
 
     def delete_files(self):
         """
@@ -43,17 +44,20 @@ class DeleteOldFiles():
             "message": None
         }
 
-        # Steps to be completed
-        steps = [
-            self.__delete_reg,
-            self.__delete_profile_dir,
-            self.__delete_mind_file,
-            self.__delete_physique_file
-        ]
+        # Steps to be completed for the selected components
+        component_steps = {
+            "registry": [self.__delete_reg],
+            "profile": [self.__delete_profile_dir],
+            "creature": [self.__delete_mind_file, self.__delete_physique_file]
+        }
+        steps = []
+        for component, methods in component_steps.items():
+            if component in self.__components:
+                steps.extend(methods)
 
         # Check each step for success, return failure message
         for step_method in steps:
-            step_result = step_method()
+            step_result = self.__data_files.trace.run_step(step_method)
             if not step_result["success"]:
                 result["message"] = \
                     self.__data_files.lang["delete_old_files"][1]
@@ -79,12 +83,13 @@ class DeleteOldFiles():
 
         try:
             # Sets registry path
-            reg_hive = winreg.__dict__[self.__data_files.conf["reg_hive"]]
             reg_subkey = self.__data_files.conf["profiles"][0] + \
+                self.__data_files.conf["profiles"][1] + \
                 "\\" + self.__restore_data["backup_profile"]
 
-            # Deletes the registry key
-            winreg.DeleteKey(reg_hive, reg_subkey)
+            # Deletes the registry key with its sub keys
+            self.__data_files.registry.delete_tree(
+                self.__data_files.conf["reg_hive"], reg_subkey)
 
             result["success"] = True
 
@@ -196,3 +201,12 @@ class DeleteOldFiles():
         """
         self.__data_files = data_files
         self.__restore_data = restore_data
+
+    def set_components(self, components):
+        """
+        Setter
+
+        Params:
+            components (tuple): Components to delete, see COMPONENTS
+        """
+        self.__components = components
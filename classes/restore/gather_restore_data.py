@@ -22,10 +22,10 @@ Gathers the necessary files for recovery
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
+from modules.catalog_operation.list_backups import ListBackups
 from modules.misc.read_backup_data import ReadBackupData
 from modules.misc.select_restore_profile import SelectRestoreProfile
 from modules.registry_operation.locate_dir import LocateDir
-from modules.zip_operation.unzip_files import UnzipBackup
 
 
 class GatherRestoreData():
@@ -35,8 +35,8 @@ class GatherRestoreData():
 
     def __init__(self):
         self.__data_files = None
+        self.__backups = None
         self.__backup_file = None
-        self.__temp_dir = None
         self.__backup_data = None
         self.__restore_data = None
         self.__game_dir = None
@@ -52,10 +52,11 @@ class GatherRestoreData():
             "message": None
         }
 
-        # Steps to be completed
+        # Steps to be completed, the archive is not extracted
+        # before the existing profile data has been checked
         steps = [
+            self.__list_backups,
             self.__select_backup,
-            self.__unzip_backup,
             self.__read_backup_data,
             self.__locate_game_dir,
             self.__combine_data
@@ -64,7 +65,7 @@ class GatherRestoreData():
         # Check each step for success, return failure message
         # if any step fails
         for step_method in steps:
-            step_result = step_method()
+            step_result = self.__data_files.trace.run_step(step_method)
             if not step_result["success"]:
                 result["message"] = \
                     self.__data_files.lang["gather_restore_data"][1]
@@ -77,6 +78,33 @@ class GatherRestoreData():
 
         return result
 
+    def __list_backups(self):
+        """
+        Reads the backups recorded in the catalog.
+
+        Stores them in 'self.__backups', only those of the profile
+        given with --profile if any. Without a catalog the backup can
+        still be selected by its path.
+        """
+        list_backups = ListBackups()
+        list_backups.set_data(
+            self.__data_files.conf["catalog_file"],
+            self.__data_files.opts.get("profile")
+        )
+        result = list_backups.list_backups()
+        if result["success"]:
+            self.__backups = list_backups.get_backups()
+        else:
+            print(
+                f"{self.__data_files.lang['catalog'][2]} "
+                f"({result['message']})"
+            )
+
+        return {
+            "success": True,
+            "message": result["message"]
+        }
+
     def __select_backup(self):
         """
         User selects the profile to be restored.
@@ -85,6 +113,8 @@ class GatherRestoreData():
         """
         restore_backup = SelectRestoreProfile()
         restore_backup.set_data(self.__data_files.lang["restore_file"])
+        restore_backup.set_backups(self.__backups)
+        restore_backup.set_preset(self.__data_files.opts.get("archive"))
         result = restore_backup.select_profile()
         if result["success"]:
             self.__backup_file = restore_backup.get_restore_profile()
@@ -100,23 +130,6 @@ class GatherRestoreData():
 
         return result
 
-    def __unzip_backup(self):
-        """
-        Unpack the backup archive.
-        """
-        unzip_backup = UnzipBackup()
-        unzip_backup.set_data(self.__backup_file, self.__temp_dir)
-        result = unzip_backup.unzip_backup()
-        if result["success"]:
-            print(self.__data_files.lang["unzip_backup"][0])
-        else:
-            print(
-                f"{self.__data_files.lang['unzip_backup'][1]} "
-                f"({result['message']})"
-            )
-
-        return result
-
     def __read_backup_data(self):
         """
         Read neccessary data from backup_info.json
@@ -124,7 +137,8 @@ class GatherRestoreData():
         Stores the data in 'self.__backup_data'
         """
         read_data = ReadBackupData()
-        read_data.set_data(self.__temp_dir)
+        read_data.set_data(
+            self.__backup_file, self.__data_files.conf["backup_info"])
         result = read_data.read_data()
         if result["success"]:
             self.__backup_data = read_data.get_backup_data()
@@ -143,10 +157,25 @@ class GatherRestoreData():
 
         Stores the path in 'self.__game_dir'.
         """
+        # A destination given on the command line replaces the game
+        # directory of the installation
+        if self.__data_files.opts.get("dest") is not None:
+            self.__game_dir = self.__data_files.opts["dest"]
+            print(
+                self.__data_files.lang["game_dir"][0],
+                self.__game_dir
+            )
+            return {
+                "success": True,
+                "message": None
+            }
+
         game_dir = LocateDir()
         game_dir.set_data(
             self.__data_files.conf["reg_hive"],
             self.__data_files.conf["game_dir"])
+        game_dir.set_session(self.__data_files.registry)
+        game_dir.set_cache(self.__data_files.discovery)
         result = game_dir.locate_dir()
         if result["success"]:
             self.__game_dir = game_dir.get_dir()
@@ -165,23 +194,32 @@ class GatherRestoreData():
     def __combine_data(self):
         """
         Takes the backup data from 'self.__backup_data' and
-        saves it along with the desktop and temporary
-        directory to 'self.__restore_data'.
+        saves it along with the game directory and the backup
+        file to 'self.__restore_data'.
         """
         result = {
             "success": False
         }
 
-        self.__restore_data = self.__backup_data
+        # Manifest and compression entries are not needed for restore
+        self.__restore_data = {
+            key: self.__backup_data.get(key) for key in (
+                "backup_profile", "creature_mind", "creature_physique")
+        }
 
-        self.__restore_data.update({
-            "game_dir": self.__game_dir,
-            "temp_dir": self.__temp_dir
-        })
+        self.__restore_data["game_dir"] = self.__game_dir
 
-        if len(self.__restore_data) == 5:
+        if None not in self.__restore_data.values():
             result["success"] = True
 
+        # The members are read from the backup file, the temporary
+        # directory is added once the backup has been extracted
+        self.__restore_data.update({
+            "backup_file": self.__backup_file,
+            "backup_info": self.__backup_data,
+            "temp_dir": None
+        })
+
         return result
 
     def get_restore_data(self):
@@ -193,13 +231,11 @@ class GatherRestoreData():
         """
         return self.__restore_data
 
-    def set_data(self, data_files, temp_dir):
+    def set_data(self, data_files):
         """
         Setter
 
         Params:
             data_files (dict): Combined configurations and language data
-            temp_dir (str): Temporary directory path
         """
         self.__data_files = data_files
-        self.__temp_dir = temp_dir
@@ -20,7 +20,7 @@ exists and, if so, offers the option to overwrite it
 # If not, see <http://www.gnu.org/licenses/>.
 
 import os
-import winreg
+from modules.zip_operation.extract_direct import COMPONENTS
 
 
 class ProfileExistsCheck():
@@ -31,6 +31,7 @@ class ProfileExistsCheck():
     def __init__(self):
         self.__data_files = None
         self.__restore_data = None
+        self.__components = COMPONENTS
 
     def exists_check(self):
         """
@@ -42,16 +43,20 @@ class ProfileExistsCheck():
         """
         result = {
             "success": False,
+            "message": None,
             "overwrite": False
         }
 
-        # Steps to be completed
-        steps = [
-            self.__check_reg,
-            self.__check_profile_dir,
-            self.__check_mind_file,
-            self.__check_physique_file
-        ]
+        # Steps to be completed for the selected components
+        component_steps = {
+            "registry": [self.__check_reg],
+            "profile": [self.__check_profile_dir],
+            "creature": [self.__check_mind_file, self.__check_physique_file]
+        }
+        steps = []
+        for component, methods in component_steps.items():
+            if component in self.__components:
+                steps.extend(methods)
 
         # Set any_step_failed to False
         files_exist = False
@@ -68,6 +73,16 @@ class ProfileExistsCheck():
         if not files_exist:
             print(self.__data_files.lang["profile_exists_check"][0])
             result["success"] = True
+        elif self.__data_files.opts.get("overwrite") is not None:
+            # Decided beforehand on the command line
+            if self.__data_files.opts["overwrite"]:
+                print(self.__data_files.lang["profile_exists_check"][2])
+                result["success"] = True
+                result["overwrite"] = True
+            else:
+                result["message"] = \
+                    self.__data_files.lang["profile_exists_check"][3]
+                print(result["message"])
         else:
             while True:
                 user_query = input(
@@ -81,9 +96,9 @@ class ProfileExistsCheck():
                     result["overwrite"] = True
                     break
                 elif user_query == "n":
-                    print(
+                    result["message"] = \
                         self.__data_files.lang["profile_exists_check"][3]
-                    )
+                    print(result["message"])
                     return result
                 else:
                     continue
@@ -101,25 +116,14 @@ class ProfileExistsCheck():
             "success": False
         }
 
-        try:
-            # Sets registry path and opens registry key
-            reg_hive = winreg.__dict__[self.__data_files.conf["reg_hive"]]
-            reg_subkey = winreg.OpenKeyEx(
-                reg_hive,
-                self.__data_files.conf["profiles"][0] +
-                "\\" +
-                self.__restore_data["backup_profile"]
-                )
-
-            # Closes the registry key
-            winreg.CloseKey(reg_subkey)
-
-            # If a profile with this name exists
-            result["success"] = True
-
-        except OSError:
-            # If there is no profile with this name
-            result["success"] = False
+        # If a profile with this name exists
+        result["success"] = self.__data_files.registry.key_exists(
+            self.__data_files.conf["reg_hive"],
+            self.__data_files.conf["profiles"][0] +
+            self.__data_files.conf["profiles"][1] +
+            "\\" +
+            self.__restore_data["backup_profile"]
+            )
 
         return result
 
@@ -228,3 +232,12 @@ class ProfileExistsCheck():
         """
         self.__data_files = data_files
         self.__restore_data = restore_data
+
+    def set_components(self, components):
+        """
+        Setter
+
+        Params:
+            components (tuple): Components to check, see COMPONENTS
+        """
+        self.__components = components
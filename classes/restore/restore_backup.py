@@ -25,6 +25,8 @@ from modules.file_operation.copy_dir import CopyDir
 from modules.file_operation.copy_file import CopyFile
 from modules.registry_operation.import_regkey import ImportRegkey
 from modules.registry_operation.write_last_profile import WriteLastProfile
+from modules.zip_operation.extract_direct import COMPONENTS
+from modules.zip_operation.extract_direct import ExtractDirect
 
 
 class RestoreBackup():
@@ -35,6 +37,10 @@ class RestoreBackup():
     def __init__(self):
         self.__data_files = None
         self.__restore_data = None
+        self.__components = COMPONENTS
+        self.__differential = False
+        self.__reg_data = None
+        self.__report = None
 
     def restore_backup(self):
         """
@@ -47,18 +53,29 @@ class RestoreBackup():
             "message": None
         }
 
-        # Steps to be completed
-        steps = [
-            self.__copy_profile_dir,
-            self.__copy_mind_file,
-            self.__copy_physique_file,
-            self.__write_last_profile,
-            self.__import_reg_key
-        ]
+        # Steps to be completed for the selected components, a direct
+        # or differential restore extracts all of them in one step
+        if self.__data_files.conf["direct_restore"] or self.__differential:
+            steps = [self.__extract_direct]
+        else:
+            steps = []
+            if "profile" in self.__components:
+                steps.append(self.__copy_profile_dir)
+            if "creature" in self.__components:
+                steps.extend([
+                    self.__copy_mind_file,
+                    self.__copy_physique_file
+                ])
+
+        if "registry" in self.__components:
+            steps.extend([
+                self.__write_last_profile,
+                self.__import_reg_key
+            ])
 
         # Check each step for success, return failure message if any step fails
         for step_method in steps:
-            step_result = step_method()
+            step_result = self.__data_files.trace.run_step(step_method)
             if not step_result["success"]:
                 result["message"] = \
                     self.__data_files.lang["restore_backup"][1]
@@ -71,6 +88,85 @@ class RestoreBackup():
 
         return result
 
+    def check_backup(self):
+        """
+        Reads the selected components of the backup without writing
+        them, before existing profile data is deleted.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = self.__create_extract().check_backup()
+        if result["success"]:
+            print(self.__data_files.lang["check_backup"][0])
+        else:
+            print(
+                f"{self.__data_files.lang['check_backup'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __create_extract(self):
+        """
+        Returns:
+            ExtractDirect: Extraction of the selected components
+                           into the game directory
+        """
+        extract = ExtractDirect()
+        extract.set_data(
+            self.__restore_data["backup_file"],
+            self.__restore_data["backup_info"],
+            self.__restore_data["game_dir"],
+            self.__data_files.conf["profile_dir"],
+            self.__data_files.conf["mind_files"],
+            self.__data_files.conf["reg_file"],
+            self.__data_files.conf["backup_info"]
+        )
+        extract.set_components(self.__components)
+        extract.set_differential(self.__differential)
+
+        return extract
+
+    def __extract_direct(self):
+        """
+        Extracts the backup straight into the game directory.
+
+        Stores the registry file in 'self.__reg_data'.
+
+        Returns:
+            dict: The result of the extraction,
+                  including success status and message.
+        """
+        extract = self.__create_extract()
+        result = extract.extract_direct()
+        if result["success"]:
+            self.__reg_data = extract.get_reg_data()
+            print(
+                self.__data_files.lang["extract_direct"][0],
+                f"{extract.get_written() / 2**20:.1f} MB"
+            )
+            self.__report = {
+                "written": extract.get_written(),
+                "skipped": extract.get_skipped(),
+                "deleted": extract.get_deleted()
+            }
+            if self.__differential:
+                print(
+                    self.__data_files.lang["differential_restore"][0],
+                    f"{extract.get_skipped() / 2**20:.1f} MB"
+                )
+                print(
+                    self.__data_files.lang["differential_restore"][1],
+                    extract.get_deleted()
+                )
+        else:
+            print(
+                f"{self.__data_files.lang['extract_direct'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
     def __copy_profile_dir(self):
         """
         Copy the profile directory from the
@@ -95,6 +191,7 @@ class RestoreBackup():
 
         profile_dir = CopyDir()
         profile_dir.set_data(src_dir, dst_dir)
+        profile_dir.set_workers(self.__data_files.conf["copy_workers"])
         result = profile_dir.copy_dir()
         if result["success"]:
             print(self.__data_files.lang["copy_profile"][0])
@@ -187,6 +284,8 @@ class RestoreBackup():
             self.__restore_data["temp_dir"],
             self.__data_files.conf["reg_file"]
             )
+        key_import.set_reg_data(self.__reg_data)
+        key_import.set_session(self.__data_files.registry)
         result = key_import.import_regkey()
         if result["success"]:
             print(self.__data_files.lang["import_reg_key"][0])
@@ -212,6 +311,7 @@ class RestoreBackup():
             self.__data_files.conf["profiles"],
             self.__restore_data["backup_profile"]
             )
+        write_profile.set_session(self.__data_files.registry)
         result = write_profile.write_profile_name()
         if result["success"]:
             print(self.__data_files.lang["write_last_profile"][0])
@@ -223,6 +323,16 @@ class RestoreBackup():
 
         return result
 
+    def get_report(self):
+        """
+        Getter
+
+        Returns:
+            dict: Bytes written and skipped and files deleted by a
+                  direct restore, None otherwise
+        """
+        return self.__report
+
     def set_data(self, data_files, restore_data):
         """
         Setter
@@ -233,3 +343,22 @@ class RestoreBackup():
         """
         self.__data_files = data_files
         self.__restore_data = restore_data
+
+    def set_components(self, components):
+        """
+        Setter
+
+        Params:
+            components (tuple): Components to restore, see COMPONENTS
+        """
+        self.__components = components
+
+    def set_differential(self, differential):
+        """
+        Setter
+
+        Params:
+            differential (bool): Only rewrite the files that differ
+                                 from the backup
+        """
+        self.__differential = differential
@@ -36,6 +36,7 @@ class StartBackup():
     def __init__(self):
         self.__data_files = None
         self.__backup_data = None
+        self.__backup_file = None
 
     def start_backup(self):
         """
@@ -51,15 +52,18 @@ class StartBackup():
         # Gathers necessary backup data
         gather_result = self.__gather_data()
         if not gather_result["success"]:
+            result["message"] = gather_result["message"]
             return result
 
         # Creates the backup
         backup_result = self.__create_backup()
         if not backup_result["success"]:
+            result["message"] = backup_result["message"]
             return result
 
         # when everything has been successfully completed
         result["success"] = True
+        result["backup_file"] = self.__backup_file
 
         return result
 
@@ -87,8 +91,10 @@ class StartBackup():
         """
         create_backup = CreateBackup()
         create_backup.set_data(self.__data_files, self.__backup_data)
+        create_backup.set_overwrite(self.__data_files.opts.get("overwrite"))
         result = create_backup.create_backup()
         if result["success"]:
+            self.__backup_file = create_backup.get_backup_file()
             print(result["message"])
         else:
             print(result["message"])
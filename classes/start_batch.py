@@ -0,0 +1,284 @@
+"""
+Starts the batch backup.
+
+- Gathers the backup data of every profile, or of the profiles
+  matching a glob pattern
+
+- Asks once whether existing backup files are overwritten
+
+- Exports the registry keys of all profiles in one pass
+
+- Backs the profiles up side by side, each with its own temporary
+  directory and archive, and prints the time per profile and the
+  total throughput
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from classes.backup.create_backup import CreateBackup
+from classes.backup.gather_backup_data import GatherBackupData
+from modules.misc.file_checksum import collect_files
+from modules.registry_operation.export_profiles import ExportProfiles
+from modules.zip_operation.archive_codecs import get_codec
+
+
+class StartBatch():
+    """
+    Class for running the batch backup
+    """
+
+    def __init__(self):
+        self.__data_files = None
+        self.__pattern = None
+        self.__batch_data = None
+        self.__overwrite = None
+        self.__reg_data = None
+        self.__results = None
+        self.__elapsed = None
+
+    def start_batch(self):
+        """
+        Starts the batch backup.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        # Gathers the backup data of the profiles
+        gather_result = self.__gather_data()
+        if not gather_result["success"]:
+            result["message"] = gather_result["message"]
+            return result
+
+        # Decides about existing backup files up front
+        self.__confirm_overwrite()
+
+        # Reads the registry keys of all profiles at once
+        self.__export_profiles()
+
+        # Backs up the profiles
+        self.__run_batch()
+        self.__print_summary()
+
+        # when every profile has been backed up
+        result["success"] = all(
+            entry["success"] for entry in self.__results)
+        result["profiles"] = self.__results
+
+        return result
+
+    def __gather_data(self):
+        """
+        Gathers the backup data of the profiles.
+
+        Stores the collected data in 'self.__batch_data'.
+        """
+        if self.__pattern is None:
+            self.__pattern = self.__data_files.opts.get("pattern")
+        if self.__pattern is None:
+            self.__pattern = input(self.__data_files.lang["batch"][0]) or "*"
+
+        gather_data = GatherBackupData()
+        gather_data.set_data(self.__data_files)
+        gather_data.set_pattern(self.__pattern)
+        result = gather_data.gather_data()
+        if result["success"]:
+            self.__batch_data = gather_data.get_batch_data()
+            print(result["message"])
+        else:
+            print(result["message"])
+            return result
+
+        return result
+
+    def __confirm_overwrite(self):
+        """
+        Asks once for all profiles whether existing backup files are
+        overwritten, the backups run unattended afterwards.
+
+        Stores the decision in 'self.__overwrite'.
+        """
+        # Decided beforehand on the command line
+        self.__overwrite = self.__data_files.opts.get("overwrite")
+        if self.__overwrite is not None:
+            return
+
+        # Incremental backups and the repository never overwrite
+        if self.__data_files.conf["backup_target"] == "repository" or \
+                self.__data_files.conf["incremental"]:
+            return
+
+        extension = get_codec(self.__data_files.conf["codec"])["extension"]
+        existing = [
+            backup_data["backup_profile"] for backup_data in self.__batch_data
+            if os.path.exists(os.path.join(
+                backup_data["desktop_dir"],
+                backup_data["backup_profile"] + extension))
+        ]
+        if not existing:
+            return
+
+        print(self.__data_files.lang["batch"][1], ", ".join(existing))
+        while True:
+            user_query = input(self.__data_files.lang["backup_exists"][0])
+            if user_query in ("y", "n"):
+                self.__overwrite = user_query == "y"
+                break
+            print(self.__data_files.lang["backup_exists"][3])
+
+    def __export_profiles(self):
+        """
+        Exports the profiles key once and splits it by profile, the
+        backups write their part instead of exporting it each.
+        Profiles missing in the export are exported by their backup.
+
+        Stores the .reg files in 'self.__reg_data'.
+        """
+        self.__reg_data = {}
+        if len(self.__batch_data) < 2:
+            return
+
+        key_export = ExportProfiles()
+        key_export.set_data(
+            self.__data_files.conf["reg_hive"],
+            self.__data_files.conf["profiles"]
+            )
+        key_export.set_session(self.__data_files.registry)
+        result = key_export.export_profiles()
+        if result["success"]:
+            self.__reg_data = key_export.get_reg_data()
+        else:
+            print(
+                f"{self.__data_files.lang['export_reg_key'][1]} "
+                f"({result['message']})"
+            )
+
+    def __run_batch(self):
+        """
+        Backs up the profiles with a bounded number of workers.
+
+        Stores the outcome per profile in 'self.__results'.
+        """
+        start = time.perf_counter()
+        with ThreadPoolExecutor(
+                self.__data_files.conf["batch_workers"] or None) as executor:
+            self.__results = list(
+                executor.map(self.__backup_profile, self.__batch_data))
+        self.__elapsed = time.perf_counter() - start
+
+    def __backup_profile(self, backup_data):
+        """
+        Creates the backup of one profile in its own temporary directory.
+
+        Returns:
+            dict: Profile, success, seconds, size of the backed up files
+                  and path to the backup file
+        """
+        start = time.perf_counter()
+
+        create_backup = CreateBackup()
+        create_backup.set_data(self.__data_files, backup_data)
+        create_backup.set_overwrite(self.__overwrite)
+        create_backup.set_reg_data(
+            self.__reg_data.get(backup_data["backup_profile"]))
+        create_backup.set_temp_name(
+            f"{self.__data_files.conf['temp']}_"
+            f"{backup_data['backup_profile']}"
+        )
+        result = create_backup.create_backup()
+
+        return {
+            "profile": backup_data["backup_profile"],
+            "success": result["success"],
+            "seconds": time.perf_counter() - start,
+            "bytes": self.__source_size(backup_data),
+            "backup_file": create_backup.get_backup_file()
+        }
+
+    def __source_size(self, backup_data):
+        """
+        Returns:
+            int: Size of the profile directory and creature files
+        """
+        mind_dir = os.path.join(
+            backup_data["game_dir"], self.__data_files.conf["mind_files"])
+        sources = [
+            (os.path.join(
+                backup_data["game_dir"],
+                self.__data_files.conf["profile_dir"],
+                backup_data["backup_profile"]), ""),
+            (os.path.join(mind_dir, backup_data["creature_mind"]), ""),
+            (os.path.join(mind_dir, backup_data["creature_physique"]), "")
+        ]
+        try:
+            return sum(
+                os.path.getsize(file_path)
+                for file_path, _ in collect_files(sources))
+        except OSError:
+            return 0
+
+    def __print_summary(self):
+        """
+        Prints the time per profile and the total throughput.
+        """
+        print(self.__data_files.lang["batch"][3])
+        for entry in self.__results:
+            status = self.__data_files.lang["batch"][
+                4 if entry["success"] else 5]
+            print(
+                f"{status:<8}{entry['profile']:<24}"
+                f"{entry['seconds']:>8.2f}s  "
+                f"{entry['bytes'] / 2**20:>8.1f} MB  "
+                f"{entry['backup_file'] or ''}"
+            )
+
+        total = sum(
+            entry["bytes"] for entry in self.__results if entry["success"])
+        print(
+            self.__data_files.lang["batch"][6],
+            f"{sum(entry['success'] for entry in self.__results)}"
+            f"/{len(self.__results)},",
+            f"{total / 2**20:.1f} MB,",
+            f"{self.__elapsed:.2f}s,",
+            f"{total / 2**20 / self.__elapsed if self.__elapsed else 0:.1f}"
+            " MB/s"
+        )
+
+    def set_data(self, data_files):
+        """
+        Setter
+
+        Params:
+            data_files (dict): Combined configurations and language data
+        """
+        self.__data_files = data_files
+
+    def set_pattern(self, pattern):
+        """
+        Setter
+
+        Params:
+            pattern (str): Glob pattern of the profiles,
+                           None to ask the user
+        """
+        self.__pattern = pattern
@@ -0,0 +1,139 @@
+"""
+Starts the catalog rescan.
+
+- Locates the desktop directory holding the backups
+
+- Reconciles the backup catalog with the archives on the desktop and
+  the manifests of the chunk repository
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from modules.catalog_operation.rescan_catalog import RescanCatalog
+from modules.registry_operation.locate_dir import LocateDir
+
+
+class StartRescan():
+    """
+    Class for running the catalog rescan
+    """
+
+    def __init__(self):
+        self.__data_files = None
+        self.__desktop_dir = None
+        self.__counts = None
+
+    def start_rescan(self):
+        """
+        Starts the rescan.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        # Locates the directory of the backups
+        desktop_result = self.__locate_desktop_dir()
+        if not desktop_result["success"]:
+            result["message"] = desktop_result["message"]
+            return result
+
+        # Updates the catalog
+        rescan_result = self.__rescan_catalog()
+        if not rescan_result["success"]:
+            result["message"] = rescan_result["message"]
+            return result
+
+        # when everything has been successfully completed
+        result["success"] = True
+        result["counts"] = self.__counts
+
+        return result
+
+    def __locate_desktop_dir(self):
+        """
+        Locates the desktop directory.
+
+        Stores the path in 'self.__desktop_dir'.
+        """
+        desktop_dir = LocateDir()
+        desktop_dir.set_data(
+            self.__data_files.conf["reg_hive"],
+            self.__data_files.conf["desktop_dir"])
+        desktop_dir.set_session(self.__data_files.registry)
+        desktop_dir.set_cache(self.__data_files.discovery)
+        result = desktop_dir.locate_dir()
+        if result["success"]:
+            self.__desktop_dir = desktop_dir.get_dir()
+            print(
+                self.__data_files.lang['desktop_dir'][0],
+                self.__desktop_dir
+            )
+        else:
+            print(
+                f"{self.__data_files.lang['desktop_dir'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __rescan_catalog(self):
+        """
+        Reconciles the catalog with the backups on disk.
+        """
+        rescan_catalog = RescanCatalog()
+        rescan_catalog.set_data(
+            self.__data_files.conf["catalog_file"],
+            [
+                self.__desktop_dir,
+                os.path.join(
+                    self.__desktop_dir,
+                    self.__data_files.conf["repository_dir"],
+                    "manifests"
+                )
+            ],
+            self.__data_files.conf["backup_info"]
+        )
+        result = rescan_catalog.rescan_catalog()
+        if result["success"]:
+            counts = self.__counts = rescan_catalog.get_counts()
+            print(
+                self.__data_files.lang["catalog"][3],
+                ", ".join(
+                    f"{self.__data_files.lang['catalog_counts'][key]} "
+                    f"{counts[key]}" for key in counts
+                )
+            )
+        else:
+            print(
+                f"{self.__data_files.lang['catalog'][4]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def set_data(self, data_files):
+        """
+        Setter
+
+        Params:
+            data_files (dict): Combined configurations and language data
+        """
+        self.__data_files = data_files
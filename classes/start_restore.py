@@ -28,6 +28,9 @@ from classes.restore.profile_exists_check import ProfileExistsCheck
 from classes.restore.restore_backup import RestoreBackup
 from modules.file_operation.create_temp_dir import CreateTempDir
 from modules.file_operation.delete_temp_dir import DeleteTempDir
+from modules.zip_operation.extract_direct import COMPONENTS
+from modules.zip_operation.extract_direct import member_component
+from modules.zip_operation.unzip_files import UnzipBackup
 
 
 class StartRestore():
@@ -39,6 +42,9 @@ class StartRestore():
         self.__data_files = None
         self.__restore_data = None
         self.__temp_dir = None
+        self.__components = None
+        self.__differential = None
+        self.__report = None
 
     def start_restore(self):
         """
@@ -51,39 +57,69 @@ class StartRestore():
             "message": None
         }
 
-        # Creates the temporary directory
-        temp_dir_result = self.__create_temp_dir()
-        if not temp_dir_result["success"]:
-            return result
+        # Restores everything unless components were selected
+        self.__components = \
+            self.__data_files.opts.get("components") or COMPONENTS
+        self.__differential = \
+            self.__data_files.opts.get("differential") or \
+            self.__data_files.conf["differential_restore"]
 
         # Gathers necessary restore data
         gather_result = self.__gather_data()
         if not gather_result["success"]:
-            self.__delete_temp_dir()
+            result["message"] = gather_result["message"]
             return result
 
-        # Checks if the profile already exists
+        # Checks if the profile already exists,
+        # nothing has been extracted yet
         check_exits_result = self.__check_if_data_exists()
         if not check_exits_result["success"]:
-            self.__delete_temp_dir()
+            result["message"] = check_exits_result["message"]
             return result
 
+        # Extracts the backup into the temporary directory, a direct or
+        # differential restore extracts straight into the game directory
+        # and reads the backup once before anything is deleted
+        if self.__data_files.conf["direct_restore"] or self.__differential:
+            if check_exits_result["overwrite"]:
+                check_result = self.__check_backup()
+                if not check_result["success"]:
+                    result["message"] = check_result["message"]
+                    return result
+
+        else:
+            temp_dir_result = self.__create_temp_dir()
+            if not temp_dir_result["success"]:
+                result["message"] = temp_dir_result["message"]
+                return result
+
+            unzip_result = self.__unzip_backup()
+            if not unzip_result["success"]:
+                result["message"] = unzip_result["message"]
+                self.__delete_temp_dir()
+                return result
+
         # If the profile already exists and is to be overwritten
         if check_exits_result["overwrite"]:
             # Deletes the profile files
             delete_result = self.__delete_old_files()
             if not delete_result["success"]:
+                result["message"] = delete_result["message"]
                 self.__delete_temp_dir()
                 return result
 
         # Restores the profile
         restore_result = self.__restore_profile()
         if not restore_result["success"]:
+            result["message"] = restore_result["message"]
             self.__delete_temp_dir()
             return result
 
         # when everything has been successfully completed
         result["success"] = True
+        result["backup_profile"] = self.__restore_data["backup_profile"]
+        if self.__report is not None:
+            result["report"] = self.__report
         self.__delete_temp_dir()
 
         return result
@@ -95,7 +131,7 @@ class StartRestore():
         Stores the collected data in 'self.__restore_data'.
         """
         gather_data = GatherRestoreData()
-        gather_data.set_data(self.__data_files, self.__temp_dir)
+        gather_data.set_data(self.__data_files)
         result = gather_data.gather_data()
         if result["success"]:
             self.__restore_data = gather_data.get_restore_data()
@@ -106,12 +142,50 @@ class StartRestore():
 
         return result
 
+    def __unzip_backup(self):
+        """
+        Unpack the selected components of the backup archive.
+        """
+        unzip_backup = UnzipBackup()
+        unzip_backup.set_data(
+            self.__restore_data["backup_file"], self.__temp_dir,
+            self.__data_files.conf["backup_info"])
+        if set(self.__components) != set(COMPONENTS):
+            unzip_backup.set_filter(
+                lambda name: member_component(
+                    name, self.__restore_data["backup_info"],
+                    self.__data_files.conf["reg_file"]
+                ) in self.__components)
+        result = unzip_backup.unzip_backup()
+        if result["success"]:
+            self.__restore_data["temp_dir"] = self.__temp_dir
+            print(self.__data_files.lang["unzip_backup"][0])
+        else:
+            print(
+                f"{self.__data_files.lang['unzip_backup'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __check_backup(self):
+        """
+        Checks that the backup can be read completely.
+        """
+        restore_backup = RestoreBackup()
+        restore_backup.set_data(self.__data_files, self.__restore_data)
+        restore_backup.set_components(self.__components)
+        restore_backup.set_differential(self.__differential)
+
+        return self.__data_files.trace.run_step(restore_backup.check_backup)
+
     def __check_if_data_exists(self):
         """
         Checks if the profile to be rebuilt already exists.
         """
         exists_check = ProfileExistsCheck()
         exists_check.set_data(self.__data_files, self.__restore_data)
+        exists_check.set_components(self.__components)
         result = exists_check.exists_check()
 
         return result
@@ -122,9 +196,22 @@ class StartRestore():
         """
         delete_files = DeleteOldFiles()
         delete_files.set_data(self.__data_files, self.__restore_data)
+
+        # A differential restore replaces the files itself,
+        # only the registry key is deleted beforehand
+        if self.__differential:
+            delete_files.set_components(tuple(
+                component for component in self.__components
+                if component == "registry"))
+        else:
+            delete_files.set_components(self.__components)
         result = delete_files.delete_files()
         if result["success"]:
-            print(result["message"])
+            if self.__differential:
+                print(self.__data_files.lang["differential_restore"][
+                    2 if "registry" in self.__components else 3])
+            else:
+                print(result["message"])
         else:
             print(result["message"])
             return result
@@ -137,8 +224,11 @@ class StartRestore():
         """
         restore_backup = RestoreBackup()
         restore_backup.set_data(self.__data_files, self.__restore_data)
+        restore_backup.set_components(self.__components)
+        restore_backup.set_differential(self.__differential)
         result = restore_backup.restore_backup()
         if result["success"]:
+            self.__report = restore_backup.get_report()
             print(result["message"])
         else:
             print(result["message"])
@@ -176,6 +266,9 @@ class StartRestore():
         """
         Delete the temporary directory
         """
+        if self.__temp_dir is None:
+            return
+
         delete_dir = DeleteTempDir()
         delete_dir.set_data(self.__temp_dir)
         result = delete_dir.delete_temp_dir()
@@ -0,0 +1,191 @@
+"""
+Starts the verification of backups.
+
+- Asks for the backup file or directory to verify, the desktop
+  directory holding the backups if none is entered
+
+- Hashes every member and prints the status and throughput per backup
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from modules.misc.verify_backup import VerifyBackup
+from modules.registry_operation.locate_dir import LocateDir
+
+
+class StartVerify():
+    """
+    Class for running the verification
+    """
+
+    def __init__(self):
+        self.__data_files = None
+        self.__backup_path = None
+        self.__report = None
+
+    def start_verify(self):
+        """
+        Starts the verification.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        # Asks for the backups to verify
+        select_result = self.__select_path()
+        if not select_result["success"]:
+            result["message"] = select_result["message"]
+            return result
+
+        # Verifies the backups
+        verify_result = self.__verify_backup()
+        result["report"] = self.__report
+        if not verify_result["success"]:
+            result["message"] = verify_result["message"]
+            return result
+
+        # when everything has been successfully completed
+        result["success"] = True
+
+        return result
+
+    def __select_path(self):
+        """
+        User enters a backup file or directory.
+
+        Stores the path in 'self.__backup_path'.
+        """
+        # A path given on the command line is taken without asking
+        if self.__data_files.opts.get("archive") is not None:
+            self.__backup_path = self.__data_files.opts["archive"]
+            return {
+                "success": True,
+                "message": None
+            }
+
+        # An action run without prompts checks the desktop directory
+        if self.__data_files.opts.get("unattended"):
+            return self.__locate_desktop_dir()
+
+        while True:
+            backup_path = input(self.__data_files.lang["verify"][0])
+
+            if not backup_path:
+                return self.__locate_desktop_dir()
+
+            if os.path.exists(backup_path):
+                self.__backup_path = backup_path
+                return {
+                    "success": True,
+                    "message": None
+                }
+
+            print(self.__data_files.lang["verify"][1])
+
+    def __locate_desktop_dir(self):
+        """
+        Locates the desktop directory.
+
+        Stores the path in 'self.__backup_path'.
+        """
+        desktop_dir = LocateDir()
+        desktop_dir.set_data(
+            self.__data_files.conf["reg_hive"],
+            self.__data_files.conf["desktop_dir"])
+        desktop_dir.set_session(self.__data_files.registry)
+        desktop_dir.set_cache(self.__data_files.discovery)
+        result = desktop_dir.locate_dir()
+        if result["success"]:
+            self.__backup_path = desktop_dir.get_dir()
+            print(
+                self.__data_files.lang['desktop_dir'][0],
+                self.__backup_path
+            )
+        else:
+            print(
+                f"{self.__data_files.lang['desktop_dir'][1]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __verify_backup(self):
+        """
+        Verifies the backups and prints the report.
+        """
+        verify_backup = VerifyBackup()
+        verify_backup.set_data(
+            self.__backup_path,
+            self.__data_files.conf["backup_info"],
+            self.__data_files.conf["verify_workers"]
+        )
+        result = verify_backup.verify_backup()
+        if result["message"] is not None:
+            print(
+                f"{self.__data_files.lang['verify'][3]} "
+                f"({result['message']})"
+            )
+            return result
+
+        report = self.__report = verify_backup.get_report()
+        if not report:
+            print(self.__data_files.lang["verify"][4])
+            return result
+
+        status = self.__data_files.lang["verify_status"]
+        for entry in report:
+            print(
+                f"{status[entry['status']]:<8}"
+                f"{entry['archive']}  {entry['files']} "
+                f"{self.__data_files.lang['verify'][5]}, "
+                f"{entry['bytes'] / 2**20:.1f} MB, "
+                f"{throughput(entry['bytes'], entry['seconds']):.1f} MB/s"
+            )
+            for error in entry["errors"]:
+                print(f"        {error}")
+
+        total = sum(entry["bytes"] for entry in report)
+        print(
+            self.__data_files.lang["verify"][2],
+            f"{sum(entry['status'] == 'ok' for entry in report)}"
+            f"/{len(report)},",
+            f"{total / 2**20:.1f} MB,",
+            f"{throughput(total, verify_backup.get_elapsed()):.1f} MB/s"
+        )
+
+        return result
+
+    def set_data(self, data_files):
+        """
+        Setter
+
+        Params:
+            data_files (dict): Combined configurations and language data
+        """
+        self.__data_files = data_files
+
+
+def throughput(size, seconds):
+    """
+    Returns:
+        float: MB per second
+    """
+    return size / 2**20 / seconds if seconds else 0.0
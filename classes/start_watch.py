@@ -0,0 +1,172 @@
+"""
+Starts the watch mode.
+
+- Gathers the information required for the backup once (game directory,
+  profile to be backed up, creature mind file, desktop path)
+
+- Watches the profile directory and the creature mind directory and
+  performs a backup every time the game has finished writing a save,
+  until the user presses Ctrl+C
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from classes.backup.create_backup import CreateBackup
+from classes.backup.gather_backup_data import GatherBackupData
+from modules.watch_operation.watch_dirs import create_watcher
+from modules.watch_operation.watch_dirs import wait_for_save
+
+
+class StartWatch():
+    """
+    Class for running the watch mode
+    """
+
+    def __init__(self):
+        self.__data_files = None
+        self.__backup_data = None
+
+    def start_watch(self):
+        """
+        Starts the watch mode.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        # Gathers necessary backup data
+        gather_result = self.__gather_data()
+        if not gather_result["success"]:
+            result["message"] = gather_result["message"]
+            return result
+
+        # Backs up every settled save
+        watch_result = self.__watch()
+        if not watch_result["success"]:
+            result["message"] = watch_result["message"]
+            return result
+
+        # when everything has been successfully completed
+        result["success"] = True
+
+        return result
+
+    def __gather_data(self):
+        """
+        Gathers necessary backup data.
+
+        Stores the collected data in 'self.__backup_data'.
+        """
+        gather_data = GatherBackupData()
+        gather_data.set_data(self.__data_files)
+        result = gather_data.gather_data()
+        if result["success"]:
+            self.__backup_data = gather_data.get_backup_data()
+            print(result["message"])
+        else:
+            print(result["message"])
+            return result
+
+        return result
+
+    def __watch(self):
+        """
+        Waits for saves and backs them up until interrupted.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        profile_dir = os.path.join(
+            self.__backup_data["game_dir"],
+            self.__data_files.conf["profile_dir"],
+            self.__backup_data["backup_profile"]
+        )
+        mind_dir = os.path.join(
+            self.__backup_data["game_dir"],
+            self.__data_files.conf["mind_files"]
+        )
+        creature_files = {
+            os.path.normcase(os.path.join(mind_dir, name)) for name in (
+                self.__backup_data["creature_mind"],
+                self.__backup_data["creature_physique"]
+            )
+        }
+
+        def is_relevant(path):
+            # Files of other creatures in the mind directory are ignored
+            path = os.path.normcase(path)
+            return path in creature_files or path.startswith(
+                os.path.normcase(os.path.join(profile_dir, "")))
+
+        try:
+            with create_watcher(
+                    [profile_dir, mind_dir],
+                    self.__data_files.conf["watch_poll_interval"]
+            ) as watcher:
+                print(self.__data_files.lang["watch"][0],
+                      profile_dir, mind_dir)
+
+                while True:
+                    changed = wait_for_save(
+                        watcher,
+                        self.__data_files.conf["watch_debounce"],
+                        is_relevant
+                    )
+                    print(self.__data_files.lang["watch"][1], len(changed))
+                    self.__create_backup()
+
+        except KeyboardInterrupt:
+            print(self.__data_files.lang["watch"][2])
+            result["success"] = True
+
+        except OSError as e:
+            result["message"] = str(f"Excpetion: {e}")
+            print(
+                f"{self.__data_files.lang['watch'][3]} "
+                f"({result['message']})"
+            )
+
+        return result
+
+    def __create_backup(self):
+        """
+        Create the backup, replacing the previous one without asking
+        unless overwriting was declined
+        """
+        overwrite = self.__data_files.opts.get("overwrite")
+        create_backup = CreateBackup()
+        create_backup.set_data(self.__data_files, self.__backup_data)
+        create_backup.set_overwrite(True if overwrite is None else overwrite)
+        result = create_backup.create_backup()
+        print(result["message"])
+
+        return result
+
+    def set_data(self, data_files):
+        """
+        Setter
+
+        Params:
+            data_files (dict): Combined configurations and language data
+        """
+        self.__data_files = data_files
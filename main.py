@@ -1,5 +1,15 @@
 """
 Tool for backing up and restoring black & white savegames.
+
+Without arguments the tool asks what to do. Given an action and its
+options on the command line it runs without any prompt, prints the
+result as JSON with --json and ends with exit code 0 on success and 1
+on failure, so it can be driven by schedulers and scripts:
+
+    python main.py backup --profile Alice --overwrite yes --json
+    python main.py restore --archive Alice.zip --dest "C:\\Games\\B&W"
+    python main.py batch --pattern "Player*" --dest D:\\Backups
+    python main.py verify --archive D:\\Backups
 """
 
 __version__ = "1.0"
@@ -20,9 +30,35 @@ __version__ = "1.0"
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import argparse
+import contextlib
+import json
+import sys
 from classes.combine_loaded_files import CombineLoadedFiles
 from classes.start_backup import StartBackup
+from classes.start_batch import StartBatch
+from classes.start_rescan import StartRescan
 from classes.start_restore import StartRestore
+from classes.start_verify import StartVerify
+from classes.start_watch import StartWatch
+from modules.zip_operation.extract_direct import COMPONENTS
+
+# Command line actions and their menu keys
+ACTIONS = {
+    "backup": "b",
+    "batch": "a",
+    "restore": "r",
+    "verify": "v",
+    "watch": "w",
+    "rescan": "s"
+}
+
+# Values of --overwrite
+OVERWRITE = {
+    "ask": None,
+    "yes": True,
+    "no": False
+}
 
 
 class Main():
@@ -32,23 +68,58 @@ class Main():
 
     def __init__(self):
         self.__data_files = None
+        self.__args = None
 
     def run_program(self):
         """
         Starts the program, loads important data and starts
         the query of what should happen.
+
+        Returns:
+            int: Exit code, 0 on success
         """
+        result = {
+            "success": False,
+            "message": None
+        }
 
-        try:
-            load_data_result = self.__load_data_files()
-            if load_data_result["success"]:
-                self.__choose_action()
-            else:
-                print("Error loading important data.")
+        # Human readable output goes to stderr when stdout carries JSON
+        with contextlib.redirect_stdout(
+                sys.stderr if self.__args.json else sys.stdout):
+            try:
+                load_data_result = self.__load_data_files()
+                if load_data_result["success"]:
+                    self.__data_files.opts = {
+                        "profile": self.__args.profile,
+                        "archive": self.__args.archive,
+                        "dest": self.__args.dest,
+                        "pattern": self.__args.pattern,
+                        "overwrite": OVERWRITE[self.__args.overwrite],
+                        "components": self.__args.only,
+                        "differential": self.__args.differential,
+                        "unattended": self.__args.action is not None
+                    }
+                    self.__data_files.trace.set_data(
+                        self.__args.trace or
+                        self.__data_files.conf["trace_file"])
+                    result = self.__choose_action()
+                    self.__write_trace()
+                    self.__data_files.registry.close()
+                    if self.__data_files.discovery is not None:
+                        self.__data_files.discovery.save()
+                else:
+                    print("Error loading important data.")
+
+            # Error processing of general OS errors
+            except OSError as e:
+                result["message"] = str(e)
+                print(e)
+
+        if self.__args.json:
+            print(json.dumps(
+                {"action": self.__args.action, **result}, default=str))
 
-        # Error processing of general OS errors
-        except OSError as e:
-            print(e)
+        return 0 if result["success"] else 1
 
     def __load_data_files(self):
         """
@@ -56,23 +127,50 @@ class Main():
         combined configuration and language files.
         """
         load_files = CombineLoadedFiles()
+        if self.__args.registry_file:
+            load_files.set_registry("file", self.__args.registry_file)
+        elif self.__args.wine_prefix:
+            load_files.set_registry("wine", self.__args.wine_prefix)
+        elif self.__args.hive:
+            load_files.set_registry("hive", self.__args.hive)
         result = load_files.combine_files()
         if result:
             self.__data_files = load_files.get_files()
 
         return result
 
+    def __write_trace(self):
+        """
+        Writes the recorded pipeline steps if tracing is enabled.
+        """
+        trace = self.__data_files.trace
+        if trace.get_trace_file() is None:
+            return
+
+        result = trace.write_trace()
+        if result["success"]:
+            print(self.__data_files.lang["trace"][0], trace.get_trace_file())
+        else:
+            print(
+                f"{self.__data_files.lang['trace'][1]} "
+                f"({result['message']})"
+            )
+
     def __run_backup(self):
         """
         Initializes StartBackup class to start the backup process.
         """
         backup = StartBackup()
         backup.set_data(self.__data_files)
-        result = backup.start_backup()
-        if result["success"]:
-            input(self.__data_files.lang["process_success"][0])
-        else:
-            input(self.__data_files.lang["process_success"][1])
+        return backup.start_backup()
+
+    def __run_batch(self):
+        """
+        Initializes StartBatch class to back up several profiles.
+        """
+        batch = StartBatch()
+        batch.set_data(self.__data_files)
+        return batch.start_batch()
 
     def __run_restore(self):
         """
@@ -80,29 +178,158 @@ class Main():
         """
         restore = StartRestore()
         restore.set_data(self.__data_files)
-        result = restore.start_restore()
-        if result["success"]:
-            input(self.__data_files.lang["process_success"][0])
-        else:
-            input(self.__data_files.lang["process_success"][1])
+        return restore.start_restore()
+
+    def __run_rescan(self):
+        """
+        Initializes StartRescan class to update the backup catalog.
+        """
+        rescan = StartRescan()
+        rescan.set_data(self.__data_files)
+        return rescan.start_rescan()
+
+    def __run_verify(self):
+        """
+        Initializes StartVerify class to verify backups.
+        """
+        verify = StartVerify()
+        verify.set_data(self.__data_files)
+        return verify.start_verify()
+
+    def __run_watch(self):
+        """
+        Initializes StartWatch class to back up every save automatically.
+        """
+        watch = StartWatch()
+        watch.set_data(self.__data_files)
+        return watch.start_watch()
 
     def __choose_action(self):
         """
-        Ask the user if they want to create or restore a backup.
+        Ask the user if they want to create, restore or verify a backup,
+        back up all profiles, watch for saves or rescan the backup catalog.
+
+        The action given on the command line is run without asking.
         """
+        actions = {
+            "b": self.__run_backup,
+            "a": self.__run_batch,
+            "r": self.__run_restore,
+            "v": self.__run_verify,
+            "w": self.__run_watch,
+            "s": self.__run_rescan
+        }
+
+        if self.__args.action is not None:
+            return actions[ACTIONS[self.__args.action]]()
+
         while True:
             choice = input(self.__data_files.lang["choose_action"][0])
 
-            if choice == 'b':
-                self.__run_backup()
-                break
-            elif choice == 'r':
-                self.__run_restore()
+            if choice in actions:
+                result = actions[choice]()
                 break
             else:
                 print(self.__data_files.lang["choose_action"][1])
 
+        if result["success"]:
+            input(self.__data_files.lang["process_success"][0])
+        else:
+            input(self.__data_files.lang["process_success"][1])
+
+        return result
+
+    def set_args(self, args):
+        """
+        Setter
+
+        Params:
+            args (argparse.Namespace): Parsed command line arguments
+        """
+        self.__args = args
+
+
+def parse_args(argv=None):
+    """
+    Parses the command line.
+
+    Params:
+        argv (list): Arguments, None for sys.argv
+
+    Returns:
+        argparse.Namespace: Parsed arguments
+    """
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "action", nargs="?", choices=ACTIONS,
+        help="action to run without asking, the menu is shown without")
+    parser.add_argument(
+        "--profile",
+        help="profile to back up or watch, a restore only lists the "
+             "backups of this profile")
+    parser.add_argument(
+        "--pattern", help="glob pattern of the profiles of a batch backup")
+    parser.add_argument(
+        "--archive",
+        help="backup to restore, file or directory to verify "
+             "(default for verify: the desktop directory)")
+    parser.add_argument(
+        "--dest",
+        help="directory for backup files instead of the desktop, "
+             "game directory to restore into")
+    parser.add_argument(
+        "--only", action="append", choices=COMPONENTS,
+        help="restore only this part of the backup, can be repeated "
+             "(default: all)")
+    parser.add_argument(
+        "--differential", action="store_true",
+        help="rewrite only the files that differ from the backup "
+             "and delete files that are not part of it")
+    parser.add_argument(
+        "--overwrite", choices=OVERWRITE,
+        help="replace existing backup files or profile data "
+             "(default: ask in the menu, yes with watch, no with "
+             "other actions)")
+    parser.add_argument(
+        "--trace", metavar="FILE",
+        help="write the time of every pipeline step as Chrome "
+             "trace-event JSON")
+    parser.add_argument(
+        "--registry-file", metavar="FILE",
+        help="read and write the registry in a JSON file instead of "
+             "the Windows registry")
+    parser.add_argument(
+        "--wine-prefix", metavar="DIR",
+        help="use the registry and drives of a Wine prefix, the "
+             "prefix must not be running")
+    parser.add_argument(
+        "--hive", metavar="NTUSER.DAT",
+        help="read the registry from the hive of a profile on a mounted "
+             "Windows disk, drive paths are looked up on that disk")
+    parser.add_argument(
+        "--json", action="store_true",
+        help="print the result as JSON, other output goes to stderr")
+    args = parser.parse_args(argv)
+
+    # Actions run unattended and must not stop at a prompt, watch
+    # replaces its previous backup unless told otherwise
+    if args.action is not None:
+        if args.overwrite is None:
+            args.overwrite = "yes" if args.action == "watch" else "no"
+        if args.action in ("backup", "watch") and args.profile is None:
+            parser.error(f"{args.action} requires --profile")
+        if args.action == "restore" and args.archive is None:
+            parser.error("restore requires --archive")
+        if args.action == "batch" and args.pattern is None:
+            args.pattern = "*"
+    elif args.overwrite is None:
+        args.overwrite = "ask"
+
+    return args
+
 
 if __name__ == "__main__":
     main = Main()
-    main.run_program()
+    main.set_args(parse_args())
+    sys.exit(main.run_program())
@@ -0,0 +1,162 @@
+"""
+Local SQLite catalog of the created backups
+
+The catalog holds one row per backup archive (or repository manifest),
+indexed by profile and by time, so backups can be listed and selected
+without opening the archives.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import sqlite3
+import zipfile
+from modules.zip_operation.archive_codecs import detect_container
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    archive_path TEXT PRIMARY KEY,
+    profile TEXT NOT NULL,
+    creature_mind TEXT,
+    creature_physique TEXT,
+    archive_size INTEGER NOT NULL,
+    archive_mtime REAL NOT NULL,
+    content_size INTEGER,
+    hashes TEXT,
+    codec TEXT,
+    parent TEXT
+);
+CREATE INDEX IF NOT EXISTS backups_profile
+    ON backups (profile, archive_mtime);
+CREATE INDEX IF NOT EXISTS backups_time
+    ON backups (archive_mtime);
+"""
+
+# Zip compression types of the codecs
+ZIP_CODECS = {
+    zipfile.ZIP_STORED: "zip-deflate",
+    zipfile.ZIP_DEFLATED: "zip-deflate",
+    zipfile.ZIP_BZIP2: "zip-bzip2",
+    zipfile.ZIP_LZMA: "zip-lzma"
+}
+
+
+def catalog_path(catalog_file):
+    """
+    Params:
+        catalog_file (str): File name of the catalog
+
+    Returns:
+        str: Path of the catalog in the data directory
+    """
+    return os.path.join(
+        os.path.dirname(__file__), "../../data", catalog_file)
+
+
+def connect_catalog(catalog_file):
+    """
+    Opens the catalog and creates its tables if necessary.
+
+    Params:
+        catalog_file (str): File name of the catalog
+
+    Returns:
+        sqlite3.Connection: Open catalog
+    """
+    connection = sqlite3.connect(catalog_path(catalog_file))
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def detect_codec(archive_file):
+    """
+    Determines the codec of an archive from its header.
+
+    Returns:
+        str: Name of the codec, 'repository' for manifests
+    """
+    container = detect_container(archive_file)
+
+    if container == "zip":
+        with zipfile.ZipFile(archive_file, "r") as zipf:
+            types = {info.compress_type for info in zipf.infolist()}
+        for compress_type in (zipfile.ZIP_LZMA, zipfile.ZIP_BZIP2):
+            if compress_type in types:
+                return ZIP_CODECS[compress_type]
+        return "zip-deflate"
+
+    if container == "tar":
+        return "tar.xz"
+
+    if container == "manifest":
+        return "repository"
+
+    return None
+
+
+def catalog_entry(archive_file, backup_info, codec):
+    """
+    Builds the catalog row of a backup.
+
+    Params:
+        archive_file (str): Path to the archive or manifest
+        backup_info (dict): Content of backup_info.json
+        codec (str): Name of the codec
+
+    Returns:
+        dict: Column values of the row
+    """
+    stat = os.stat(archive_file)
+    files = backup_info.get("files")
+
+    # Hashes of the whole manifest, otherwise of the archived files
+    if files:
+        hashes = {name: entry["hash"] for name, entry in files.items()}
+    else:
+        hashes = backup_info.get("checksums")
+
+    return {
+        "archive_path": os.path.abspath(archive_file),
+        "profile": backup_info["backup_profile"],
+        "creature_mind": backup_info.get("creature_mind"),
+        "creature_physique": backup_info.get("creature_physique"),
+        "archive_size": stat.st_size,
+        "archive_mtime": stat.st_mtime,
+        "content_size": sum(
+            entry["size"] for entry in files.values()) if files else None,
+        "hashes": json.dumps(hashes) if hashes else None,
+        "codec": codec,
+        "parent": backup_info.get("parent")
+    }
+
+
+def store_entry(connection, entry):
+    """
+    Inserts or replaces a catalog row.
+
+    Params:
+        connection (sqlite3.Connection): Open catalog
+        entry (dict): Column values of the row
+    """
+    connection.execute(
+        f"INSERT OR REPLACE INTO backups ({', '.join(entry)}) "
+        f"VALUES ({', '.join('?' for _ in entry)})",
+        list(entry.values())
+    )
@@ -0,0 +1,99 @@
+"""
+Lists the backups recorded in the catalog
+
+Newest backups first, optionally only those of one profile. The archives
+themselves are not opened, only their existence is checked.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+from modules.catalog_operation.catalog_db import connect_catalog
+
+
+class ListBackups():
+    """
+    Class to query the backup catalog
+    """
+
+    def __init__(self):
+        self.__catalog_file = None
+        self.__profile = None
+        self.__backups = None
+
+    def list_backups(self):
+        """
+        Attempts to read the backups from the catalog.
+
+        If successful, the backups will be stored in 'self.__backups'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            connection = connect_catalog(self.__catalog_file)
+            try:
+                if self.__profile is None:
+                    rows = connection.execute(
+                        "SELECT * FROM backups ORDER BY archive_mtime DESC"
+                    ).fetchall()
+                else:
+                    rows = connection.execute(
+                        "SELECT * FROM backups WHERE profile = ? "
+                        "ORDER BY archive_mtime DESC",
+                        (self.__profile,)
+                    ).fetchall()
+            finally:
+                connection.close()
+
+            # Archives deleted since the last rescan are left out
+            self.__backups = [
+                dict(row) for row in rows
+                if os.path.exists(row["archive_path"])
+            ]
+
+            result["success"] = True
+
+        except sqlite3.Error as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def get_backups(self):
+        """
+        Getter
+
+        Returns:
+            list: Catalog rows of the backups, newest first
+        """
+        return self.__backups
+
+    def set_data(self, catalog_file, profile=None):
+        """
+        Setter
+
+        Params:
+            catalog_file (str): File name of the catalog
+            profile (str): Only list backups of this profile, None for all
+        """
+        self.__catalog_file = catalog_file
+        self.__profile = profile
@@ -0,0 +1,85 @@
+"""
+Records a created backup in the catalog
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import sqlite3
+from modules.catalog_operation.catalog_db import catalog_entry
+from modules.catalog_operation.catalog_db import connect_catalog
+from modules.catalog_operation.catalog_db import store_entry
+
+
+class RecordBackup():
+    """
+    Class to add a backup to the catalog
+    """
+
+    def __init__(self):
+        self.__catalog_file = None
+        self.__backup_file = None
+        self.__info_file = None
+        self.__codec = None
+
+    def record_backup(self):
+        """
+        Attempts to insert the backup into the catalog.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            with open(self.__info_file, encoding="UTF-8") as json_file:
+                backup_info = json.load(json_file)
+
+            connection = connect_catalog(self.__catalog_file)
+            try:
+                with connection:
+                    store_entry(connection, catalog_entry(
+                        self.__backup_file, backup_info, self.__codec))
+            finally:
+                connection.close()
+
+            result["success"] = True
+
+        except (OSError, KeyError, sqlite3.Error) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def set_data(self, catalog_file, backup_file, temp_dir, backup_info,
+                 codec):
+        """
+        Setter
+
+        Params:
+            catalog_file (str): File name of the catalog
+            backup_file (str): Created archive or repository manifest
+            temp_dir (str): Temporary directory holding the backup info
+            backup_info (str): Name of the backup information file
+            codec (str): Name of the codec, 'repository' for manifests
+        """
+        self.__catalog_file = catalog_file
+        self.__backup_file = backup_file
+        self.__info_file = os.path.join(temp_dir, backup_info)
+        self.__codec = codec
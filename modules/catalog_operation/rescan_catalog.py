@@ -0,0 +1,165 @@
+"""
+Reconciles the catalog with the backups on disk
+
+Backups whose size and modification time match their catalog row are
+skipped without opening them. Only new or changed archives are read,
+and rows of deleted archives are removed.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sqlite3
+from tarfile import TarError
+from zipfile import BadZipFile
+from modules.catalog_operation.catalog_db import catalog_entry
+from modules.catalog_operation.catalog_db import connect_catalog
+from modules.catalog_operation.catalog_db import detect_codec
+from modules.catalog_operation.catalog_db import store_entry
+from modules.zip_operation.archive_codecs import read_backup_info
+
+# File endings of archives and repository manifests
+BACKUP_EXTENSIONS = (".zip", ".tar.xz", ".json")
+
+
+class RescanCatalog():
+    """
+    Class to rescan the backup directories
+    """
+
+    def __init__(self):
+        self.__catalog_file = None
+        self.__backup_dirs = None
+        self.__backup_info = None
+        self.__counts = None
+
+    def rescan_catalog(self):
+        """
+        Attempts to bring the catalog up to date.
+
+        If successful, the number of added, updated, removed and
+        unchanged backups will be stored in 'self.__counts'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        self.__counts = {
+            "added": 0,
+            "updated": 0,
+            "removed": 0,
+            "unchanged": 0
+        }
+
+        try:
+            connection = connect_catalog(self.__catalog_file)
+            try:
+                with connection:
+                    self.__reconcile(connection)
+            finally:
+                connection.close()
+
+            result["success"] = True
+
+        except (OSError, sqlite3.Error) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def __reconcile(self, connection):
+        """
+        Compares the catalog rows with the files on disk.
+
+        Params:
+            connection (sqlite3.Connection): Open catalog
+        """
+        known = {
+            row["archive_path"]: (row["archive_size"], row["archive_mtime"])
+            for row in connection.execute(
+                "SELECT archive_path, archive_size, archive_mtime "
+                "FROM backups")
+        }
+
+        for archive_file in self.__list_candidates():
+            stat = os.stat(archive_file)
+            state = known.get(archive_file)
+            if state == (stat.st_size, stat.st_mtime):
+                self.__counts["unchanged"] += 1
+                continue
+
+            # Archives of other programs are no backups and stay out
+            try:
+                backup_info = read_backup_info(
+                    archive_file, self.__backup_info)
+                entry = catalog_entry(
+                    archive_file, backup_info, detect_codec(archive_file))
+            except (KeyError, ValueError, BadZipFile, TarError):
+                continue
+
+            store_entry(connection, entry)
+            self.__counts["added" if state is None else "updated"] += 1
+
+        for archive_file in known:
+            if not os.path.exists(archive_file):
+                connection.execute(
+                    "DELETE FROM backups WHERE archive_path = ?",
+                    (archive_file,)
+                )
+                self.__counts["removed"] += 1
+
+    def __list_candidates(self):
+        """
+        Returns:
+            list: Absolute paths of the possible backups
+                  in the backup directories
+        """
+        candidates = []
+        for backup_dir in self.__backup_dirs:
+            if not os.path.isdir(backup_dir):
+                continue
+            for name in sorted(os.listdir(backup_dir)):
+                file_path = os.path.abspath(os.path.join(backup_dir, name))
+                if name.endswith(BACKUP_EXTENSIONS) and \
+                        os.path.isfile(file_path):
+                    candidates.append(file_path)
+
+        return candidates
+
+    def get_counts(self):
+        """
+        Getter
+
+        Returns:
+            dict: Number of added, updated, removed and unchanged backups
+        """
+        return self.__counts
+
+    def set_data(self, catalog_file, backup_dirs, backup_info):
+        """
+        Setter
+
+        Params:
+            catalog_file (str): File name of the catalog
+            backup_dirs (list): Directories holding archives or manifests
+            backup_info (str): Name of the backup information file
+        """
+        self.__catalog_file = catalog_file
+        self.__backup_dirs = backup_dirs
+        self.__backup_info = backup_info
@@ -1,5 +1,7 @@
 """
 Copies a specific directory and its contents.
+
+The files are copied concurrently by the copy engine.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,7 +20,8 @@ Copies a specific directory and its contents.
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import shutil
+import os
+from modules.file_operation.copy_engine import copy_tree
 
 
 class CopyDir():
@@ -29,6 +32,7 @@ class CopyDir():
     def __init__(self):
         self.__src_dir = None
         self.__dst_dir = None
+        self.__workers = 1
 
     def copy_dir(self):
         """
@@ -43,11 +47,11 @@ class CopyDir():
 
         try:
             # Copy from source to destination
-            shutil.copytree(self.__src_dir, self.__dst_dir)
+            copy_tree(self.__src_dir, self.__dst_dir, self.__workers)
 
             result["success"] = True
 
-        except FileNotFoundError as e:
+        except OSError as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -62,3 +66,13 @@ class CopyDir():
         """
         self.__src_dir = src_dir
         self.__dst_dir = dst_dir
+
+    def set_workers(self, workers):
+        """
+        Setter
+
+        Params:
+            workers (int): Number of copy threads,
+                           0 for one per processor
+        """
+        self.__workers = workers or os.cpu_count() or 1
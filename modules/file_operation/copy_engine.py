@@ -0,0 +1,221 @@
+"""
+Copies files with the fastest method the platform offers
+
+The data of a file is copied by the first method that works: a reflink
+clone (FICLONE) that shares the blocks on copy-on-write filesystems,
+an in-kernel copy with copy_file_range() or sendfile(), and finally a
+plain read/write loop. Methods the kernel or filesystem does not
+support fall back to the next one. Metadata is copied like
+shutil.copy2, directories are copied with a thread pool.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import errno
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+# Size of the blocks copied per call
+BLOCK_SIZE = 1024 * 1024
+
+# ioctl request cloning a whole file (Linux)
+FICLONE = 0x40049409
+
+# Copy methods, fastest first
+METHODS = ("reflink", "copy_file_range", "sendfile", "stream")
+
+# Errors telling that a method does not work for these files
+UNSUPPORTED_ERRORS = {
+    errno.ENOSYS, errno.EOPNOTSUPP, errno.ENOTSUP, errno.ENOTTY,
+    errno.EXDEV, errno.EINVAL, errno.EBADF, errno.ETXTBSY,
+    errno.ENOTSOCK, errno.EPERM
+}
+
+# Methods that failed, per pair of source and destination device,
+# the whole kernel for missing system calls (device None)
+unsupported = set()
+
+
+def _reflink(src, dst, size):
+    """
+    Clones the file, both files share their blocks until changed.
+    """
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "FICLONE is not available")
+    fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+
+
+def _copy_file_range(src, dst, size):
+    """
+    Copies the file inside the kernel, filesystems may
+    clone or copy server-side.
+    """
+    if not hasattr(os, "copy_file_range"):
+        raise OSError(errno.ENOSYS, "copy_file_range is not available")
+
+    copied = 0
+    while True:
+        count = os.copy_file_range(src.fileno(), dst.fileno(), BLOCK_SIZE)
+        if count == 0:
+            break
+        copied += count
+
+    # Some filesystems report nothing to copy instead of an error
+    if copied == 0 and size > 0:
+        raise OSError(errno.EOPNOTSUPP, "copy_file_range copied nothing")
+
+
+def _sendfile(src, dst, size):
+    """
+    Copies the file inside the kernel without user space buffers.
+    """
+    if not hasattr(os, "sendfile"):
+        raise OSError(errno.ENOSYS, "sendfile is not available")
+
+    offset = 0
+    while offset < size:
+        count = os.sendfile(
+            dst.fileno(), src.fileno(), offset, min(BLOCK_SIZE, size - offset))
+        if count == 0:
+            break
+        offset += count
+
+
+def _stream(src, dst, size):
+    """
+    Copies the file through user space, works everywhere.
+    """
+    shutil.copyfileobj(src, dst, BLOCK_SIZE)
+
+
+COPIERS = {
+    "reflink": _reflink,
+    "copy_file_range": _copy_file_range,
+    "sendfile": _sendfile,
+    "stream": _stream
+}
+
+
+def copy_data(src_path, dst_path, methods=METHODS):
+    """
+    Copies the content of a file with the first method that works.
+
+    Params:
+        src_path (str): Source file
+        dst_path (str): Destination file, replaced if it exists
+        methods (tuple): Methods to try, in order
+
+    Returns:
+        str: Name of the method that copied the file
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        src_stat = os.fstat(src.fileno())
+        devices = (src_stat.st_dev, os.fstat(dst.fileno()).st_dev)
+
+        for method in methods:
+            if (method, None) in unsupported or \
+                    (method, devices) in unsupported:
+                continue
+            try:
+                COPIERS[method](src, dst, src_stat.st_size)
+                return method
+            except OSError as e:
+                if method == "stream" or e.errno not in UNSUPPORTED_ERRORS:
+                    raise
+                unsupported.add(
+                    (method, None if e.errno == errno.ENOSYS else devices))
+
+                # Starts over after a partial copy
+                src.seek(0)
+                dst.seek(0)
+                dst.truncate()
+
+    raise OSError(errno.EOPNOTSUPP, f"No copy method worked: {src_path}")
+
+
+def copy_file(src_path, dst_path, methods=METHODS):
+    """
+    Copies a file with its metadata like shutil.copy2.
+
+    Params:
+        src_path (str): Source file
+        dst_path (str): Destination file or directory
+        methods (tuple): Methods to try, in order
+
+    Returns:
+        str: Name of the method that copied the file
+    """
+    if os.path.isdir(dst_path):
+        dst_path = os.path.join(dst_path, os.path.basename(src_path))
+
+    method = copy_data(src_path, dst_path, methods)
+    shutil.copystat(src_path, dst_path)
+
+    return method
+
+
+def copy_tree(src_dir, dst_dir, workers=1, methods=METHODS):
+    """
+    Copies a directory like shutil.copytree, the files are
+    copied concurrently.
+
+    Params:
+        src_dir (str): Source directory
+        dst_dir (str): Destination directory, must not exist
+        workers (int): Number of copy threads
+        methods (tuple): Methods to try, in order
+
+    Returns:
+        collections.Counter: Number of files per copy method
+    """
+    if not os.path.isdir(src_dir):
+        raise FileNotFoundError(
+            errno.ENOENT, "No such directory", src_dir)
+
+    os.makedirs(dst_dir)
+    dirs = [(src_dir, dst_dir)]
+    files = []
+    for root, dir_names, file_names in os.walk(src_dir, followlinks=True):
+        target_root = os.path.join(dst_dir, os.path.relpath(root, src_dir))
+        for name in dir_names:
+            os.makedirs(os.path.join(target_root, name), exist_ok=True)
+            dirs.append((os.path.join(root, name),
+                         os.path.join(target_root, name)))
+        for name in file_names:
+            files.append((os.path.join(root, name),
+                          os.path.join(target_root, name)))
+
+    if workers > 1:
+        with ThreadPoolExecutor(workers) as executor:
+            copied = list(executor.map(
+                lambda paths: copy_file(*paths, methods), files))
+    else:
+        copied = [copy_file(*paths, methods) for paths in files]
+
+    # Directory times last, copying the files changes them
+    for src_path, dst_path in reversed(dirs):
+        shutil.copystat(src_path, dst_path)
+
+    return collections.Counter(copied)
@@ -1,5 +1,7 @@
 """
 Copy a specific file
+
+The data is copied by the copy engine, in the kernel where possible.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,7 +20,7 @@ Copy a specific file
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import shutil
+from modules.file_operation.copy_engine import copy_file
 
 
 class CopyFile():
@@ -43,11 +45,11 @@ class CopyFile():
 
         try:
             # Copy from source to destination
-            shutil.copy2(self.__src_file, self.__dst_file)
+            copy_file(self.__src_file, self.__dst_file)
 
             result["success"] = True
 
-        except FileNotFoundError as e:
+        except OSError as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -0,0 +1,155 @@
+"""
+Checksums of backed up files
+
+Files are hashed with BLAKE2b in blocks of 1 MiB, so neither hashing a
+file on disk nor hashing an archive member needs more memory than one
+block. Backups hash every file while it is read for compression, so
+the checksums describe exactly the stored bytes and no file is read
+twice.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import os
+import zlib
+
+# Name of the hash recorded in backup_info.json
+CHECKSUM_ALGORITHM = "blake2b"
+
+BLOCK_SIZE = 1024 * 1024
+
+
+def collect_files(sources):
+    """
+    Lists the files of the sources.
+
+    Directories are walked recursively, their files are placed below
+    the given name.
+
+    Params:
+        sources (list): Tuples of source path (file or directory)
+                        and name inside the backup
+
+    Returns:
+        list: Tuples of file path and name inside the backup
+    """
+    files = []
+    for src_path, arcname in sources:
+        if not os.path.isdir(src_path):
+            if not os.path.isfile(src_path):
+                raise FileNotFoundError(src_path)
+            files.append((src_path, arcname))
+            continue
+
+        for root, _, names in os.walk(src_path):
+            for name in names:
+                file_path = os.path.join(root, name)
+                files.append((file_path, os.path.join(
+                    arcname, os.path.relpath(file_path, src_path))
+                ))
+
+    return files
+
+
+def hash_blocks(blocks):
+    """
+    Params:
+        blocks (iterable): Consecutive byte blocks of a file
+
+    Returns:
+        tuple: Hex digest and number of bytes hashed
+    """
+    digest = hashlib.new(CHECKSUM_ALGORITHM)
+    size = 0
+    for block in blocks:
+        digest.update(block)
+        size += len(block)
+    return digest.hexdigest(), size
+
+
+def hash_stream(stream):
+    """
+    Params:
+        stream (file): Binary file object, read to its end
+
+    Returns:
+        tuple: Hex digest and number of bytes read
+    """
+    return hash_blocks(iter(lambda: stream.read(BLOCK_SIZE), b""))
+
+
+def hash_file(file_path):
+    """
+    Returns:
+        str: BLAKE2b hash of the file
+    """
+    with open(file_path, "rb") as src:
+        return hash_stream(src)[0]
+
+
+class HashingReader():
+    """
+    Class to hash a binary stream while it is read
+    """
+
+    def __init__(self, stream):
+        self.__stream = stream
+        self.__digest = hashlib.new(CHECKSUM_ALGORITHM)
+
+    def read(self, size=-1):
+        """
+        Reads from the stream and adds the data to the hash.
+        """
+        data = self.__stream.read(size)
+        self.__digest.update(data)
+        return data
+
+    def hexdigest(self):
+        """
+        Returns:
+            str: BLAKE2b hash of the data read so far
+        """
+        return self.__digest.hexdigest()
+
+
+def add_checksums(backup_info, checksums):
+    """
+    Records the checksums of the written members in the backup
+    information, including the file manifest of an incremental backup.
+
+    Params:
+        backup_info (dict): Contents of the backup information file
+        checksums (dict): Checksum per name inside the backup
+    """
+    backup_info["checksum_algorithm"] = CHECKSUM_ALGORITHM
+    backup_info["checksums"] = checksums
+    for name, entry in backup_info.get("files", {}).items():
+        if name in checksums:
+            entry["hash"] = checksums[name]
+
+
+def crc_file(file_path):
+    """
+    Returns:
+        int: CRC32 of the file, as stored in zip archives
+    """
+    crc = 0
+    with open(file_path, "rb") as src:
+        for block in iter(lambda: src.read(BLOCK_SIZE), b""):
+            crc = zlib.crc32(block, crc)
+    return crc
@@ -0,0 +1,127 @@
+"""
+Builds the per-file manifest of a backup
+
+Records size, modification time and a BLAKE2b hash of every file and
+the archive that holds its content. Compared against the manifest of a
+parent backup, unchanged files keep pointing to the parent's archive
+and only new or changed files have to be archived again.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+from modules.misc.file_checksum import collect_files
+from modules.misc.file_checksum import hash_file
+
+
+class FileManifest():
+    """
+    Class to build the file manifest of a backup
+    """
+
+    def __init__(self):
+        self.__sources = None
+        self.__parent_files = None
+        self.__archive_name = None
+        self.__files = None
+        self.__changed = None
+
+    def build_manifest(self):
+        """
+        Attempts to build the manifest.
+
+        If successful, the manifest will be stored in 'self.__files' and
+        the files to be archived in 'self.__changed'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            parent_files = self.__parent_files or {}
+            self.__files = {}
+            self.__changed = []
+
+            for file_path, arcname in collect_files(self.__sources):
+                name = arcname.replace(os.sep, "/")
+                stat = os.stat(file_path)
+                parent = parent_files.get(name)
+
+                # Size and time unchanged, the parent's hash still applies
+                if parent is not None and \
+                        parent["size"] == stat.st_size and \
+                        parent["mtime"] == stat.st_mtime:
+                    self.__files[name] = dict(parent)
+                    continue
+
+                entry = {
+                    "size": stat.st_size,
+                    "mtime": stat.st_mtime,
+                    "hash": hash_file(file_path),
+                    "archive": self.__archive_name
+                }
+
+                # Touched, but with identical content
+                if parent is not None and parent["hash"] == entry["hash"]:
+                    entry["archive"] = parent["archive"]
+                else:
+                    self.__changed.append((file_path, arcname))
+
+                self.__files[name] = entry
+
+            result["success"] = True
+
+        except (FileNotFoundError, PermissionError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def get_files(self):
+        """
+        Getter
+
+        Returns:
+            dict: Size, mtime, hash and archive per file name
+        """
+        return self.__files
+
+    def get_changed(self):
+        """
+        Getter
+
+        Returns:
+            list: Tuples of file path and archive name of the
+                  new or changed files
+        """
+        return self.__changed
+
+    def set_data(self, sources, parent_files, archive_name):
+        """
+        Setter
+
+        Params:
+            sources (list): Tuples of source path (file or directory)
+                            and name inside the backup
+            parent_files (dict): Manifest of the parent backup or None
+            archive_name (str): File name of the archive to be created
+        """
+        self.__sources = sources
+        self.__parent_files = parent_files
+        self.__archive_name = archive_name
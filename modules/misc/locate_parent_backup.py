@@ -0,0 +1,135 @@
+"""
+Locates the latest incremental backup of a profile
+
+Incremental backups are named
+'<profile>_<YYYYmmdd-HHMMSS>-<microseconds><extension>', older ones
+without the microseconds. The newest one that carries a file manifest
+becomes the parent of the next incremental backup.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import re
+import tarfile
+import zipfile
+import zlib
+from lzma import LZMAError
+from modules.zip_operation.archive_codecs import read_member
+
+
+class LocateParentBackup():
+    """
+    Class to locate the parent of an incremental backup
+    """
+
+    def __init__(self):
+        self.__backup_dir = None
+        self.__backup_profile = None
+        self.__backup_info = None
+        self.__parent_file = None
+        self.__parent_files = None
+
+    def locate_parent(self):
+        """
+        Attempts to locate the parent backup.
+
+        If one exists, its file name will be stored in 'self.__parent_file'
+        and its manifest in 'self.__parent_files'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            pattern = re.compile(
+                re.escape(self.__backup_profile) +
+                r"_(\d{8}-\d{6})(?:-(\d{6}))?(\.zip|\.tar\.xz)$"
+            )
+            matches = [
+                pattern.match(name)
+                for name in os.listdir(self.__backup_dir)
+            ]
+
+            # Newest first, ordered by second and microseconds
+            candidates = [
+                match.group(0) for match in sorted(
+                    (match for match in matches if match),
+                    key=lambda match: (match.group(1), match.group(2) or ""),
+                    reverse=True
+                )
+            ]
+
+            # The newest readable backup with a manifest is the parent,
+            # damaged or truncated archives are skipped
+            for name in candidates:
+                try:
+                    backup_info = json.loads(read_member(
+                        os.path.join(self.__backup_dir, name),
+                        self.__backup_info
+                    ))
+                except (OSError, KeyError, ValueError, EOFError,
+                        zipfile.BadZipFile, tarfile.TarError, LZMAError,
+                        zlib.error):
+                    continue
+
+                if "files" in backup_info:
+                    self.__parent_file = name
+                    self.__parent_files = backup_info["files"]
+                    break
+
+            result["success"] = True
+
+        except (FileNotFoundError, KeyError, ValueError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def get_parent_file(self):
+        """
+        Getter
+
+        Returns:
+            str: File name of the parent backup, None for a full backup
+        """
+        return self.__parent_file
+
+    def get_parent_files(self):
+        """
+        Getter
+
+        Returns:
+            dict: Manifest of the parent backup, None for a full backup
+        """
+        return self.__parent_files
+
+    def set_data(self, backup_dir, backup_profile, backup_info):
+        """
+        Setter
+
+        Params:
+            backup_dir (str): Directory of the backups
+            backup_profile (str): Selected backup profile
+            backup_info (str): Name of the backup information file
+        """
+        self.__backup_dir = backup_dir
+        self.__backup_profile = backup_profile
+        self.__backup_info = backup_info
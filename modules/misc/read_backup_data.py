@@ -1,5 +1,9 @@
 """
 Reads backup restore information from backup_info.json
+
+The file is read in place from the archive (through the central
+directory of a zip archive) or reassembled from the repository
+manifest, nothing else is extracted.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,8 +22,8 @@ Reads backup restore information from backup_info.json
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import json
-import os
+from modules.zip_operation.archive_codecs import READ_ERRORS
+from modules.zip_operation.archive_codecs import read_backup_info
 
 
 class ReadBackupData():
@@ -27,7 +31,8 @@ class ReadBackupData():
     Class to read backup data
     """
     def __init__(self):
-        self.__temp_dir = None
+        self.__backup_file = None
+        self.__backup_info = None
         self.__backup_data = None
 
     def read_data(self):
@@ -44,21 +49,13 @@ class ReadBackupData():
         }
 
         try:
-            # Construct the path to the backup info JSON file
-            info_file_path = os.path.join(
-                os.path.dirname(__file__),
-                self.__temp_dir,
-                'backup_info.json'
-                )
-
-            # Open and read the JSON file
-            # then load its contents into self.__backup_data
-            with open(info_file_path, encoding="UTF-8") as json_file:
-                self.__backup_data = json.load(json_file)
+            # Reads backup_info.json without extracting the archive
+            self.__backup_data = read_backup_info(
+                self.__backup_file, self.__backup_info)
 
             result["success"] = True
 
-        except FileNotFoundError as e:
+        except READ_ERRORS as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -72,11 +69,13 @@ class ReadBackupData():
         """
         return self.__backup_data
 
-    def set_data(self, temp_dir):
+    def set_data(self, backup_file, backup_info):
         """
         Setter
 
         Params:
-            temp_dir (str): Temporary directory path
+            backup_file (str): Backup archive or repository manifest
+            backup_info (str): Name of the backup information file
         """
-        self.__temp_dir = temp_dir
+        self.__backup_file = backup_file
+        self.__backup_info = backup_info
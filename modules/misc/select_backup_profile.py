@@ -28,6 +28,7 @@ class SelectBackupProfile():
         self.__lang_str = None
         self.__profile_list = None
         self.__backup_profile = None
+        self.__preset = None
 
     def select_profile(self):
         """
@@ -47,6 +48,15 @@ class SelectBackupProfile():
             profile_name in enumerate(self.__profile_list)
             }
 
+        # A profile given beforehand is taken without asking
+        if self.__preset is not None:
+            if self.__preset in self.__profile_list:
+                self.__backup_profile = self.__preset
+                result["success"] = True
+            else:
+                print(self.__lang_str[2], self.__preset)
+            return result
+
         # Loop iterates until user makes a valid profile selection
         while True:
             print(self.__lang_str[0])
@@ -83,3 +93,12 @@ class SelectBackupProfile():
         """
         self.__lang_str = lang_str
         self.__profile_list = profile_list
+
+    def set_preset(self, preset):
+        """
+        Setter
+
+        Params:
+            preset (str): Profile selected beforehand, None to ask the user
+        """
+        self.__preset = preset
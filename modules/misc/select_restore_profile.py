@@ -1,5 +1,9 @@
 """
 User prompt to select the backup to restore
+
+The backups recorded in the catalog are listed with a number. The user
+enters a number, a profile name to narrow the list down, or the path
+to a backup file that is not in the catalog.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -19,6 +23,7 @@ User prompt to select the backup to restore
 # If not, see <http://www.gnu.org/licenses/>.
 
 import os
+import time
 
 
 class SelectRestoreProfile():
@@ -29,6 +34,8 @@ class SelectRestoreProfile():
     def __init__(self):
         self.__restore_file = None
         self.__restore_profile = None
+        self.__backups = None
+        self.__preset = None
 
     def select_profile(self):
         """
@@ -44,16 +51,44 @@ class SelectRestoreProfile():
         }
 
         try:
+            # A backup given beforehand is taken without asking
+            if self.__preset is not None:
+                if not os.path.exists(self.__preset):
+                    raise FileNotFoundError(self.__preset)
+                self.__restore_profile = self.__preset
+                result["success"] = True
+                return result
+
+            backups = self.__backups or []
+            self.__print_backups(backups)
+
             while True:
                 # Input for backup data
                 restore_profile = input(self.__restore_file[0])
 
+                # Number of a listed backup
+                if restore_profile.isdigit() and \
+                        0 < int(restore_profile) <= len(backups):
+                    self.__restore_profile = \
+                        backups[int(restore_profile) - 1]["archive_path"]
+                    result["success"] = True
+                    break
+
                 # Checks if the file exists, and if so,
                 # saves it to the self.__restore_profile.
                 if os.path.exists(restore_profile):
                     self.__restore_profile = restore_profile
                     result["success"] = True
                     break
+
+                # Profile name, narrows the list down to its backups
+                matches = [
+                    backup for backup in self.__backups or []
+                    if backup["profile"] == restore_profile
+                ]
+                if matches:
+                    backups = matches
+                    self.__print_backups(backups)
                 else:
                     print(self.__restore_file[1])
 
@@ -62,6 +97,28 @@ class SelectRestoreProfile():
 
         return result
 
+    def __print_backups(self, backups):
+        """
+        Prints the numbered list of backups.
+
+        Params:
+            backups (list): Catalog rows of the backups
+        """
+        if not backups:
+            print(self.__restore_file[5])
+            return
+
+        print(self.__restore_file[4])
+        for number, backup in enumerate(backups, 1):
+            created = time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(backup["archive_mtime"]))
+            print(
+                f"{number:>3}. {created}  "
+                f"{backup['profile']}  "
+                f"({backup['creature_mind']}, {backup['codec']})  "
+                f"{backup['archive_path']}"
+            )
+
     def get_restore_profile(self):
         """
         Getter
@@ -79,3 +136,22 @@ class SelectRestoreProfile():
             restore_file (dict): Text in the selected language
         """
         self.__restore_file = restore_file
+
+    def set_backups(self, backups):
+        """
+        Setter
+
+        Params:
+            backups (list): Catalog rows of the backups, newest first
+        """
+        self.__backups = backups
+
+    def set_preset(self, preset):
+        """
+        Setter
+
+        Params:
+            preset (str): Path to the backup selected beforehand,
+                          None to ask the user
+        """
+        self.__preset = preset
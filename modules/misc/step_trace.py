@@ -0,0 +1,210 @@
+"""
+Records the steps of the backup and restore pipelines
+
+Every step run through 'run_step' is recorded with its start and end
+time, the bytes read and written and the files opened for reading and
+writing. The trace is written in the Chrome trace-event format, so a
+run can be opened in chrome://tracing or Perfetto.
+
+Bytes and files are counted for the whole process. When several
+profiles are backed up concurrently, the counters of overlapping steps
+include each other's work.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import ctypes
+import json
+import os
+import sys
+import threading
+import time
+
+# Flags of os.open() that open a file for writing
+WRITE_FLAGS = os.O_WRONLY | os.O_RDWR
+
+
+def io_counters():
+    """
+    Reads the I/O counters of the process.
+
+    Returns:
+        tuple: Bytes read and bytes written, None if not available
+    """
+    if sys.platform == "win32":
+        class IoCounters(ctypes.Structure):
+            _fields_ = [
+                (name, ctypes.c_ulonglong) for name in (
+                    "read_operations", "write_operations",
+                    "other_operations", "read_bytes", "write_bytes",
+                    "other_bytes"
+                )
+            ]
+
+        counters = IoCounters()
+        kernel32 = ctypes.windll.kernel32
+        kernel32.GetCurrentProcess.restype = ctypes.c_void_p
+        if kernel32.GetProcessIoCounters(
+                ctypes.c_void_p(kernel32.GetCurrentProcess()),
+                ctypes.byref(counters)):
+            return counters.read_bytes, counters.write_bytes
+        return None
+
+    try:
+        with open("/proc/self/io", encoding="UTF-8") as io_file:
+            values = dict(line.split(": ") for line in io_file)
+        return int(values["rchar"]), int(values["wchar"])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+class StepTrace():
+    """
+    Class to record the pipeline steps as trace events
+    """
+
+    def __init__(self):
+        self.__trace_file = None
+        self.__events = []
+        self.__files = [0, 0]
+        self.__lock = threading.Lock()
+        self.__origin = time.perf_counter()
+        self.__hooked = False
+
+    def run_step(self, step_method):
+        """
+        Runs a step and records it if tracing is enabled.
+
+        Params:
+            step_method (method): Step returning a result dictionary
+
+        Returns:
+            dict: Result of the step
+        """
+        if self.__trace_file is None:
+            return step_method()
+
+        io_start = io_counters()
+        files_start = list(self.__files)
+        start = time.perf_counter()
+        step_result = None
+        try:
+            step_result = step_method()
+            return step_result
+        finally:
+            end = time.perf_counter()
+            args = {
+                "success": bool(step_result and step_result["success"]),
+                "files_read": self.__files[0] - files_start[0],
+                "files_written": self.__files[1] - files_start[1]
+            }
+            io_end = io_counters()
+            if io_start is not None and io_end is not None:
+                args["bytes_read"] = io_end[0] - io_start[0]
+                args["bytes_written"] = io_end[1] - io_start[1]
+
+            # Class.__method becomes Class.method
+            owner, _, name = step_method.__qualname__.rpartition(".")
+            with self.__lock:
+                self.__events.append({
+                    "name": name.lstrip("_"),
+                    "cat": owner,
+                    "ph": "X",
+                    "ts": round((start - self.__origin) * 1e6, 1),
+                    "dur": round((end - start) * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": threading.get_ident(),
+                    "args": args
+                })
+
+    def __count_open(self, event, args):
+        """
+        Audit hook counting the files opened for reading and writing.
+        """
+        if event != "open" or isinstance(args[0], int):
+            return
+
+        mode, flags = args[1], args[2]
+        if mode is not None:
+            written = any(char in mode for char in "wax+")
+        else:
+            written = bool(flags & WRITE_FLAGS)
+
+        with self.__lock:
+            self.__files[written] += 1
+
+    def write_trace(self):
+        """
+        Attempts to write the recorded steps to the trace file.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            with self.__lock:
+                events = list(self.__events)
+
+            with open(self.__trace_file, "w", encoding="UTF-8") as trace:
+                json.dump(
+                    {"traceEvents": events, "displayTimeUnit": "ms"},
+                    trace, indent=1)
+
+            result["success"] = True
+
+        except (OSError, TypeError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def get_trace_file(self):
+        """
+        Getter
+
+        Returns:
+            str: Path of the trace file, None if tracing is disabled
+        """
+        return self.__trace_file
+
+    def get_events(self):
+        """
+        Getter
+
+        Returns:
+            list: Recorded trace events
+        """
+        with self.__lock:
+            return list(self.__events)
+
+    def set_data(self, trace_file):
+        """
+        Setter
+
+        Audit hooks cannot be removed, the hook counting opened files
+        is only installed once tracing is enabled.
+
+        Params:
+            trace_file (str): Path of the trace file, empty or None
+                              to disable tracing
+        """
+        self.__trace_file = trace_file or None
+        if self.__trace_file is not None and not self.__hooked:
+            sys.addaudithook(self.__count_open)
+            self.__hooked = True
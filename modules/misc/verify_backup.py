@@ -0,0 +1,324 @@
+"""
+Verifies backups against the checksums in their backup_info.json
+
+Every member is decompressed and hashed, zip members are additionally
+checked against their CRC and repository chunks against their hash.
+The members are hashed by a thread pool in blocks of 1 MiB, so memory
+use stays bounded by the number of threads. zlib, lzma and hashlib
+release the GIL while working on a block, so threads scale like
+processes without copying the data between them.
+
+Zip members are spread over all threads, tar archives can only be read
+front to back and are hashed by one thread each.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import tarfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from modules.misc.file_checksum import hash_blocks
+from modules.misc.file_checksum import hash_stream
+from modules.repository_operation.restore_repository import read_chunk
+from modules.zip_operation.archive_codecs import READ_ERRORS
+from modules.zip_operation.archive_codecs import detect_container
+from modules.zip_operation.archive_codecs import read_backup_info
+
+
+class VerifyBackup():
+    """
+    Class to verify one backup or a directory of backups
+    """
+
+    def __init__(self):
+        self.__backup_path = None
+        self.__backup_info = None
+        self.__workers = None
+        self.__report = None
+        self.__elapsed = None
+
+    def verify_backup(self):
+        """
+        Attempts to verify the backups.
+
+        The result of every backup is stored in 'self.__report'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        'success' is only true if every backup is intact.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            archives = self.__list_archives()
+            start = time.perf_counter()
+
+            # All archives are queued first so tar archives
+            # are read in parallel to each other
+            with ThreadPoolExecutor(self.__workers) as executor:
+                pending = [
+                    self.__submit(executor, archive_file)
+                    for archive_file in archives
+                ]
+                self.__report = [
+                    self.__collect(*entry) for entry in pending]
+
+            self.__elapsed = time.perf_counter() - start
+
+            result["success"] = all(
+                entry["status"] == "ok" for entry in self.__report)
+
+        except (OSError, ValueError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def __list_archives(self):
+        """
+        Lists the backups.
+
+        Files in a directory that are no backups are skipped,
+        a single file has to be a backup.
+
+        Returns:
+            list: Paths of the archives
+        """
+        if not os.path.isdir(self.__backup_path):
+            return [self.__backup_path]
+
+        return [
+            os.path.join(self.__backup_path, name)
+            for name in sorted(os.listdir(self.__backup_path))
+            if os.path.isfile(os.path.join(self.__backup_path, name)) and
+            detect_container(os.path.join(self.__backup_path, name))
+        ]
+
+    def __submit(self, executor, archive_file):
+        """
+        Reads the checksums of an archive and queues the hashing of
+        its members. An archive that cannot be opened is reported as
+        failed instead.
+
+        Returns:
+            tuple: Archive path, checksums, futures of the tasks and
+                   the error opening the archive
+        """
+        try:
+            checksums = read_backup_info(
+                archive_file, self.__backup_info).get("checksums", {})
+            futures = self.__submit_members(executor, archive_file)
+        except READ_ERRORS as e:
+            return archive_file, {}, [], str(e)
+
+        return archive_file, checksums, futures, None
+
+    def __submit_members(self, executor, archive_file):
+        """
+        Queues the hashing of the members of an archive.
+
+        Returns:
+            list: Futures of the tasks
+        """
+        container = detect_container(archive_file)
+
+        if container == "zip":
+            with zipfile.ZipFile(archive_file, "r") as zipf:
+                names = sorted(
+                    (info for info in zipf.infolist() if not info.is_dir()),
+                    key=lambda info: info.file_size, reverse=True
+                )
+            # Round robin over the sizes keeps the batches even
+            batches = [
+                [info.filename for info in names[index::self.__workers]]
+                for index in range(min(self.__workers, len(names)))
+            ]
+            futures = [
+                executor.submit(hash_zip_members, archive_file, batch)
+                for batch in batches
+            ]
+
+        elif container == "tar":
+            futures = [executor.submit(hash_tar_members, archive_file)]
+
+        else:
+            with open(archive_file, encoding="UTF-8") as json_file:
+                files = json.load(json_file)["files"]
+            futures = [
+                executor.submit(hash_manifest_member, archive_file, entry)
+                for entry in files
+            ]
+
+        return futures
+
+    @staticmethod
+    def __collect(archive_file, checksums, futures, error):
+        """
+        Compares the hashed members with the checksums.
+
+        Returns:
+            dict: Status, number of files and bytes, time and errors
+        """
+        entry = {
+            "archive": archive_file,
+            "status": "ok",
+            "files": 0,
+            "bytes": 0,
+            "seconds": 0.0,
+            "errors": [] if error is None else [error]
+        }
+
+        hashes = {}
+        starts = []
+        ends = []
+        for future in futures:
+            task = future.result()
+            hashes.update(task["hashes"])
+            entry["errors"].extend(task["errors"])
+            starts.append(task["start"])
+            ends.append(task["end"])
+
+        for name, hashed in hashes.items():
+            # Unreadable members are already reported
+            if hashed is None:
+                continue
+            digest, size = hashed
+            entry["files"] += 1
+            entry["bytes"] += size
+            if name in checksums and checksums[name] != digest:
+                entry["errors"].append(f"{name}: checksum mismatch")
+
+        for name in checksums:
+            if name not in hashes:
+                entry["errors"].append(f"{name}: missing")
+
+        if starts:
+            entry["seconds"] = max(ends) - min(starts)
+        if entry["errors"]:
+            entry["status"] = "failed"
+
+        return entry
+
+    def get_report(self):
+        """
+        Getter
+
+        Returns:
+            list: Status, number of files and bytes, time and errors
+                  per backup
+        """
+        return self.__report
+
+    def get_elapsed(self):
+        """
+        Getter
+
+        Returns:
+            float: Seconds the verification took
+        """
+        return self.__elapsed
+
+    def set_data(self, backup_path, backup_info, workers):
+        """
+        Setter
+
+        Params:
+            backup_path (str): Backup file or directory of backups
+            backup_info (str): Name of the backup information file
+            workers (int): Number of hashing threads,
+                           0 for one per CPU core
+        """
+        self.__backup_path = backup_path
+        self.__backup_info = backup_info
+        self.__workers = workers or os.cpu_count() or 1
+
+
+def hash_zip_members(archive_file, names):
+    """
+    Hashes members of a zip archive, the CRC is checked while reading.
+
+    Returns:
+        dict: Hash and size per member (None if unreadable),
+              errors, start and end time
+    """
+    task = {"hashes": {}, "errors": [], "start": time.perf_counter()}
+
+    try:
+        with zipfile.ZipFile(archive_file, "r") as zipf:
+            for name in names:
+                try:
+                    with zipf.open(name) as member:
+                        task["hashes"][name] = hash_stream(member)
+                except READ_ERRORS as e:
+                    task["hashes"][name] = None
+                    task["errors"].append(f"{name}: {e}")
+    except READ_ERRORS as e:
+        task["errors"].append(str(e))
+
+    task["end"] = time.perf_counter()
+    return task
+
+
+def hash_tar_members(archive_file):
+    """
+    Hashes all members of a tar archive in one pass.
+
+    Returns:
+        dict: Hash and size per member, errors, start and end time
+    """
+    task = {"hashes": {}, "errors": [], "start": time.perf_counter()}
+
+    try:
+        with tarfile.open(archive_file, "r:*") as tarf:
+            for member in tarf:
+                if member.isfile():
+                    task["hashes"][member.name] = hash_stream(
+                        tarf.extractfile(member))
+    except READ_ERRORS as e:
+        task["errors"].append(str(e))
+
+    task["end"] = time.perf_counter()
+    return task
+
+
+def hash_manifest_member(manifest_file, entry):
+    """
+    Hashes a file of a repository backup chunk by chunk.
+
+    Returns:
+        dict: Hash and size of the file, errors, start and end time
+    """
+    task = {"hashes": {}, "errors": [], "start": time.perf_counter()}
+
+    chunk_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(manifest_file))),
+        "chunks"
+    )
+
+    try:
+        task["hashes"][entry["name"]] = hash_blocks(
+            read_chunk(chunk_dir, digest) for digest in entry["chunks"])
+    except READ_ERRORS as e:
+        task["hashes"][entry["name"]] = None
+        task["errors"].append(f"{entry['name']}: {e}")
+
+    task["end"] = time.perf_counter()
+    return task
@@ -2,6 +2,7 @@
 Writes important backup information to backup_info.json:
 - Selected profile
 - Creature Mind file
+- File manifest and parent backup (incremental backups only)
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -33,6 +34,8 @@ class WriteBackupData():
         self.__backup_data = None
         self.__backup_info = None
         self.__temp_dir = None
+        self.__files = None
+        self.__parent = None
 
     def write_data(self):
         """
@@ -53,6 +56,11 @@ class WriteBackupData():
                 "creature_physique": self.__backup_data["creature_physique"]
             }
 
+            # File manifest and parent of an incremental backup
+            if self.__files is not None:
+                backup_info["files"] = self.__files
+                backup_info["parent"] = self.__parent
+
             # Constructs the path for the backup information file
             backup_info_path = os.path.join(
                 self.__temp_dir, self.__backup_info)
@@ -63,7 +71,7 @@ class WriteBackupData():
 
             result["success"] = True
 
-        except FileNotFoundError as e:
+        except (FileNotFoundError, PermissionError) as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -80,3 +88,14 @@ class WriteBackupData():
         self.__backup_data = backup_data
         self.__backup_info = backup_info
         self.__temp_dir = temp_dir
+
+    def set_manifest(self, files, parent):
+        """
+        Setter
+
+        Params:
+            files (dict): Size, mtime, hash and archive per file name
+            parent (str): File name of the parent backup or None
+        """
+        self.__files = files
+        self.__parent = parent
@@ -0,0 +1,140 @@
+"""
+Keeps the results of the registry discovery across runs
+
+The directories located in the registry and the profile table are
+stored in a JSON file in the data directory. Each entry carries a stamp
+of what it was read from, the last write time of the registry keys and
+the modification time of the located directory. An entry is only used
+while its stamp is unchanged, otherwise it is read again and replaced.
+
+    {"registry": "wine:/home/me/.wine/user.reg",
+     "entries": {"dir:...": {"stamp": [133400000000000000, 17000...],
+                             "value": "C:\\Games\\Black & White"}}}
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+
+
+def cache_path(cache_file):
+    """
+    Params:
+        cache_file (str): File name of the cache
+
+    Returns:
+        str: Path of the cache in the data directory
+    """
+    return os.path.join(
+        os.path.dirname(__file__), "../../data", cache_file)
+
+
+def dir_stamp(path):
+    """
+    Returns:
+        int: Modification time of a directory in ns, None if missing
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class DiscoveryCache():
+    """
+    Class holding the discovery results of earlier runs
+    """
+
+    def __init__(self, cache_file, registry_id):
+        self.__cache_file = cache_path(cache_file)
+        self.__registry_id = registry_id
+        self.__lock = threading.RLock()
+        self.__entries = None
+        self.__changed = False
+
+    def __load(self):
+        """
+        Returns:
+            dict: Entries read from the cache file on first use, empty
+                  if there is none or it belongs to another registry
+        """
+        if self.__entries is None:
+            self.__entries = {}
+            try:
+                with open(self.__cache_file, encoding="UTF-8") as json_file:
+                    content = json.load(json_file)
+                if content["registry"] == self.__registry_id:
+                    self.__entries = content["entries"]
+            except (OSError, ValueError, KeyError, TypeError):
+                pass
+
+        return self.__entries
+
+    def get(self, name, stamp):
+        """
+        Params:
+            name (str): Name of the entry
+            stamp (function): Returns the current stamp of a value,
+                              may raise OSError if its key is gone
+
+        Returns:
+            object: Cached value, None if missing or stale
+        """
+        with self.__lock:
+            entry = self.__load().get(name)
+            try:
+                if entry is not None and \
+                        entry["stamp"] == stamp(entry["value"]):
+                    return entry["value"]
+            except OSError:
+                pass
+
+        return None
+
+    def put(self, name, value, stamp):
+        """
+        Stores a value with its current stamp, written by save().
+        """
+        with self.__lock:
+            try:
+                self.__load()[name] = {"stamp": stamp(value), "value": value}
+                self.__changed = True
+            except OSError:
+                pass
+
+    def save(self):
+        """
+        Writes the cache file if an entry changed. The cache is only an
+        optimization, a file that cannot be written is left out.
+        """
+        with self.__lock:
+            if not self.__changed:
+                return
+
+            temp_file = self.__cache_file + ".tmp"
+            try:
+                with open(temp_file, "w", encoding="UTF-8") as json_file:
+                    json.dump({
+                        "registry": self.__registry_id,
+                        "entries": self.__entries
+                    }, json_file)
+                os.replace(temp_file, self.__cache_file)
+                self.__changed = False
+            except OSError:
+                pass
@@ -0,0 +1,92 @@
+"""
+Exports the registry keys of all profiles in one pass.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+from modules.registry_operation.reg_file import export_profiles
+
+
+class ExportProfiles():
+    """
+    Class for exporting the registry keys of every profile at once
+    """
+
+    def __init__(self):
+        self.__reg_hive = None
+        self.__reg_path = None
+        self.__session = None
+        self.__reg_data = None
+
+    def export_profiles(self):
+        """
+        Attempts to export the profiles key and split it by profile.
+
+        If successful, the .reg files will be stored in 'self.__reg_data'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            # Constructs the full registry path
+            reg_path = (
+                self.__reg_hive +
+                "\\" + self.__reg_path[0] +
+                self.__reg_path[1]
+                )
+
+            # Reads all profile keys once and writes a file per profile
+            self.__reg_data = export_profiles(self.__session, reg_path)
+            result["success"] = True
+
+        except OSError as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def get_reg_data(self):
+        """
+        Getter
+
+        Returns:
+            dict: Content of the .reg file of each profile
+        """
+        return self.__reg_data
+
+    def set_data(self, reg_hive, reg_path):
+        """
+        Setter
+
+        Params:
+            reg_hive (str): Registry hive
+            reg_path (list): Registry path to the profiles
+        """
+        self.__reg_hive = reg_hive
+        self.__reg_path = reg_path
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
@@ -1,5 +1,5 @@
 """
-Export a custom registration key using a sub-process
+Export a custom registration key to a .reg file
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,7 +18,9 @@ Export a custom registration key using a sub-process
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import subprocess
+import os
+from modules.registry_operation.reg_file import dump_reg
+from modules.registry_operation.reg_file import export_keys
 
 
 class ExportRegkey():
@@ -32,6 +34,8 @@ class ExportRegkey():
         self.__reg_file = None
         self.__backup_profile = None
         self.__temp_dir = None
+        self.__session = None
+        self.__reg_data = None
 
     def export_regkey(self):
         """
@@ -52,19 +56,19 @@ class ExportRegkey():
                 self.__reg_path[1]
                 )
             regkey = reg_path + "\\" + self.__backup_profile
-            export_file = self.__temp_dir + "\\" + self.__reg_file
-
-            # Exports the registry key to a file using the 'reg' command
-            subprocess.run(
-                ["reg", "export", regkey, export_file],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True
-                )
+            export_file = os.path.join(self.__temp_dir, self.__reg_file)
+
+            # Writes the key and its sub keys like 'reg export',
+            # unless the profiles were exported together before
+            reg_data = self.__reg_data
+            if reg_data is None:
+                reg_data = dump_reg(export_keys(self.__session, regkey))
+            with open(export_file, "wb") as reg_file:
+                reg_file.write(reg_data)
 
             result["success"] = True
 
-        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        except OSError as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -85,3 +89,22 @@ class ExportRegkey():
         self.__reg_file = reg_file
         self.__backup_profile = backup_profile
         self.__temp_dir = temp_dir
+
+    def set_reg_data(self, reg_data):
+        """
+        Setter
+
+        Params:
+            reg_data (bytes): Content of the .reg file exported before,
+                              None to export the key
+        """
+        self.__reg_data = reg_data
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
@@ -0,0 +1,357 @@
+"""
+Registry backend stored in a JSON file or in memory
+
+Offers the part of the 'winreg' interface the tool uses, so it can
+replace the Windows registry on other systems, e.g. for benchmarks and
+tests or to work on a copied profile. Key names are compared
+case-insensitively like in the real registry.
+
+The file maps the lower case path of every key to its name and its
+values, binary values are stored as hex strings, and the time the key
+was last written to as FILETIME:
+
+    {"hkey_current_user\\software": {"name": "HKEY_CURRENT_USER\\Software",
+                                     "values": {"Name": [1, "data"]},
+                                     "modified": 133400000000000000}}
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import threading
+import time
+
+
+# Difference between the Windows and the Unix epoch in 100ns
+EPOCH_DIFFERENCE = 116444736000000000
+
+
+def filetime():
+    """
+    Returns:
+        int: Current time in 100ns since 1601, like key write times
+    """
+    return time.time_ns() // 100 + EPOCH_DIFFERENCE
+
+
+def join_key(*parts):
+    """
+    Returns:
+        str: Key path without empty or trailing parts
+    """
+    return "\\".join(
+        part for piece in parts for part in piece.split("\\") if part)
+
+
+def encode_value(value_type, data):
+    """
+    Returns:
+        list: Type and JSON representation of a value
+    """
+    if value_type not in FileRegistry.TYPED_VALUES:
+        return [value_type, bytes(data or b"").hex()]
+    return [value_type, data]
+
+
+def decode_value(value):
+    """
+    Returns:
+        tuple: Data and type of a value, like QueryValueEx
+    """
+    value_type, data = value
+    if value_type not in FileRegistry.TYPED_VALUES:
+        return bytes.fromhex(data), value_type
+    return data, value_type
+
+
+def add_key(tree, path):
+    """
+    Adds a key and its missing parents to a tree.
+
+    Returns:
+        dict: Entry of the key
+    """
+    parts = join_key(path).split("\\")
+    for index in range(1, len(parts) + 1):
+        parent = "\\".join(parts[:index])
+        tree.setdefault(parent.lower(), {"name": parent, "values": {}})
+    return tree["\\".join(parts).lower()]
+
+
+def build_tree(keys):
+    """
+    Params:
+        keys (dict): Values per key path, values as (type, data)
+
+    Returns:
+        dict: Registry tree including all parent keys
+    """
+    tree = {}
+    for path, values in keys.items():
+        add_key(tree, path)["values"].update({
+            name: encode_value(*value) for name, value in values.items()
+        })
+    return tree
+
+
+class FileKey():
+    """
+    Handle of an open key
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class RegistryConstants():
+    """
+    Constants of the 'winreg' module used by the tool
+    """
+
+    HKEY_CLASSES_ROOT = 0x80000000
+    HKEY_CURRENT_USER = 0x80000001
+    HKEY_LOCAL_MACHINE = 0x80000002
+    HKEY_USERS = 0x80000003
+    KEY_READ = 0x20019
+    KEY_SET_VALUE = 0x0002
+    REG_NONE = 0
+    REG_SZ = 1
+    REG_EXPAND_SZ = 2
+    REG_BINARY = 3
+    REG_DWORD = 4
+    REG_MULTI_SZ = 7
+    REG_QWORD = 11
+
+    # Types returned as str, int or list, all others as bytes
+    TYPED_VALUES = (REG_SZ, REG_EXPAND_SZ, REG_DWORD, REG_MULTI_SZ, REG_QWORD)
+
+    HIVES = {
+        HKEY_CLASSES_ROOT: "HKEY_CLASSES_ROOT",
+        HKEY_CURRENT_USER: "HKEY_CURRENT_USER",
+        HKEY_LOCAL_MACHINE: "HKEY_LOCAL_MACHINE",
+        HKEY_USERS: "HKEY_USERS"
+    }
+
+
+class FileRegistry(RegistryConstants):
+    """
+    Class providing the 'winreg' functions on a registry tree
+    """
+
+    def __init__(self, tree_file=None):
+        self.__tree_file = tree_file
+        self.__tree = {}
+        self.__stamp = None
+        self.__file_time = 0
+        self.__sub_keys = {}
+        self.__lock = threading.RLock()
+
+    def __load(self):
+        """
+        Returns:
+            dict: Current tree, re-read if the file was changed
+                  by another process
+        """
+        if self.__tree_file is None:
+            return self.__tree
+
+        stat = os.stat(self.__tree_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self.__stamp:
+            with open(self.__tree_file, encoding="UTF-8") as json_file:
+                self.__tree = json.load(json_file)
+            self.__stamp = stamp
+            self.__sub_keys = {}
+            self.__file_time = \
+                stat.st_mtime_ns // 100 + EPOCH_DIFFERENCE
+
+        return self.__tree
+
+    def __save(self):
+        """
+        Writes the tree back to its file.
+        """
+        self.__sub_keys = {}
+        if self.__tree_file is None:
+            return
+
+        with open(self.__tree_file, "w", encoding="UTF-8") as json_file:
+            json.dump(self.__tree, json_file)
+        stat = os.stat(self.__tree_file)
+        self.__stamp = (stat.st_mtime_ns, stat.st_size)
+
+    def __key_path(self, key, sub_key):
+        """
+        Returns:
+            str: Full path of a sub key of a hive or open key
+        """
+        parent = self.HIVES[key] if isinstance(key, int) else key.path
+        return join_key(parent, sub_key)
+
+    def __names(self, path):
+        """
+        Returns:
+            list: Sorted names of the sub keys, kept until the tree
+                  changes
+        """
+        lower = path.lower()
+        if lower not in self.__sub_keys:
+            prefix = lower + "\\"
+            self.__sub_keys[lower] = sorted(
+                entry["name"].rsplit("\\", 1)[1]
+                for other, entry in self.__load().items()
+                if other.startswith(prefix) and "\\" not in other[len(prefix):]
+            )
+        return self.__sub_keys[lower]
+
+    @staticmethod
+    def __not_found(name):
+        return FileNotFoundError(
+            2, "The system cannot find the file specified", name)
+
+    def __touch(self, path):
+        """
+        Sets the last write time of a key.
+        """
+        entry = self.__load().get(path.lower())
+        if entry is not None:
+            entry["modified"] = filetime()
+
+    def OpenKey(self, key, sub_key, reserved=0,
+                access=RegistryConstants.KEY_READ):
+        """
+        Opens an existing key, raises FileNotFoundError otherwise.
+        """
+        path = self.__key_path(key, sub_key)
+        with self.__lock:
+            if path.lower() not in self.__load():
+                raise self.__not_found(path)
+        return FileKey(path)
+
+    OpenKeyEx = OpenKey
+
+    def CreateKey(self, key, sub_key):
+        """
+        Opens a key, creating it and its parents if necessary.
+        """
+        path = self.__key_path(key, sub_key)
+        with self.__lock:
+            if path.lower() not in self.__load():
+                add_key(self.__load(), path)
+                self.__touch(path)
+                self.__touch(path.rpartition("\\")[0])
+                self.__save()
+        return FileKey(path)
+
+    def CloseKey(self, key):
+        """
+        Nothing to release.
+        """
+
+    def EnumKey(self, key, index):
+        """
+        Returns the name of the sub key at 'index', OSError past the end.
+        """
+        with self.__lock:
+            names = self.__names(key.path)
+        if index >= len(names):
+            raise OSError(259, "No more data is available")
+        return names[index]
+
+    def EnumValue(self, key, index):
+        """
+        Returns name, data and type of the value at 'index',
+        OSError past the end.
+        """
+        with self.__lock:
+            values = list(self.__load()[key.path.lower()]["values"].items())
+        if index >= len(values):
+            raise OSError(259, "No more data is available")
+        name, value = values[index]
+        return (name, *decode_value(value))
+
+    def QueryInfoKey(self, key):
+        """
+        Returns the number of sub keys and values of an open key and
+        its last write time in 100ns since 1601. Keys written by other
+        programs take the modification time of the file.
+        """
+        with self.__lock:
+            tree = self.__load()
+            sub_keys = len(self.__names(key.path))
+            entry = tree[key.path.lower()]
+            return sub_keys, len(entry["values"]), \
+                entry.get("modified", self.__file_time)
+
+    def QueryValueEx(self, key, value_name):
+        """
+        Returns data and type of a value, FileNotFoundError if missing.
+        """
+        with self.__lock:
+            values = self.__load()[key.path.lower()]["values"]
+            if value_name not in values:
+                raise self.__not_found(value_name)
+            return decode_value(values[value_name])
+
+    def SetValueEx(self, key, value_name, reserved, value_type, data):
+        """
+        Stores a value in an open key.
+        """
+        with self.__lock:
+            self.__load()[key.path.lower()]["values"][value_name] = \
+                encode_value(value_type, data)
+            self.__touch(key.path)
+            self.__save()
+
+    def DeleteValue(self, key, value_name):
+        """
+        Removes a value from an open key, FileNotFoundError if missing.
+        """
+        with self.__lock:
+            values = self.__load()[key.path.lower()]["values"]
+            if value_name not in values:
+                raise self.__not_found(value_name)
+            del values[value_name]
+            self.__touch(key.path)
+            self.__save()
+
+    def FlushKey(self, key):
+        """
+        Nothing to write, every change is saved right away.
+        """
+
+    def DeleteKey(self, key, sub_key):
+        """
+        Deletes a key without sub keys, FileNotFoundError if missing.
+        """
+        path = self.__key_path(key, sub_key).lower()
+        with self.__lock:
+            tree = self.__load()
+            if path not in tree:
+                raise self.__not_found(path)
+            if any(other.startswith(path + "\\") for other in tree):
+                raise PermissionError(5, "Access is denied", path)
+            del tree[path]
+            self.__touch(path.rpartition("\\")[0])
+            self.__save()
@@ -0,0 +1,402 @@
+"""
+Read-only registry backend on a Windows hive file (regf)
+
+Reads the NTUSER.DAT of a profile as HKEY_CURRENT_USER, e.g. from the
+mounted image of an old disk where no registry is running. The hive is
+memory-mapped and its key tree followed cell by cell on demand, so
+opening a key only touches the pages of the keys on its path and of
+their sub key lists. The name hint or hash stored next to each entry of
+a 'lf' or 'lh' list rules out siblings without visiting their key
+nodes. Reading the four profiles of the synthetic 98.7MB hive of
+benchmarks/bench_hive.py visits cells on 10 pages (40KB); the kernel
+still reports about 2.1MB of the mapping resident, as it maps the whole
+page cache folio around each touched page.
+
+Paths read from the hive are translated into the image: the directory
+holding the hive is %USERPROFILE%, its grandparent the root of the
+drive.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import mmap
+import os
+import re
+import struct
+import threading
+from modules.registry_operation.file_registry import FileKey
+from modules.registry_operation.file_registry import RegistryConstants
+from modules.registry_operation.file_registry import join_key
+from modules.registry_operation.reg_file import STRING_TYPES
+from modules.registry_operation.reg_file import bytes_value
+
+
+# Hive bins start behind the base block, cell offsets are relative
+HBIN_START = 4096
+
+# Offset of the root key cell in the base block
+ROOT_CELL = 0x24
+
+# Key and value names stored as ASCII instead of UTF-16LE
+KEY_COMP_NAME = 0x0020
+VALUE_COMP_NAME = 0x0001
+
+# Data of at most 4 bytes is stored in the offset field of the value
+DATA_INLINE = 0x80000000
+
+# Largest data held in one cell, larger data is split by a 'db' record
+BIG_DATA_SEGMENT = 16344
+
+
+def name_hash(name):
+    """
+    Returns:
+        int: Hash of a key name as stored in 'lh' lists
+    """
+    result = 0
+    for char in name.upper():
+        result = (result * 37 + ord(char)) & 0xFFFFFFFF
+    return result
+
+
+class HiveRegistry(RegistryConstants):
+    """
+    Class providing the reading 'winreg' functions on a hive file
+    """
+
+    def __init__(self, hive_file):
+        self.__hive_file = hive_file
+        self.__lock = threading.RLock()
+        self.__map = None
+        self.__offsets = {}
+
+    def __hive(self):
+        """
+        Returns:
+            mmap.mmap: Mapped hive, opened and checked on first use
+        """
+        if self.__map is None:
+            with open(self.__hive_file, "rb") as hive_file:
+                hive = mmap.mmap(
+                    hive_file.fileno(), 0, access=mmap.ACCESS_READ)
+            if hive[:4] != b"regf":
+                hive.close()
+                raise ValueError(f"{self.__hive_file} is not a hive file")
+
+            self.__map = hive
+            self.__offsets[""] = \
+                struct.unpack_from("<I", hive, ROOT_CELL)[0]
+
+        return self.__map
+
+    def __cell(self, offset, signature=None):
+        """
+        Params:
+            offset (int): Cell offset relative to the hive bins
+            signature (bytes): Expected record type, e.g. b'nk'
+
+        Returns:
+            int: Position of the cell data in the file
+        """
+        position = HBIN_START + offset + 4
+        if signature is not None and \
+                self.__hive()[position:position + 2] != signature:
+            raise ValueError(f"Broken hive, no {signature} cell at {offset}")
+        return position
+
+    def __name(self, position, length, compressed):
+        """
+        Returns:
+            str: Name stored at the position
+        """
+        raw = self.__hive()[position:position + length]
+        return raw.decode("latin-1") if compressed \
+            else raw.decode("utf-16le", "replace")
+
+    def __key_name(self, offset):
+        """
+        Returns:
+            str: Name of the key node
+        """
+        position = self.__cell(offset, b"nk")
+        flags = struct.unpack_from("<H", self.__hive(), position + 2)[0]
+        length = struct.unpack_from("<H", self.__hive(), position + 0x48)[0]
+        return self.__name(
+            position + 0x4C, length, flags & KEY_COMP_NAME)
+
+    def __sub_keys(self, offset):
+        """
+        Yields:
+            tuple: Offset of each sub key node, in stored order, and
+                   the list signature with the name hint or hash of
+                   'lf' and 'lh' lists, otherwise None
+        """
+        position = self.__cell(offset, b"nk")
+        count, list_offset = struct.unpack_from(
+            "<I4xI", self.__hive(), position + 0x14)
+        if count:
+            yield from self.__list_entries(list_offset)
+
+    def __list_entries(self, offset):
+        """
+        Yields:
+            tuple: Key node offset and hint of a 'lf', 'lh', 'li' or
+                   'ri' list
+        """
+        position = self.__cell(offset)
+        signature = self.__hive()[position:position + 2]
+        count = struct.unpack_from("<H", self.__hive(), position + 2)[0]
+
+        # Fast leaf lists hold a name hint or hash next to each offset
+        step = 8 if signature in (b"lf", b"lh") else 4
+        if signature not in (b"lf", b"lh", b"li", b"ri"):
+            raise ValueError(f"Broken hive, no key list at {offset}")
+
+        for index in range(count):
+            entry = position + 4 + index * step
+            offset = struct.unpack_from("<I", self.__hive(), entry)[0]
+            if signature == b"ri":
+                yield from self.__list_entries(offset)
+            elif step == 8:
+                yield offset, (signature, self.__hive()[entry + 4:entry + 8])
+            else:
+                yield offset, None
+
+    def __values(self, offset):
+        """
+        Returns:
+            list: Offsets of the value records of a key node
+        """
+        position = self.__cell(offset, b"nk")
+        count, list_offset = struct.unpack_from(
+            "<II", self.__hive(), position + 0x24)
+        if not count:
+            return []
+        return list(struct.unpack_from(
+            f"<{count}I", self.__hive(), self.__cell(list_offset)))
+
+    def __value(self, offset):
+        """
+        Returns:
+            tuple: Name, data and type of a value record
+        """
+        position = self.__cell(offset, b"vk")
+        length, size, data_offset, value_type, flags = struct.unpack_from(
+            "<HIIIH", self.__hive(), position + 2)
+        name = self.__name(position + 20, length, flags & VALUE_COMP_NAME)
+
+        if size & DATA_INLINE:
+            raw = struct.pack("<I", data_offset)[:size & ~DATA_INLINE]
+        else:
+            raw = self.__data(data_offset, size)
+
+        # Strings cut off in the middle of a character
+        if value_type in (*STRING_TYPES, self.REG_MULTI_SZ):
+            raw = raw[:len(raw) // 2 * 2]
+
+        return name, bytes_value(raw, value_type), value_type
+
+    def __data(self, offset, size):
+        """
+        Returns:
+            bytes: Data of a value, joined from its segments if larger
+                   than a cell
+        """
+        position = self.__cell(offset)
+        hive = self.__hive()
+        if size <= BIG_DATA_SEGMENT or hive[position:position + 2] != b"db":
+            return hive[position:position + size]
+
+        count, list_offset = struct.unpack_from("<HI", hive, position + 2)
+        segments = struct.unpack_from(
+            f"<{count}I", hive, self.__cell(list_offset))
+        raw = b"".join(
+            hive[self.__cell(segment):self.__cell(segment) +
+                 BIG_DATA_SEGMENT]
+            for segment in segments
+        )
+        return raw[:size]
+
+    def __open(self, path):
+        """
+        Follows the path from the root key, remembering every key
+        node found.
+
+        Returns:
+            int: Offset of the key node
+        """
+        self.__hive()
+        lower = path.lower()
+        if lower in self.__offsets:
+            return self.__offsets[lower]
+
+        parent, _, name = path.rpartition("\\")
+        parent_offset = self.__open(parent)
+        for offset, hint in self.__sub_keys(parent_offset):
+            if not self.__may_match(name, hint):
+                continue
+            if self.__key_name(offset).lower() == name.lower():
+                self.__offsets[lower] = offset
+                return offset
+
+        raise FileNotFoundError(
+            2, "The system cannot find the file specified", path)
+
+    @staticmethod
+    def __may_match(name, hint):
+        """
+        Params:
+            name (str): Name of the key looked for
+            hint (tuple): List signature and name hint or hash
+
+        Returns:
+            bool: False if the hint rules the key out
+        """
+        # Upper and lower case of other characters may differ
+        # from the rules of Windows
+        if hint is None or not name.isascii():
+            return True
+
+        signature, raw = hint
+        if signature == b"lh":
+            return struct.unpack("<I", raw)[0] == name_hash(name)
+
+        # The hint holds the first four characters, padded with zeros
+        stored = raw.rstrip(b"\0")
+        if not stored.isascii():
+            return True
+        return stored.decode("ascii").lower() == name[:4].lower()
+
+    def __relative_path(self, key, sub_key):
+        """
+        Returns:
+            str: Path of a key below HKEY_CURRENT_USER
+        """
+        if isinstance(key, int):
+            if key != self.HKEY_CURRENT_USER:
+                raise FileNotFoundError(
+                    2, "A user hive only holds HKEY_CURRENT_USER")
+            return join_key(sub_key)
+        return join_key(key.path, sub_key)
+
+    @staticmethod
+    def __read_only(*args):
+        raise PermissionError(13, "The hive is opened read-only")
+
+    def native_path(self, path):
+        """
+        Translates a Windows path into the mounted image, e.g.
+        'C:\\Games' to '<image>/Games', matching the names
+        case-insensitively.
+
+        Returns:
+            str: Path on this system, unchanged if not a Windows path
+        """
+        profile_dir = os.path.dirname(os.path.abspath(self.__hive_file))
+        match = re.match(r"^(%USERPROFILE%|[A-Za-z]:)(.*)$", path, re.I)
+        if match is None:
+            return path
+
+        native = profile_dir if match.group(1).startswith("%") \
+            else os.path.dirname(os.path.dirname(profile_dir))
+        for part in match.group(2).split("\\"):
+            if not part:
+                continue
+            candidate = os.path.join(native, part)
+            if not os.path.exists(candidate) and os.path.isdir(native):
+                candidate = next(
+                    (os.path.join(native, name)
+                     for name in os.listdir(native)
+                     if name.lower() == part.lower()),
+                    candidate)
+            native = candidate
+
+        return native
+
+    def OpenKey(self, key, sub_key, reserved=0,
+                access=RegistryConstants.KEY_READ):
+        """
+        Opens an existing key, raises FileNotFoundError otherwise.
+        """
+        if access & self.KEY_SET_VALUE:
+            self.__read_only()
+        path = self.__relative_path(key, sub_key)
+        with self.__lock:
+            self.__open(path)
+        return FileKey(path)
+
+    OpenKeyEx = OpenKey
+
+    def CloseKey(self, key):
+        """
+        Nothing to release.
+        """
+
+    def EnumKey(self, key, index):
+        """
+        Returns the name of the sub key at 'index', OSError past the end.
+        """
+        with self.__lock:
+            offsets = self.__sub_keys(self.__open(key.path))
+            for number, (offset, _) in enumerate(offsets):
+                if number == index:
+                    name = self.__key_name(offset)
+                    self.__offsets[join_key(key.path, name).lower()] = \
+                        offset
+                    return name
+        raise OSError(259, "No more data is available")
+
+    def EnumValue(self, key, index):
+        """
+        Returns name, data and type of the value at 'index',
+        OSError past the end.
+        """
+        with self.__lock:
+            values = self.__values(self.__open(key.path))
+            if index >= len(values):
+                raise OSError(259, "No more data is available")
+            return self.__value(values[index])
+
+    def QueryInfoKey(self, key):
+        """
+        Returns the number of sub keys and values of an open key and
+        its last write time in 100ns since 1601.
+        """
+        with self.__lock:
+            position = self.__cell(self.__open(key.path), b"nk")
+            modified, sub_keys, values = struct.unpack_from(
+                "<Q8xI12xI", self.__hive(), position + 4)
+            return sub_keys, values, modified
+
+    def QueryValueEx(self, key, value_name):
+        """
+        Returns data and type of a value, FileNotFoundError if missing.
+        """
+        with self.__lock:
+            for offset in self.__values(self.__open(key.path)):
+                name, data, value_type = self.__value(offset)
+                if name.lower() == value_name.lower():
+                    return data, value_type
+        raise FileNotFoundError(
+            2, "The system cannot find the file specified", value_name)
+
+    def FlushKey(self, key):
+        """
+        Nothing to write.
+        """
+
+    CreateKey = SetValueEx = DeleteValue = DeleteKey = __read_only
@@ -18,7 +18,10 @@ Imports the registry key of the backup
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import subprocess
+import os
+from modules.registry_operation.reg_file import import_keys
+from modules.registry_operation.reg_file import import_payloads
+from modules.registry_operation.reg_file import parse_reg
 
 
 class ImportRegkey():
@@ -29,6 +32,9 @@ class ImportRegkey():
     def __init__(self):
         self.__path = None
         self.__reg_file = None
+        self.__reg_data = None
+        self.__reg_payloads = None
+        self.__session = None
 
     def import_regkey(self):
         """
@@ -42,20 +48,26 @@ class ImportRegkey():
         }
 
         try:
-            # Set path to .reg-file
-            import_file = self.__path + "\\" + self.__reg_file
+            # Imports the files of many profiles as one import
+            if self.__reg_payloads is not None:
+                import_payloads(self.__session, self.__reg_payloads)
+                result["success"] = True
 
-            # imports the key
-            subprocess.run(
-                ["reg", "import", import_file],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=True
-                )
+                return result
+
+            reg_data = self.__reg_data
+            if reg_data is None:
+                # Set path to .reg-file
+                import_file = os.path.join(self.__path, self.__reg_file)
+                with open(import_file, "rb") as reg_file:
+                    reg_data = reg_file.read()
+
+            # imports the key like 'reg import'
+            import_keys(self.__session, parse_reg(reg_data))
 
             result["success"] = True
 
-        except (FileNotFoundError, subprocess.CalledProcessError) as e:
+        except (OSError, ValueError) as e:
             result["message"] = str(f"Exception: {e}")
 
         return result
@@ -70,3 +82,32 @@ class ImportRegkey():
         """
         self.__path = path
         self.__reg_file = reg_file
+
+    def set_reg_data(self, reg_data):
+        """
+        Setter
+
+        Params:
+            reg_data (bytes): Content of the .reg file, replaces the
+                              file given to set_data
+        """
+        self.__reg_data = reg_data
+
+    def set_reg_payloads(self, reg_payloads):
+        """
+        Setter
+
+        Params:
+            reg_payloads (list): Contents of the .reg files of many
+                                 profiles, replaces set_reg_data
+        """
+        self.__reg_payloads = reg_payloads
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
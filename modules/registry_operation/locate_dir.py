@@ -1,5 +1,8 @@
 """
 Locating a directory using the Windows registry
+
+With a discovery cache, the registry value of an earlier run is taken
+while neither its key nor the directory has changed since.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -19,7 +22,7 @@ Locating a directory using the Windows registry
 # If not, see <http://www.gnu.org/licenses/>.
 
 import os
-import winreg
+from modules.registry_operation.discovery_cache import dir_stamp
 
 
 class LocateDir():
@@ -30,6 +33,8 @@ class LocateDir():
     def __init__(self):
         self.__reg_hive = None
         self.__reg_path = None
+        self.__session = None
+        self.__cache = None
         self.__located_dir = None
 
     def locate_dir(self):
@@ -46,22 +51,27 @@ class LocateDir():
             "message": None
         }
 
+        cache_name = \
+            f"dir:{self.__reg_hive}\\{self.__reg_path[0]}:{self.__reg_path[1]}"
+
         try:
-            # Sets registry path and opens registry key
-            reg_hive = winreg.__dict__[self.__reg_hive]
-            reg_subkey = winreg.OpenKeyEx(
-                reg_hive, self.__reg_path[0])
-            reg_value = winreg.QueryValueEx(
-                reg_subkey,
-                self.__reg_path[1]
-                )
-
-            # Closes the registry key
-            winreg.CloseKey(reg_subkey)
-
-            # Expand environment variables in the registry value
-            # and set the located directory
-            self.__located_dir = os.path.expandvars(reg_value[0])
+            # Takes the value of an earlier run if it is still valid
+            reg_value = None
+            if self.__cache is not None:
+                reg_value = self.__cache.get(cache_name, self.__stamp)
+
+            # Reads the value through the registry session
+            if reg_value is None:
+                reg_value = self.__session.query_value(
+                    self.__reg_hive,
+                    self.__reg_path[0],
+                    self.__reg_path[1]
+                    )[0]
+                if self.__cache is not None:
+                    self.__cache.put(cache_name, reg_value, self.__stamp)
+
+            # Set the located directory as path of this system
+            self.__located_dir = self.__expand(reg_value)
             result["success"] = True
 
         except FileNotFoundError as e:
@@ -69,6 +79,27 @@ class LocateDir():
 
         return result
 
+    def __expand(self, reg_value):
+        """
+        Expand environment variables in the registry value.
+
+        Returns:
+            str: Directory as path of this system
+        """
+        return self.__session.native_path(os.path.expandvars(reg_value))
+
+    def __stamp(self, reg_value):
+        """
+        Returns:
+            list: Last write time of the key and modification time of
+                  the directory, compared against the cached stamp
+        """
+        return [
+            self.__session.query_info(
+                self.__reg_hive, self.__reg_path[0])[2],
+            dir_stamp(self.__expand(reg_value))
+        ]
+
     def get_dir(self):
         """
         Getter
@@ -87,3 +118,22 @@ class LocateDir():
         """
         self.__reg_hive = reg_hive
         self.__reg_path = reg_path
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
+
+    def set_cache(self, cache):
+        """
+        Setter
+
+        Params:
+            cache (DiscoveryCache): Results of earlier runs, None to
+                                    always read the registry
+        """
+        self.__cache = cache
@@ -1,5 +1,7 @@
 """
 Locates the Creature Mind file using the Windows registry.
+
+A profile table read before answers without another registry access.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,8 +20,6 @@ Locates the Creature Mind file using the Windows registry.
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import winreg
-
 
 class LocateMindFile():
     """
@@ -30,6 +30,8 @@ class LocateMindFile():
         self.__reg_hive = None
         self.__reg_path = None
         self.__backup_profile = None
+        self.__session = None
+        self.__profile_table = None
         self.__creature_mind = None
 
     def locate_file(self):
@@ -45,24 +47,27 @@ class LocateMindFile():
             "message": None
         }
 
+        # Takes the mind file already read with the profile list
+        if self.__profile_table is not None and \
+                self.__profile_table.get_mind_file(
+                    self.__backup_profile) is not None:
+            self.__creature_mind = \
+                self.__profile_table.get_mind_file(self.__backup_profile)
+            result["success"] = True
+
+            return result
+
         try:
-            # Sets registry path and opens registry key
-            reg_hive = winreg.__dict__[self.__reg_hive]
-            reg_subkey = winreg.OpenKeyEx(
-                reg_hive,
+            # Queries the specified value from the profile's key
+            reg_value = self.__session.query_value(
+                self.__reg_hive,
                 self.__reg_path[0] +
                 self.__reg_path[1] +
                 "\\" +
-                self.__backup_profile
+                self.__backup_profile,
+                self.__reg_path[2]
                 )
 
-            # Queries the specified value from the registry key
-            reg_value = winreg.QueryValueEx(
-                reg_subkey, self.__reg_path[2])
-
-            # Closes the registry key
-            winreg.CloseKey(reg_subkey)
-
             # Sets the creature mind with the retrieved registry value
             self.__creature_mind = reg_value[0]
             result["success"] = True
@@ -93,3 +98,22 @@ class LocateMindFile():
         self.__reg_hive = reg_hive
         self.__reg_path = reg_path
         self.__backup_profile = backup_profile
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
+
+    def set_table(self, profile_table):
+        """
+        Setter
+
+        Params:
+            profile_table (ProfileTable): Profiles read before, None to
+                                          query the registry
+        """
+        self.__profile_table = profile_table
@@ -0,0 +1,99 @@
+"""
+Table of the game profiles found in the registry
+
+Holds the name, the creature mind file and the last write time of every
+profile key in parallel arrays, filled in one pass over the profile
+keys. The profile selection, batch mode and the exists check look the
+profiles up in it instead of opening their keys again.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import fnmatch
+from array import array
+
+
+class ProfileTable():
+    """
+    Class holding the profiles read from the registry
+    """
+
+    def __init__(self):
+        self.__names = []
+        self.__mind_files = []
+        self.__modified = array("Q")
+        self.__rows = {}
+
+    def __len__(self):
+        return len(self.__names)
+
+    def __contains__(self, profile):
+        return profile.lower() in self.__rows
+
+    def add(self, profile, mind_file, modified):
+        """
+        Appends a profile.
+
+        Params:
+            profile (str): Name of the profile key
+            mind_file (str): Creature mind file, None if not set
+            modified (int): Last write time of the key in 100ns
+                            since 1601
+        """
+        self.__rows[profile.lower()] = len(self.__names)
+        self.__names.append(profile)
+        self.__mind_files.append(mind_file)
+        self.__modified.append(modified)
+
+    def match(self, pattern):
+        """
+        Returns:
+            list: Names of the profiles matching a glob pattern
+        """
+        return [
+            profile for profile in self.__names
+            if fnmatch.fnmatch(profile, pattern)
+        ]
+
+    def get_names(self):
+        """
+        Getter
+
+        Returns:
+            list: Names of the profiles in registry order
+        """
+        return list(self.__names)
+
+    def get_mind_file(self, profile):
+        """
+        Getter
+
+        Returns:
+            str: Creature mind file of the profile, None if unknown
+        """
+        row = self.__rows.get(profile.lower())
+        return None if row is None else self.__mind_files[row]
+
+    def get_modified(self, profile):
+        """
+        Getter
+
+        Returns:
+            int: Last write time of the profile key, None if unknown
+        """
+        row = self.__rows.get(profile.lower())
+        return None if row is None else self.__modified[row]
@@ -1,5 +1,9 @@
 """
 Reads the available game profiles from the Windows registry.
+
+Every profile key is read once, its name, creature mind file and last
+write time are collected in a ProfileTable. With a discovery cache, the
+table of an earlier run is taken while no profile key has changed.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,7 +22,7 @@ Reads the available game profiles from the Windows registry.
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import winreg
+from modules.registry_operation.profile_table import ProfileTable
 
 
 class ReadProfiles():
@@ -28,13 +32,15 @@ class ReadProfiles():
         self.__reg_hive = None
         self.__reg_path = None
         self.__lang_str = None
-        self.__profile_list = None
+        self.__session = None
+        self.__cache = None
+        self.__profile_table = None
 
     def read_profiles(self):
         """
         Attempts to list the profiles.
 
-        If successful, the profile(s) will be stored in 'self.__profile_list'.
+        If successful, the profile(s) will be stored in 'self.__profile_table'.
 
         Returns a dictionary with 'success" true/false and a message on error.
         """
@@ -43,37 +49,37 @@ class ReadProfiles():
             "message": None
         }
 
-        try:
-            # Sets registry path and opens registry key
-            reg_hive = winreg.__dict__[self.__reg_hive]
-            reg_subkey = winreg.OpenKeyEx(
-                reg_hive, self.__reg_path[0] + self.__reg_path[1])
-
-            index = 0
-            profiles = []
+        profiles_path = self.__reg_path[0] + self.__reg_path[1]
+        cache_name = \
+            f"profiles:{self.__reg_hive}\\{profiles_path}:{self.__reg_path[2]}"
 
-            # Loop iterates until all profiles are added to the profile list
-            while True:
-                try:
-                    key_name = winreg.EnumKey(reg_subkey, index)
-                    profiles.append(key_name)
-                    index += 1
+        try:
+            # Takes the profiles of an earlier run if they are still valid
+            rows = None
+            if self.__cache is not None:
+                rows = self.__cache.get(cache_name, self.__stamp)
 
-                except OSError:
-                    break
+            if rows is None:
+                # Lists the profile keys through the registry session
+                profiles = self.__session.enum_keys(
+                    self.__reg_hive, profiles_path)
 
-            # Closes the registry key
-            winreg.CloseKey(reg_subkey)
+                # If no profiles were found
+                if not profiles:
+                    result["success"] = False
+                    result["message"] = self.__lang_str
 
-            # If no profiles were found
-            if not profiles:
-                result["success"] = False
-                result["message"] = self.__lang_str
+                    return result
 
-                return result
+                rows = [self.__read_row(profile) for profile in profiles]
+                if self.__cache is not None:
+                    self.__cache.put(cache_name, rows, self.__stamp)
 
             # If profiles are found
-            self.__profile_list = profiles
+            profile_table = ProfileTable()
+            for row in rows:
+                profile_table.add(*row)
+            self.__profile_table = profile_table
             result["success"] = True
 
         except (FileNotFoundError, PermissionError) as e:
@@ -81,14 +87,57 @@ class ReadProfiles():
 
         return result
 
+    def __read_row(self, profile):
+        """
+        Reads the mind file and write time of a profile key.
+
+        Returns:
+            list: Name, creature mind file and last write time
+        """
+        profile_path = self.__reg_path[0] + self.__reg_path[1] + "\\" + profile
+        modified = self.__session.query_info(
+            self.__reg_hive, profile_path)[2]
+        try:
+            mind_file = self.__session.query_value(
+                self.__reg_hive, profile_path, self.__reg_path[2])[0]
+        except FileNotFoundError:
+            mind_file = None
+
+        return [profile, mind_file, modified]
+
+    def __stamp(self, rows):
+        """
+        Returns:
+            list: Number of profiles and last write time of the
+                  profiles key and of every profile key
+        """
+        profiles_path = self.__reg_path[0] + self.__reg_path[1]
+        sub_keys, _, modified = self.__session.query_info(
+            self.__reg_hive, profiles_path)
+
+        return [sub_keys, modified, [
+            self.__session.query_info(
+                self.__reg_hive, profiles_path + "\\" + row[0])[2]
+            for row in rows
+        ]]
+
     def get_profile_list(self):
         """
         Getter
 
         Returns:
-            dict: List of available profiles
+            list: List of available profiles
+        """
+        return self.__profile_table.get_names()
+
+    def get_profile_table(self):
+        """
+        Getter
+
+        Returns:
+            ProfileTable: Available profiles with their mind files
         """
-        return self.__profile_list
+        return self.__profile_table
 
     def set_data(self, reg_hive, reg_path, lang_str):
         """
@@ -102,3 +151,22 @@ class ReadProfiles():
         self.__reg_hive = reg_hive
         self.__reg_path = reg_path
         self.__lang_str = lang_str
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
+
+    def set_cache(self, cache):
+        """
+        Setter
+
+        Params:
+            cache (DiscoveryCache): Results of earlier runs, None to
+                                    always read the registry
+        """
+        self.__cache = cache
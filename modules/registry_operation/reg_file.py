@@ -0,0 +1,416 @@
+"""
+Reads and writes registry files (.reg) without the 'reg' tool
+
+Writes the format of 'reg export' (REGEDIT5, UTF-16LE with byte order
+mark, CRLF line ends, hex data wrapped like regedit does) and reads it
+back, as well as REGEDIT4 files. The keys are read and written through
+the registry session, so no process has to be started.
+
+The keys of many profiles can be exported in one pass over the profiles
+key and split into one file per profile, and the files of many profiles
+imported together, saving each hive once.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+from modules.registry_operation.file_registry import RegistryConstants
+
+
+HEADER = "Windows Registry Editor Version 5.00"
+HEADER4 = "REGEDIT4"
+
+# Column at which regedit wraps hex data onto the next line
+MAX_HEX_CHARS = 77
+
+# Indent of the continued hex lines
+HEX_INDENT = "  "
+
+# Number of the hex(...) types written by regedit
+HEX_TYPES = {
+    RegistryConstants.REG_BINARY: "hex:",
+    RegistryConstants.REG_EXPAND_SZ: "hex(2):",
+    RegistryConstants.REG_MULTI_SZ: "hex(7):",
+    RegistryConstants.REG_QWORD: "hex(b):"
+}
+
+# Types holding a single string and a number
+STRING_TYPES = (RegistryConstants.REG_SZ, RegistryConstants.REG_EXPAND_SZ)
+NUMBER_TYPES = (RegistryConstants.REG_DWORD, RegistryConstants.REG_QWORD)
+
+
+def escape_string(text):
+    """
+    Returns:
+        str: Text quoted like a value name or string in a .reg file
+    """
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def value_bytes(data, value_type):
+    """
+    Converts the data of a value to its raw bytes.
+
+    Params:
+        data (object): Data as returned by QueryValueEx
+        value_type (int): Registry type
+
+    Returns:
+        bytes: Data as stored in the registry
+    """
+    if value_type in STRING_TYPES:
+        return (data + "\0").encode("utf-16le")
+    if value_type == RegistryConstants.REG_MULTI_SZ:
+        return "".join(text + "\0" for text in data + [""]) \
+            .encode("utf-16le")
+    if value_type == RegistryConstants.REG_DWORD:
+        return data.to_bytes(4, "little")
+    if value_type == RegistryConstants.REG_QWORD:
+        return data.to_bytes(8, "little")
+    return bytes(data or b"")
+
+
+def bytes_value(raw, value_type):
+    """
+    Converts raw bytes to the data of a value, the reverse
+    of value_bytes().
+
+    Returns:
+        object: Data as taken by SetValueEx
+    """
+    if value_type in STRING_TYPES:
+        return raw.decode("utf-16le").split("\0", 1)[0]
+    if value_type == RegistryConstants.REG_MULTI_SZ:
+        texts = raw.decode("utf-16le").split("\0")
+        return texts[:texts.index("")] if "" in texts else texts
+    if value_type in NUMBER_TYPES:
+        return int.from_bytes(raw, "little")
+    return raw
+
+
+def format_hex(line_len, raw):
+    """
+    Formats bytes as comma separated hex, wrapped like regedit does.
+
+    Params:
+        line_len (int): Length of the line in front of the data
+        raw (bytes): Data to format
+
+    Returns:
+        str: Hex data including the line continuations
+    """
+    parts = []
+    for index, byte in enumerate(raw):
+        parts.append(f"{byte:02x}")
+        if index == len(raw) - 1:
+            break
+        parts.append(",")
+        line_len += 3
+
+        if line_len >= MAX_HEX_CHARS:
+            parts.append("\\\r\n" + HEX_INDENT)
+            line_len = len(HEX_INDENT)
+
+    return "".join(parts)
+
+
+def format_value(name, data, value_type):
+    """
+    Returns:
+        str: Line(s) of a value in a .reg file, without line end
+    """
+    prefix = ("@" if name == "" else escape_string(name)) + "="
+
+    if value_type == RegistryConstants.REG_SZ:
+        return prefix + escape_string(data)
+    if value_type == RegistryConstants.REG_DWORD:
+        return prefix + f"dword:{data:08x}"
+
+    hex_type = HEX_TYPES.get(value_type, f"hex({value_type:x}):")
+    prefix += hex_type
+    return prefix + format_hex(len(prefix), value_bytes(data, value_type))
+
+
+def dump_reg(keys):
+    """
+    Params:
+        keys (list): Tuples of key path and its values as
+                     tuples of name, data and type
+
+    Returns:
+        bytes: Content of the .reg file
+    """
+    lines = [HEADER, ""]
+    for reg_path, values in keys:
+        lines.append(f"[{reg_path}]")
+        lines.extend(format_value(*value) for value in values)
+        lines.append("")
+
+    return b"\xff\xfe" + ("\r\n".join(lines) + "\r\n").encode("utf-16le")
+
+
+def decode_reg(reg_data):
+    """
+    Returns:
+        str: Text of a .reg file in UTF-16 or, for REGEDIT4, ANSI
+    """
+    if reg_data.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return reg_data.decode("utf-16")
+    return reg_data.decode("latin-1")
+
+
+def logical_lines(text):
+    """
+    Joins continued lines and drops comments and empty lines.
+
+    Returns:
+        list: Lines of the file
+    """
+    lines = []
+    pending = ""
+    for line in text.splitlines():
+        line = pending + line.strip() if pending else line.rstrip()
+
+        if line.endswith("\\") and not line.startswith("["):
+            pending = line[:-1]
+            continue
+
+        pending = ""
+        if line and not line.startswith(";"):
+            lines.append(line)
+
+    if pending:
+        lines.append(pending)
+
+    return lines
+
+
+def parse_string(line, start):
+    """
+    Reads a quoted string.
+
+    Params:
+        line (str): Line holding the string
+        start (int): Position of the opening quote
+
+    Returns:
+        tuple: Unescaped text and the position after the closing quote
+    """
+    chars = []
+    index = start + 1
+    while index < len(line):
+        char = line[index]
+        if char == "\\" and index + 1 < len(line):
+            chars.append(line[index + 1])
+            index += 2
+            continue
+        if char == '"':
+            return "".join(chars), index + 1
+        chars.append(char)
+        index += 1
+
+    raise ValueError(f"Unterminated string: {line}")
+
+
+def parse_data(text, unicode):
+    """
+    Params:
+        text (str): Data behind the '=' of a value line
+        unicode (bool): True for REGEDIT5 files, hex strings are
+                        UTF-16LE instead of ANSI
+
+    Returns:
+        tuple: Data and type, (None, None) to delete the value
+    """
+    if text == "-":
+        return None, None
+
+    if text.startswith('"'):
+        data, end = parse_string(text, 0)
+        if text[end:].strip():
+            raise ValueError(f"Invalid string value: {text}")
+        return data, RegistryConstants.REG_SZ
+
+    if text.lower().startswith("dword:"):
+        return int(text[6:], 16), RegistryConstants.REG_DWORD
+
+    if text.lower().startswith("hex"):
+        hex_type, _, hex_data = text.partition(":")
+        value_type = RegistryConstants.REG_BINARY
+        if hex_type.lower() != "hex":
+            value_type = int(hex_type[4:-1], 16)
+        raw = bytes.fromhex(hex_data.replace(",", " "))
+
+        # REGEDIT4 stores strings as ANSI
+        if not unicode and value_type in (
+                *STRING_TYPES, RegistryConstants.REG_MULTI_SZ):
+            raw = raw.decode("latin-1").encode("utf-16le")
+
+        return bytes_value(raw, value_type), value_type
+
+    raise ValueError(f"Unknown value format: {text}")
+
+
+def parse_reg(reg_data):
+    """
+    Params:
+        reg_data (bytes): Content of a .reg file
+
+    Returns:
+        list: Tuples of key path and its values as tuples of name,
+              data and type, values None to delete the key and
+              data None to delete the value
+    """
+    lines = logical_lines(decode_reg(reg_data))
+    if not lines or lines[0] not in (HEADER, HEADER4):
+        raise ValueError("Not a registry file")
+    unicode = lines[0] == HEADER
+
+    keys = []
+    for line in lines[1:]:
+        if line.startswith("[") and line.endswith("]"):
+            if line.startswith("[-"):
+                keys.append((line[2:-1], None))
+            else:
+                keys.append((line[1:-1], []))
+            continue
+
+        if not keys or keys[-1][1] is None:
+            raise ValueError(f"Value outside of a key: {line}")
+
+        if line.startswith("@="):
+            name, end = "", 1
+        elif line.startswith('"'):
+            name, end = parse_string(line, 0)
+        else:
+            raise ValueError(f"Invalid value line: {line}")
+
+        if line[end:end + 1] != "=":
+            raise ValueError(f"Invalid value line: {line}")
+        keys[-1][1].append((name, *parse_data(line[end + 1:], unicode)))
+
+    return keys
+
+
+def split_hive(reg_path):
+    """
+    Returns:
+        tuple: Hive and the path of the key below it
+    """
+    reg_hive, _, sub_key = reg_path.partition("\\")
+    return reg_hive, sub_key
+
+
+def export_keys(session, reg_path):
+    """
+    Reads a key with all its sub keys, like 'reg export'.
+
+    Params:
+        session (RegistrySession): Registry access of this run
+        reg_path (str): Full path of the key including the hive
+
+    Returns:
+        list: Tuples of key path and its values, parents first
+    """
+    reg_hive, sub_key = split_hive(reg_path)
+    keys = [(reg_path, session.enum_values(reg_hive, sub_key))]
+    for name in session.enum_keys(reg_hive, sub_key):
+        keys.extend(export_keys(session, reg_path + "\\" + name))
+
+    return keys
+
+
+def import_keys(session, keys):
+    """
+    Writes keys read by parse_reg(), like 'reg import'.
+
+    Params:
+        session (RegistrySession): Registry access of this run
+        keys (list): Tuples of key path and its values
+    """
+    for reg_path, values in keys:
+        reg_hive, sub_key = split_hive(reg_path)
+
+        if values is None:
+            try:
+                session.delete_tree(reg_hive, sub_key)
+            except FileNotFoundError:
+                pass
+            continue
+
+        session.create_key(reg_hive, sub_key)
+        for name, data, value_type in values:
+            if value_type is None:
+                try:
+                    session.delete_value(reg_hive, sub_key, name)
+                except FileNotFoundError:
+                    pass
+            else:
+                session.set_value(reg_hive, sub_key, name, data, value_type)
+
+    # Saved once all keys are written
+    for reg_hive in {split_hive(reg_path)[0] for reg_path, _ in keys}:
+        session.flush(reg_hive)
+
+
+def split_profiles(keys, profiles_key):
+    """
+    Splits the keys exported from the profiles key by profile.
+
+    Params:
+        keys (list): Tuples of key path and its values, as returned by
+                     export_keys() for the profiles key
+        profiles_key (str): Full path of the profiles key
+
+    Returns:
+        dict: Keys of each profile by profile name, parents first
+    """
+    profiles = {}
+    prefix = profiles_key + "\\"
+    for reg_path, values in keys:
+        if reg_path.startswith(prefix):
+            profile = reg_path[len(prefix):].split("\\", 1)[0]
+            profiles.setdefault(profile, []).append((reg_path, values))
+
+    return profiles
+
+
+def export_profiles(session, profiles_key):
+    """
+    Exports every profile at once, each file as 'reg export' would
+    write it for the profile key.
+
+    Returns:
+        dict: Content of the .reg file of each profile by profile name
+    """
+    return {
+        profile: dump_reg(keys)
+        for profile, keys in split_profiles(
+            export_keys(session, profiles_key), profiles_key).items()
+    }
+
+
+def import_payloads(session, payloads):
+    """
+    Imports the .reg files of many profiles as one import.
+
+    Params:
+        session (RegistrySession): Registry access of this run
+        payloads (list): Contents of the .reg files
+    """
+    import_keys(session, [
+        key for reg_data in payloads for key in parse_reg(reg_data)
+    ])
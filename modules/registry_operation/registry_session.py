@@ -0,0 +1,292 @@
+"""
+Shared access to the registry for one run of the tool
+
+Every module reads and writes the registry through one session. It
+opens each key once, keeps the handle and caches the values and sub
+keys it has read. The backend is 'winreg' on Windows, a WineRegistry
+on the user.reg file of a Wine prefix, a read-only HiveRegistry on the
+NTUSER.DAT of an unmounted Windows disk or a FileRegistry to run the
+pipelines against a registry stored in a JSON file.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import threading
+from modules.registry_operation.file_registry import FileRegistry
+from modules.registry_operation.hive_registry import HiveRegistry
+from modules.registry_operation.wine_registry import WineRegistry
+
+try:
+    import winreg
+except ImportError:
+    winreg = None
+
+
+# Backends selectable in the configuration
+BACKENDS = ("winreg", "wine", "hive", "file")
+
+
+def open_backend(backend, registry_file=None):
+    """
+    Params:
+        backend (str): Name of the backend, one of BACKENDS
+        registry_file (str): JSON file of the 'file' backend, empty
+                             for an in-memory registry, user.reg or
+                             prefix directory of the 'wine' backend,
+                             empty for $WINEPREFIX or ~/.wine,
+                             NTUSER.DAT of the 'hive' backend
+
+    Returns:
+        object: Module or object offering the 'winreg' functions
+    """
+    if backend == "winreg":
+        if winreg is None:
+            raise ValueError("The winreg backend needs Windows")
+        return winreg
+
+    if backend == "wine":
+        registry_file = registry_file or os.environ.get(
+            "WINEPREFIX", os.path.expanduser("~/.wine"))
+        if os.path.isdir(registry_file):
+            registry_file = os.path.join(registry_file, "user.reg")
+        return WineRegistry(registry_file)
+
+    if backend == "hive":
+        if not registry_file:
+            raise ValueError("The hive backend needs the NTUSER.DAT file")
+        return HiveRegistry(registry_file)
+
+    if backend == "file":
+        return FileRegistry(registry_file or None)
+
+    raise ValueError(f"Unknown registry backend {backend}")
+
+
+class RegistrySession():
+    """
+    Class caching registry handles and values for one run
+    """
+
+    def __init__(self, backend):
+        self.__backend = backend
+        self.__lock = threading.RLock()
+        self.__handles = {}
+        self.__values = {}
+        self.__sub_keys = {}
+
+    def __open_key(self, reg_hive, reg_path, access):
+        """
+        Returns:
+            object: Cached handle of the key, opened on first use
+        """
+        key = (reg_hive, reg_path.lower(), access)
+        with self.__lock:
+            if key not in self.__handles:
+                self.__handles[key] = self.__backend.OpenKeyEx(
+                    getattr(self.__backend, reg_hive), reg_path, 0,
+                    getattr(self.__backend, access))
+            return self.__handles[key]
+
+    def query_value(self, reg_hive, reg_path, value_name):
+        """
+        Reads a value, raises FileNotFoundError if the key or the
+        value does not exist.
+
+        Params:
+            reg_hive (str): Registry hive, e.g. 'HKEY_CURRENT_USER'
+            reg_path (str): Path of the key
+            value_name (str): Name of the value
+
+        Returns:
+            tuple: Data and type of the value
+        """
+        key = (reg_hive, reg_path.lower(), value_name)
+        with self.__lock:
+            if key not in self.__values:
+                self.__values[key] = self.__backend.QueryValueEx(
+                    self.__open_key(reg_hive, reg_path, "KEY_READ"),
+                    value_name)
+            return self.__values[key]
+
+    def enum_keys(self, reg_hive, reg_path):
+        """
+        Lists the sub keys, raises FileNotFoundError if the key
+        does not exist.
+
+        Returns:
+            list: Names of the sub keys
+        """
+        key = (reg_hive, reg_path.lower())
+        with self.__lock:
+            if key not in self.__sub_keys:
+                handle = self.__open_key(reg_hive, reg_path, "KEY_READ")
+                names = []
+
+                # Sized by the key information, ends early if keys were
+                # deleted in the meantime
+                for index in range(self.__backend.QueryInfoKey(handle)[0]):
+                    try:
+                        names.append(self.__backend.EnumKey(handle, index))
+                    except OSError:
+                        break
+
+                self.__sub_keys[key] = names
+            return list(self.__sub_keys[key])
+
+    def enum_values(self, reg_hive, reg_path):
+        """
+        Lists the values of a key, raises FileNotFoundError if the key
+        does not exist.
+
+        Returns:
+            list: Tuples of name, data and type in registry order
+        """
+        with self.__lock:
+            handle = self.__open_key(reg_hive, reg_path, "KEY_READ")
+            values = []
+
+            # Sized by the key information like the sub keys
+            for index in range(self.__backend.QueryInfoKey(handle)[1]):
+                try:
+                    values.append(self.__backend.EnumValue(handle, index))
+                except OSError:
+                    break
+
+            return values
+
+    def query_info(self, reg_hive, reg_path):
+        """
+        Reads the key information, raises FileNotFoundError if the key
+        does not exist.
+
+        Returns:
+            tuple: Number of sub keys and values and the last write
+                   time in 100ns since 1601
+        """
+        with self.__lock:
+            return self.__backend.QueryInfoKey(
+                self.__open_key(reg_hive, reg_path, "KEY_READ"))
+
+    def key_exists(self, reg_hive, reg_path):
+        """
+        Returns:
+            bool: True if the key can be opened
+        """
+        try:
+            self.__open_key(reg_hive, reg_path, "KEY_READ")
+            return True
+        except OSError:
+            return False
+
+    def set_value(self, reg_hive, reg_path, value_name, data,
+                  value_type="REG_BINARY"):
+        """
+        Writes a value into an existing key.
+
+        Params:
+            value_type (str|int): Registry type, e.g. 'REG_SZ', or
+                                  its number
+        """
+        if isinstance(value_type, str):
+            value_type = getattr(self.__backend, value_type)
+
+        with self.__lock:
+            self.__backend.SetValueEx(
+                self.__open_key(reg_hive, reg_path, "KEY_SET_VALUE"),
+                value_name, 0, value_type, data)
+            self.__values[(reg_hive, reg_path.lower(), value_name)] = \
+                (data, value_type)
+
+    def delete_value(self, reg_hive, reg_path, value_name):
+        """
+        Removes a value, raises FileNotFoundError if it does not exist.
+        """
+        with self.__lock:
+            self.__values.pop((reg_hive, reg_path.lower(), value_name), None)
+            self.__backend.DeleteValue(
+                self.__open_key(reg_hive, reg_path, "KEY_SET_VALUE"),
+                value_name)
+
+    def create_key(self, reg_hive, reg_path):
+        """
+        Creates a key and its missing parents.
+        """
+        with self.__lock:
+            self.__backend.CloseKey(self.__backend.CreateKey(
+                getattr(self.__backend, reg_hive), reg_path))
+            self.__sub_keys.clear()
+
+    def delete_key(self, reg_hive, reg_path):
+        """
+        Deletes a key without sub keys, raises FileNotFoundError
+        if it does not exist.
+        """
+        with self.__lock:
+            self.invalidate()
+            self.__backend.DeleteKey(
+                getattr(self.__backend, reg_hive), reg_path)
+
+    def delete_tree(self, reg_hive, reg_path):
+        """
+        Deletes a key with all its sub keys, raises FileNotFoundError
+        if it does not exist.
+        """
+        with self.__lock:
+            for name in self.enum_keys(reg_hive, reg_path):
+                self.delete_tree(reg_hive, reg_path + "\\" + name)
+            self.delete_key(reg_hive, reg_path)
+
+    def flush(self, reg_hive):
+        """
+        Writes the changes of a hive, backends keeping them in memory
+        save them only then.
+        """
+        with self.__lock:
+            self.__backend.FlushKey(getattr(self.__backend, reg_hive))
+
+    def native_path(self, path):
+        """
+        Params:
+            path (str): Path read from the registry
+
+        Returns:
+            str: Path on this system, translated into the Wine prefix
+                 for the 'wine' backend and into the disk image for
+                 the 'hive' backend
+        """
+        if isinstance(self.__backend, (WineRegistry, HiveRegistry)):
+            return self.__backend.native_path(path)
+        return path
+
+    def invalidate(self):
+        """
+        Closes all handles and drops the cached values, e.g. after
+        the registry was changed outside of the session.
+        """
+        with self.__lock:
+            for handle in self.__handles.values():
+                self.__backend.CloseKey(handle)
+            self.__handles.clear()
+            self.__values.clear()
+            self.__sub_keys.clear()
+
+    def close(self):
+        """
+        Closes all handles at the end of the run.
+        """
+        self.invalidate()
@@ -0,0 +1,592 @@
+"""
+Registry backend reading the user.reg file of a Wine prefix
+
+Wine keeps HKEY_CURRENT_USER in the text file 'user.reg' of the prefix.
+The file is memory-mapped and indexed by key once, so looking up a key
+or listing its sub keys does not scan the file again. Values are only
+parsed for the keys that are read. Changes are kept in memory until
+FlushKey(), which writes the file atomically, copying the unchanged
+keys as they are.
+
+The wineserver keeps its own copy of the registry and writes it back
+when it exits, so the prefix must not be running while writing.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import getpass
+import mmap
+import os
+import re
+import threading
+import time
+from modules.registry_operation.file_registry import EPOCH_DIFFERENCE
+from modules.registry_operation.file_registry import FileKey
+from modules.registry_operation.file_registry import RegistryConstants
+from modules.registry_operation.file_registry import filetime
+from modules.registry_operation.file_registry import join_key
+from modules.registry_operation.reg_file import STRING_TYPES
+from modules.registry_operation.reg_file import bytes_value
+from modules.registry_operation.reg_file import value_bytes
+
+
+# Header line of a key, '[Software\\Wine] 1700000000'
+KEY_HEADER = re.compile(rb"^\[(.*)\][^\]\n]*$", re.M)
+
+# Control characters written as C escapes, all others as octal
+C_ESCAPES = {
+    "\a": "a", "\b": "b", "\t": "t", "\n": "n", "\v": "v", "\f": "f",
+    "\r": "r", "\x1b": "e"
+}
+C_UNESCAPES = {escape: char for char, escape in C_ESCAPES.items()}
+
+# Escape sequence, hex and octal ones with their digits
+ESCAPE = re.compile(r"\\(x[0-9a-fA-F]{1,4}|[0-7]{1,3}|.)", re.S)
+
+# Column after which Wine wraps hex data
+MAX_HEX_COUNT = 76
+
+
+def escape_wine(text, chars):
+    """
+    Escapes a string like Wine does in its registry files.
+
+    Params:
+        text (str): Text to escape
+        chars (str): Characters escaped in addition to backslashes
+
+    Returns:
+        str: Escaped text
+    """
+    parts = []
+    for index, char in enumerate(text):
+        following = text[index + 1:index + 2]
+        if ord(char) > 127:
+            if following and following in "0123456789abcdefABCDEF":
+                parts.append(f"\\x{ord(char):04x}")
+            else:
+                parts.append(f"\\x{ord(char):x}")
+        elif ord(char) < 32:
+            if char in C_ESCAPES:
+                parts.append("\\" + C_ESCAPES[char])
+            elif following and following in "01234567":
+                parts.append(f"\\{ord(char):03o}")
+            else:
+                parts.append(f"\\{ord(char):o}")
+        elif char == "\\" or char in chars:
+            parts.append("\\" + char)
+        else:
+            parts.append(char)
+
+    return "".join(parts)
+
+
+def unescape_wine(text):
+    """
+    Returns:
+        str: Text with the escapes of escape_wine() resolved
+    """
+    if "\\" not in text:
+        return text
+    return ESCAPE.sub(unescape_match, text)
+
+
+def unescape_match(match):
+    """
+    Returns:
+        str: Character of a single escape sequence
+    """
+    escape = match.group(1)
+    if escape[0] == "x" and len(escape) > 1:
+        return chr(int(escape[1:], 16))
+    if escape[0] in "01234567":
+        return chr(int(escape, 8))
+    return C_UNESCAPES.get(escape, escape)
+
+
+def split_quoted(text):
+    """
+    Splits a line at the end of the quoted string it starts with.
+
+    Returns:
+        tuple: Escaped content of the string and the rest of the line
+    """
+    index = 1
+    while index < len(text):
+        if text[index] == "\\":
+            index += 2
+            continue
+        if text[index] == '"':
+            return text[1:index], text[index + 1:]
+        index += 1
+
+    raise ValueError(f"Unterminated string: {text}")
+
+
+def format_wine_value(name, data, value_type):
+    """
+    Returns:
+        str: Line(s) of a value in a Wine registry file
+    """
+    line = ('"' + escape_wine(name, '"') + '"=') if name else "@="
+
+    # Strings are written as text, without the terminating null
+    if value_type in (*STRING_TYPES, RegistryConstants.REG_MULTI_SZ):
+        text = value_bytes(data, value_type).decode("utf-16le")
+        if value_type != RegistryConstants.REG_SZ:
+            line += f"str({value_type:x}):"
+        return line + '"' + escape_wine(text[:-1], '"') + '"'
+
+    if value_type == RegistryConstants.REG_DWORD:
+        return line + f"dword:{data:08x}"
+
+    line += "hex:" if value_type == RegistryConstants.REG_BINARY \
+        else f"hex({value_type:x}):"
+    raw = value_bytes(data, value_type)
+    parts = [line]
+    count = len(line)
+    for index, byte in enumerate(raw):
+        parts.append(f"{byte:02x}")
+        count += 2
+        if index < len(raw) - 1:
+            parts.append(",")
+            count += 1
+            if count > MAX_HEX_COUNT:
+                parts.append("\\\n  ")
+                count = 2
+
+    return "".join(parts)
+
+
+def parse_wine_value(line):
+    """
+    Returns:
+        tuple: Name, data and type of a value line
+    """
+    if line.startswith("@="):
+        name, data = "", line[2:]
+    elif line.startswith('"'):
+        name, data = split_quoted(line)
+        name = unescape_wine(name)
+        if not data.startswith("="):
+            raise ValueError(f"Invalid value line: {line}")
+        data = data[1:]
+    else:
+        raise ValueError(f"Invalid value line: {line}")
+
+    if data.startswith('"'):
+        return name, unescape_wine(split_quoted(data)[0]), \
+            RegistryConstants.REG_SZ
+
+    if data.startswith("str("):
+        value_type = int(data[4:data.index(")")], 16)
+        text = unescape_wine(split_quoted(data[data.index(":") + 1:])[0])
+        raw = (text + "\0").encode("utf-16le")
+        return name, bytes_value(raw, value_type), value_type
+
+    if data.startswith("dword:"):
+        return name, int(data[6:], 16), RegistryConstants.REG_DWORD
+
+    if data.startswith("hex"):
+        hex_type, _, hex_data = data.partition(":")
+        value_type = RegistryConstants.REG_BINARY if hex_type == "hex" \
+            else int(hex_type[4:-1], 16)
+        raw = bytes.fromhex(hex_data.replace(",", " "))
+        return name, bytes_value(raw, value_type), value_type
+
+    raise ValueError(f"Unknown value format: {line}")
+
+
+class WineRegistry(RegistryConstants):
+    """
+    Class providing the 'winreg' functions on a Wine user.reg file
+    """
+
+    def __init__(self, reg_file):
+        self.__reg_file = reg_file
+        self.__lock = threading.RLock()
+        self.__stamp = None
+        self.__map = b""
+        self.__keys = {}
+        self.__sub_keys = {}
+        self.__parsed = {}
+        self.__changed = set()
+        self.__deleted = []
+
+    def __index(self):
+        """
+        Maps the file and indexes its keys, again if the file was
+        changed by another process. Keys only holding sub keys are not
+        written by Wine and are added to the index as well.
+        """
+        stat = os.stat(self.__reg_file)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp == self.__stamp:
+            return
+
+        if isinstance(self.__map, mmap.mmap):
+            self.__map.close()
+        self.__map = b""
+        if stat.st_size:
+            with open(self.__reg_file, "rb") as reg_file:
+                self.__map = mmap.mmap(
+                    reg_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.__keys = {"": {"name": "", "span": None}}
+        self.__sub_keys = {"": []}
+        self.__parsed = {}
+        self.__changed = set()
+        self.__deleted = []
+
+        headers = list(KEY_HEADER.finditer(self.__map))
+        for index, header in enumerate(headers):
+            end = headers[index + 1].start() if index + 1 < len(headers) \
+                else len(self.__map)
+            name = header.group(1).decode("utf-8", "replace")
+
+            # Most names only escape the separators
+            parts = name.split("\\\\")
+            if any("\\" in part for part in parts):
+                parts = unescape_wine(name).split("\\")
+            self.__add_key("\\".join(part for part in parts if part))[
+                "span"] = (header.start(), end)
+
+        self.__stamp = stamp
+
+    def __add_key(self, path):
+        """
+        Returns:
+            dict: Index entry of a key, added with its parents if new
+        """
+        lower = path.lower()
+        if lower not in self.__keys:
+            parent, _, name = path.rpartition("\\")
+            self.__add_key(parent)
+            self.__sub_keys[parent.lower()].append(name)
+            self.__keys[lower] = {"name": path, "span": None}
+            self.__sub_keys[lower] = []
+
+        return self.__keys[lower]
+
+    def __relative_path(self, key, sub_key):
+        """
+        Returns:
+            str: Path of a key below HKEY_CURRENT_USER
+        """
+        if isinstance(key, int):
+            if key != self.HKEY_CURRENT_USER:
+                raise FileNotFoundError(
+                    2, "Wine prefixes only hold HKEY_CURRENT_USER")
+            return join_key(sub_key)
+        return join_key(key.path, sub_key)
+
+    def __key(self, lower):
+        """
+        Returns:
+            dict: Header, metadata lines and values of a key,
+                  parsed on first use
+        """
+        if lower not in self.__parsed:
+            entry = self.__keys[lower]
+            key = {
+                "header": f"[{escape_wine(entry['name'], '[]')}] "
+                          f"{int(time.time())}",
+                "meta": [],
+                "values": {}
+            }
+
+            if entry["span"] is not None:
+                start, end = entry["span"]
+                lines = self.__map[start:end].decode("utf-8", "replace") \
+                    .replace("\\\n", "").split("\n")
+                key["header"] = lines[0]
+                for line in lines[1:]:
+                    line = line.strip()
+                    if line.startswith("#"):
+                        key["meta"].append(line)
+                    elif line and not line.startswith(";"):
+                        name, data, value_type = parse_wine_value(line)
+                        key["values"][name] = (data, value_type)
+            else:
+                key["meta"].append(f"#time={filetime():x}")
+
+            self.__parsed[lower] = key
+
+        return self.__parsed[lower]
+
+    def __touch(self, lower):
+        """
+        Marks a key as changed and sets its write time like Wine,
+        parents only held in the index are left as they are.
+        """
+        if not lower or self.__keys[lower]["span"] is None and \
+                lower not in self.__changed:
+            return
+
+        key = self.__key(lower)
+        key["header"] = \
+            f"{key['header'].rpartition(']')[0]}] {int(time.time())}"
+        key["meta"] = [
+            line for line in key["meta"] if not line.startswith("#time=")
+        ] + [f"#time={filetime():x}"]
+        self.__changed.add(lower)
+
+    @staticmethod
+    def __not_found(name):
+        return FileNotFoundError(
+            2, "The system cannot find the file specified", name)
+
+    def native_path(self, path):
+        """
+        Translates a Windows path of the prefix into a path on this
+        system, e.g. 'C:\\users\\me' to '<prefix>/drive_c/users/me'.
+
+        Returns:
+            str: Path on this system, unchanged if not a Windows path
+        """
+        path = path.replace(
+            "%USERPROFILE%", "C:\\users\\" + getpass.getuser())
+        match = re.match(r"^([A-Za-z]):(.*)$", path)
+        if match is None:
+            return path
+
+        prefix = os.path.dirname(os.path.abspath(self.__reg_file))
+        drive = match.group(1).lower()
+        root = os.path.join(prefix, "dosdevices", drive + ":")
+        if not os.path.exists(root):
+            root = os.path.join(prefix, "drive_" + drive)
+
+        return os.path.join(
+            root, *[part for part in match.group(2).split("\\") if part])
+
+    def OpenKey(self, key, sub_key, reserved=0,
+                access=RegistryConstants.KEY_READ):
+        """
+        Opens an existing key, raises FileNotFoundError otherwise.
+        """
+        path = self.__relative_path(key, sub_key)
+        with self.__lock:
+            self.__index()
+            if path.lower() not in self.__keys:
+                raise self.__not_found(path)
+            return FileKey(self.__keys[path.lower()]["name"])
+
+    OpenKeyEx = OpenKey
+
+    def CreateKey(self, key, sub_key):
+        """
+        Opens a key, creating it and its parents if necessary.
+        """
+        path = self.__relative_path(key, sub_key)
+        with self.__lock:
+            self.__index()
+            if path.lower() not in self.__keys:
+                self.__add_key(path)
+                self.__key(path.lower())
+                self.__changed.add(path.lower())
+                self.__touch(path.rpartition("\\")[0].lower())
+            return FileKey(self.__keys[path.lower()]["name"])
+
+    def CloseKey(self, key):
+        """
+        Nothing to release, changes are written by FlushKey().
+        """
+
+    def EnumKey(self, key, index):
+        """
+        Returns the name of the sub key at 'index', OSError past the end.
+        """
+        with self.__lock:
+            self.__index()
+            names = self.__sub_keys[key.path.lower()]
+            if index >= len(names):
+                raise OSError(259, "No more data is available")
+            return names[index]
+
+    def EnumValue(self, key, index):
+        """
+        Returns name, data and type of the value at 'index',
+        OSError past the end.
+        """
+        with self.__lock:
+            self.__index()
+            values = list(self.__key(key.path.lower())["values"].items())
+        if index >= len(values):
+            raise OSError(259, "No more data is available")
+        name, value = values[index]
+        return (name, *value)
+
+    def QueryInfoKey(self, key):
+        """
+        Returns the number of sub keys and values of an open key and
+        its last write time in 100ns since 1601, 0 if unknown.
+        """
+        with self.__lock:
+            self.__index()
+            lower = key.path.lower()
+
+            # Keys not parsed yet are only scanned for the time
+            if lower in self.__parsed or self.__keys[lower]["span"] is None:
+                parsed = self.__key(lower)
+                header, meta = parsed["header"], parsed["meta"]
+                values = len(parsed["values"])
+            else:
+                start, end = self.__keys[lower]["span"]
+                lines = [
+                    line.strip() for line in self.__map[start:end]
+                    .decode("utf-8", "replace").replace("\\\n", "")
+                    .split("\n")
+                ]
+                header = lines[0]
+                meta = [line for line in lines if line.startswith("#")]
+                values = sum(
+                    1 for line in lines[1:]
+                    if line and not line.startswith(("#", ";")))
+
+            modified = 0
+            for line in meta:
+                if line.startswith("#time="):
+                    modified = int(line[6:], 16)
+            stamp = header.rpartition("]")[2].strip()
+            if not modified and stamp.isdigit():
+                modified = int(stamp) * 10**7 + EPOCH_DIFFERENCE
+
+            return len(self.__sub_keys[lower]), values, modified
+
+    def QueryValueEx(self, key, value_name):
+        """
+        Returns data and type of a value, FileNotFoundError if missing.
+        """
+        with self.__lock:
+            self.__index()
+            values = self.__key(key.path.lower())["values"]
+            if value_name not in values:
+                raise self.__not_found(value_name)
+            return values[value_name]
+
+    def SetValueEx(self, key, value_name, reserved, value_type, data):
+        """
+        Stores a value in an open key.
+        """
+        with self.__lock:
+            self.__index()
+            self.__key(key.path.lower())["values"][value_name] = \
+                (data, value_type)
+            self.__changed.add(key.path.lower())
+            self.__touch(key.path.lower())
+
+    def DeleteValue(self, key, value_name):
+        """
+        Removes a value from an open key, FileNotFoundError if missing.
+        """
+        with self.__lock:
+            self.__index()
+            values = self.__key(key.path.lower())["values"]
+            if value_name not in values:
+                raise self.__not_found(value_name)
+            del values[value_name]
+            self.__changed.add(key.path.lower())
+            self.__touch(key.path.lower())
+
+    def DeleteKey(self, key, sub_key):
+        """
+        Deletes a key without sub keys, FileNotFoundError if missing.
+        """
+        path = self.__relative_path(key, sub_key)
+        lower = path.lower()
+        with self.__lock:
+            self.__index()
+            if not lower or lower not in self.__keys:
+                raise self.__not_found(path)
+            if self.__sub_keys[lower]:
+                raise PermissionError(5, "Access is denied", path)
+
+            entry = self.__keys.pop(lower)
+            parent, _, name = entry["name"].rpartition("\\")
+            self.__sub_keys[parent.lower()].remove(name)
+            del self.__sub_keys[lower]
+            self.__parsed.pop(lower, None)
+            self.__changed.discard(lower)
+            self.__touch(parent.lower())
+
+            # The key's block is dropped when writing the file
+            if entry["span"] is not None:
+                self.__deleted.append(entry["span"])
+
+    def FlushKey(self, key):
+        """
+        Writes the changed keys to user.reg. The file is replaced
+        atomically, unchanged keys are copied byte for byte.
+        """
+        with self.__lock:
+            self.__index()
+            if not self.__changed and not self.__deleted:
+                return
+
+            spans = sorted(
+                [(entry["span"], lower)
+                 for lower, entry in self.__keys.items()
+                 if entry["span"] is not None] +
+                [(span, None) for span in self.__deleted]
+            )
+
+            parts = []
+            position = 0
+            for (start, end), lower in spans:
+                parts.append(self.__map[position:start])
+                position = end
+                if lower in self.__changed:
+                    parts.append(self.__format_key(lower))
+                elif lower is not None:
+                    parts.append(self.__map[start:end])
+            parts.append(self.__map[position:])
+
+            # New keys are appended after the existing ones
+            content = b"".join(parts)
+            for lower in sorted(self.__changed):
+                if self.__keys[lower]["span"] is None:
+                    if not content.endswith(b"\n\n"):
+                        content += b"\n"
+                    content += self.__format_key(lower)
+
+            temp_file = self.__reg_file + ".tmp"
+            with open(temp_file, "wb") as reg_file:
+                reg_file.write(content)
+                reg_file.flush()
+                os.fsync(reg_file.fileno())
+            if isinstance(self.__map, mmap.mmap):
+                self.__map.close()
+            self.__map = b""
+            os.replace(temp_file, self.__reg_file)
+
+            # Indexed again on next use
+            self.__stamp = None
+            self.__index()
+
+    def __format_key(self, lower):
+        """
+        Returns:
+            bytes: Block of a key as written by Wine
+        """
+        key = self.__key(lower)
+        lines = [key["header"], *key["meta"]]
+        lines.extend(
+            format_wine_value(name, *value)
+            for name, value in key["values"].items()
+        )
+
+        return ("\n".join(lines) + "\n\n").encode("utf-8")
@@ -22,8 +22,6 @@ game will otherwise crash at startup.
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
-import winreg
-
 
 class WriteLastProfile:
     """
@@ -34,6 +32,7 @@ class WriteLastProfile:
         self.__reg_hive = None
         self.__reg_path = None
         self.__profile_name = None
+        self.__session = None
 
     def write_profile_name(self):
         """
@@ -51,30 +50,19 @@ class WriteLastProfile:
             converted_name = self.__profile_name.replace("_", "") + "."
             binary_data = converted_name.encode('utf-16le')
 
-            # Sets registry path and opens registry key
-            reg_hive = winreg.__dict__[self.__reg_hive]
-            reg_subkey = winreg.OpenKeyEx(
-                reg_hive,
-                self.__reg_path[0],
-                0,
-                winreg.KEY_SET_VALUE
-                )
-
             # Writing the binary value to the registry
-            winreg.SetValueEx(
-                reg_subkey,
+            self.__session.set_value(
+                self.__reg_hive,
+                self.__reg_path[0],
                 self.__reg_path[3],
-                0,
-                winreg.REG_BINARY,
-                binary_data
+                binary_data,
+                "REG_BINARY"
                 )
-
-            # Closes the registry key
-            winreg.CloseKey(reg_subkey)
+            self.__session.flush(self.__reg_hive)
 
             result["success"] = True
 
-        except FileNotFoundError as e:
+        except OSError as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
@@ -91,3 +79,12 @@ class WriteLastProfile:
         self.__reg_hive = reg_hive
         self.__reg_path = reg_path
         self.__profile_name = profile_name
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
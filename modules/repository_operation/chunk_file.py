@@ -0,0 +1,84 @@
+"""
+Content-defined chunking of backup files
+
+Chunk boundaries are placed behind the first run of four bytes whose low
+nibble is 0x5, at least MIN_CHUNK bytes after the previous boundary. The
+boundaries depend only on the local content, so inserting or removing
+data in a file only changes the chunks around the edit. The search runs
+in the regular expression engine instead of a Python loop per byte.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import re
+
+
+MIN_CHUNK = 16 * 1024
+MAX_CHUNK = 256 * 1024
+READ_SIZE = 1024 * 1024
+
+# Matches with a probability of 1/65536 per position in random data
+BOUNDARY = re.compile(
+    b"[" + b"".join(re.escape(bytes([i << 4 | 5])) for i in range(16)) +
+    b"]{4}"
+)
+
+
+def chunk_file(file_path):
+    """
+    Splits a file into content-defined chunks.
+
+    Params:
+        file_path (str): File to be chunked
+
+    Yields:
+        bytes: The chunks in file order
+    """
+    buffer = bytearray()
+    pos = 0
+    eof = False
+
+    with open(file_path, "rb") as src:
+        while True:
+            # Keeps at least one maximum chunk in the buffer
+            while not eof and len(buffer) - pos < MAX_CHUNK:
+                data = src.read(READ_SIZE)
+                if not data:
+                    eof = True
+                buffer += data
+
+            remaining = len(buffer) - pos
+            if not remaining:
+                return
+
+            if remaining <= MIN_CHUNK:
+                cut = remaining
+            else:
+                match = BOUNDARY.search(
+                    buffer, pos + MIN_CHUNK, pos + min(MAX_CHUNK, remaining))
+                if match:
+                    cut = match.end() - pos
+                else:
+                    cut = min(MAX_CHUNK, remaining)
+
+            yield bytes(buffer[pos:pos + cut])
+            pos += cut
+
+            # Drops consumed data from time to time
+            if pos >= READ_SIZE:
+                del buffer[:pos]
+                pos = 0
@@ -0,0 +1,174 @@
+"""
+Reassembles the files of a repository backup from its manifest
+
+The manifest lives in the 'manifests' directory of the repository,
+its chunks are read from the 'chunks' directory next to it.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import zlib
+
+
+def read_manifest_member(manifest_file, name):
+    """
+    Reassembles a single file of a repository backup in memory.
+
+    Params:
+        manifest_file (str): Path to the manifest of the backup
+        name (str): Name of the file inside the backup
+
+    Returns:
+        bytes: Content of the file
+    """
+    with open(manifest_file, encoding="UTF-8") as json_file:
+        manifest = json.load(json_file)
+
+    chunk_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(manifest_file))),
+        "chunks"
+    )
+
+    for entry in manifest["files"]:
+        if entry["name"] == name:
+            return b"".join(
+                read_chunk(chunk_dir, digest) for digest in entry["chunks"])
+
+    raise KeyError(name)
+
+
+def iter_manifest_members(manifest_file, names=None):
+    """
+    Streams the files of a repository backup chunk by chunk.
+
+    Params:
+        manifest_file (str): Path to the manifest of the backup
+        names (list): Names of the files to stream, None for all
+
+    Yields:
+        tuple: File name and an iterator over its chunks
+    """
+    with open(manifest_file, encoding="UTF-8") as json_file:
+        manifest = json.load(json_file)
+
+    chunk_dir = os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(manifest_file))),
+        "chunks"
+    )
+
+    for entry in manifest["files"]:
+        if names is None or entry["name"] in names:
+            yield entry["name"], (
+                read_chunk(chunk_dir, digest) for digest in entry["chunks"])
+
+
+def read_chunk(chunk_dir, digest):
+    """
+    Reads a chunk and checks it against its hash.
+
+    Returns:
+        bytes: Uncompressed chunk
+    """
+    with open(os.path.join(chunk_dir, digest[:2], digest), "rb") as src:
+        chunk = zlib.decompress(src.read())
+
+    if hashlib.blake2b(chunk, digest_size=32).hexdigest() != digest:
+        raise ValueError(f"Chunk {digest} is corrupt")
+
+    return chunk
+
+
+class RestoreRepository():
+    """
+    Class to reassemble a backup from the chunk repository
+    """
+
+    def __init__(self):
+        self.__manifest_file = None
+        self.__target_dir = None
+        self.__backup_info = None
+        self.__selected = None
+
+    def restore_backup(self):
+        """
+        Attempts to reassemble all files of the manifest.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            with open(self.__manifest_file, encoding="UTF-8") as json_file:
+                manifest = json.load(json_file)
+
+            chunk_dir = os.path.join(
+                os.path.dirname(os.path.dirname(
+                    os.path.abspath(self.__manifest_file))),
+                "chunks"
+            )
+
+            for entry in manifest["files"]:
+                if self.__selected is not None and \
+                        entry["name"] != self.__backup_info and \
+                        not self.__selected(entry["name"]):
+                    continue
+
+                target_path = os.path.join(
+                    self.__target_dir, *entry["name"].split("/"))
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+
+                with open(target_path, "wb") as target:
+                    for digest in entry["chunks"]:
+                        target.write(read_chunk(chunk_dir, digest))
+
+                os.utime(target_path, (entry["mtime"], entry["mtime"]))
+
+            result["success"] = True
+
+        except (FileNotFoundError, ValueError, zlib.error) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def set_data(self, manifest_file, target_dir, backup_info):
+        """
+        Setter
+
+        Params:
+            manifest_file (str): Path to the manifest of the backup
+            target_dir (str): Directory to reassemble the files in
+            backup_info (str): Name of the backup information file
+        """
+        self.__manifest_file = manifest_file
+        self.__target_dir = target_dir
+        self.__backup_info = backup_info
+
+    def set_filter(self, selected):
+        """
+        Setter
+
+        Params:
+            selected (function): Returns True for the file names to
+                                 reassemble, None to reassemble everything
+        """
+        self.__selected = selected
@@ -0,0 +1,234 @@
+"""
+Stores a backup in the deduplicating chunk repository
+
+Every file is split into content-defined chunks. Each chunk is stored
+once under its hash in 'chunks', compressed with zlib. The backup itself
+is a small manifest in 'manifests' that lists the chunks of every file.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import hashlib
+import json
+import os
+import tempfile
+import zlib
+from datetime import datetime
+from modules.misc.file_checksum import CHECKSUM_ALGORITHM
+from modules.misc.file_checksum import add_checksums
+from modules.misc.file_checksum import collect_files
+from modules.repository_operation.chunk_file import chunk_file
+
+
+MANIFEST_FORMAT = "bwbackup-manifest"
+
+
+class StoreRepository():
+    """
+    Class to store a backup in the chunk repository
+    """
+
+    def __init__(self):
+        self.__repository_dir = None
+        self.__backup_profile = None
+        self.__sources = None
+        self.__backup_info = None
+        self.__manifest_file = None
+        self.__stored_bytes = 0
+
+    def store_backup(self):
+        """
+        Attempts to store the files in the repository.
+
+        If successful, the manifest will be stored in 'self.__manifest_file'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            chunk_dir = os.path.join(self.__repository_dir, "chunks")
+            manifest_dir = os.path.join(self.__repository_dir, "manifests")
+            os.makedirs(chunk_dir, exist_ok=True)
+            os.makedirs(manifest_dir, exist_ok=True)
+
+            # The backup information is held back to record the
+            # checksums of the files stored before it
+            members = []
+            info_member = None
+            for file_path, arcname in collect_files(self.__sources):
+                if arcname.replace(os.sep, "/") == self.__backup_info:
+                    info_member = (file_path, arcname)
+                else:
+                    members.append((file_path, arcname))
+
+            files = []
+            checksums = {}
+            for file_path, arcname in members:
+                name = arcname.replace(os.sep, "/")
+                files.append(self.__store_file(chunk_dir, file_path, name))
+
+                # Each file is hashed while its chunks are stored
+                checksums[name] = files[-1].pop("hash")
+
+            if info_member is not None:
+                with open(info_member[0], encoding="UTF-8") as json_file:
+                    backup_info = json.load(json_file)
+                add_checksums(backup_info, checksums)
+
+                # The catalog reads the completed file
+                with open(info_member[0], "w", encoding="UTF-8") \
+                        as json_file:
+                    json.dump(backup_info, json_file)
+                files.append(self.__store_file(
+                    chunk_dir, info_member[0], self.__backup_info))
+                files[-1].pop("hash")
+
+            created = datetime.now()
+            manifest = {
+                "format": MANIFEST_FORMAT,
+                "version": 1,
+                "profile": self.__backup_profile,
+                "created": created.strftime("%Y-%m-%dT%H:%M:%S"),
+                "files": files
+            }
+
+            # One manifest per backup, named after profile and time,
+            # backups within the same second are told apart by the
+            # microseconds
+            manifest_file = os.path.join(
+                manifest_dir,
+                f"{self.__backup_profile}_"
+                f"{created.strftime('%Y%m%d-%H%M%S-%f')}.json"
+            )
+            self.__write_atomic(
+                manifest_file, json.dumps(manifest).encode("UTF-8"))
+
+            self.__manifest_file = manifest_file
+            result["success"] = True
+
+        except (FileNotFoundError, PermissionError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def __store_file(self, chunk_dir, file_path, name):
+        """
+        Stores the chunks of a file and hashes it along the way.
+
+        Returns:
+            dict: Manifest entry of the file, with its BLAKE2b hash
+        """
+        stat = os.stat(file_path)
+        digest = hashlib.new(CHECKSUM_ALGORITHM)
+        chunks = []
+        for chunk in chunk_file(file_path):
+            digest.update(chunk)
+            chunks.append(self.__store_chunk(chunk_dir, chunk))
+
+        return {
+            "name": name,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "chunks": chunks,
+            "hash": digest.hexdigest()
+        }
+
+    def __store_chunk(self, chunk_dir, chunk):
+        """
+        Stores a chunk unless the repository already holds it.
+
+        Returns:
+            str: Hash of the chunk
+        """
+        digest = hashlib.blake2b(chunk, digest_size=32).hexdigest()
+        chunk_path = os.path.join(chunk_dir, digest[:2], digest)
+
+        if not os.path.exists(chunk_path):
+            os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+            try:
+                self.__write_atomic(chunk_path, zlib.compress(chunk))
+                self.__stored_bytes += os.path.getsize(chunk_path)
+            except OSError:
+                # Another backup stored the same chunk at the same time
+                if not os.path.exists(chunk_path):
+                    raise
+
+        return digest
+
+    @staticmethod
+    def __write_atomic(path, data):
+        """
+        Writes a file under a temporary name and renames it afterwards,
+        so an aborted backup never leaves a truncated file behind.
+        """
+        # Each writer gets its own temporary file, concurrent backups
+        # may write the same chunk
+        fd, temp_path = tempfile.mkstemp(
+            dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as target:
+                target.write(data)
+            os.replace(temp_path, path)
+        except OSError:
+            os.remove(temp_path)
+            raise
+
+    def get_manifest_file(self):
+        """
+        Getter
+
+        Returns:
+            str: Path to the manifest of the backup
+        """
+        return self.__manifest_file
+
+    def get_stored_bytes(self):
+        """
+        Getter
+
+        Returns:
+            int: Bytes of new chunks added to the repository
+        """
+        return self.__stored_bytes
+
+    def set_data(self, repository_dir, backup_profile, sources):
+        """
+        Setter
+
+        Params:
+            repository_dir (str): Root directory of the repository
+            backup_profile (str): Selected backup profile
+            sources (list): Tuples of source path (file or directory)
+                            and name inside the backup
+        """
+        self.__repository_dir = repository_dir
+        self.__backup_profile = backup_profile
+        self.__sources = sources
+
+    def set_backup_info(self, backup_info):
+        """
+        Setter
+
+        Params:
+            backup_info (str): Name of the backup information file,
+                               stored last with the checksums
+        """
+        self.__backup_info = backup_info
@@ -21,6 +21,9 @@ Loads the configuration files.
 import json
 import os
 
+# Paths below the game directory, written with Windows separators
+FILESYSTEM_KEYS = ("mind_files", "profile_dir")
+
 
 class LoadConfig():
     """
@@ -53,9 +56,14 @@ class LoadConfig():
             with open(config_file_path, encoding="UTF-8") as json_file:
                 self.__config_file = json.load(json_file)
 
+            # Wine and Linux installs need the native separator
+            for key in FILESYSTEM_KEYS:
+                self.__config_file[key] = \
+                    self.__config_file[key].replace("\\", os.sep)
+
             result["success"] = True
 
-        except (FileNotFoundError, json.JSONDecodeError) as e:
+        except (FileNotFoundError, KeyError, json.JSONDecodeError) as e:
             result["message"] = str(e)
 
         return result
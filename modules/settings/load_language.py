@@ -20,7 +20,6 @@ Reads system language and loads language file.
 
 import json
 import os
-import winreg
 
 
 class LoadLanguage():
@@ -32,19 +31,27 @@ class LoadLanguage():
     def __init__(self):
         self.__lang_file = None
         self.__sys_lang = None
+        self.__session = None
 
     def system_language(self):
         """
         Reads out the system language.
         """
+        # Without registry the program starts in English
+        if self.__session is None:
+            self.__sys_lang = None
+            return
+
         try:
-            with winreg.OpenKey(winreg.HKEY_CURRENT_USER,
-                                r'Control Panel\International') as key:
-                lang = winreg.QueryValueEx(key, 'LocaleName')[0]
+            lang = self.__session.query_value(
+                "HKEY_CURRENT_USER",
+                r'Control Panel\International',
+                'LocaleName'
+                )[0]
 
             self.__sys_lang = lang
 
-        except FileNotFoundError:
+        except OSError:
             self.__sys_lang = None
 
     def load_lang_file(self):
@@ -93,3 +100,12 @@ class LoadLanguage():
             dict: Loaded language file as a dictionary.
         """
         return self.__lang_file
+
+    def set_session(self, session):
+        """
+        Setter
+
+        Params:
+            session (RegistrySession): Registry access of this run
+        """
+        self.__session = session
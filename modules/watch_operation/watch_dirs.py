@@ -0,0 +1,285 @@
+"""
+Watches directories for written files
+
+On Linux (including Wine installs) the kernel's inotify interface is
+used through ctypes. The watcher sleeps in select() until the kernel
+reports a change, so an idle watch costs no CPU time and no wakeups.
+Everywhere else, or if inotify is not available, the directories are
+polled by comparing the size and modification time of their files.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+
+# inotify event masks, see inotify(7)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (
+    IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+    IN_CREATE | IN_DELETE
+)
+
+# struct inotify_event without the name
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class InotifyWatcher():
+    """
+    Class to watch directory trees with inotify
+    """
+
+    def __init__(self, paths):
+        libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.__add_watch = libc.inotify_add_watch
+        self.__add_watch.argtypes = (
+            ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32)
+
+        self.__fd = libc.inotify_init1(IN_CLOEXEC)
+        if self.__fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        self.__paths = paths
+        self.__watches = {}
+        try:
+            for path in paths:
+                self.__watch_tree(path)
+        except OSError:
+            os.close(self.__fd)
+            raise
+
+    def __watch_tree(self, path, required=True):
+        """
+        Adds a watch for a directory and all of its subdirectories,
+        inotify itself does not watch recursively.
+
+        Params:
+            path (str): Directory to watch
+            required (bool): Raise FileNotFoundError if the directory
+                             is missing, otherwise it is ignored
+        """
+        if not os.path.isdir(path):
+            if required:
+                raise FileNotFoundError(path)
+            return
+
+        for root, _, _ in os.walk(path):
+            wd = self.__add_watch(
+                self.__fd, os.fsencode(root), WATCH_MASK)
+            if wd < 0:
+                error = ctypes.get_errno()
+                # Directories deleted while being walked are skipped
+                if error in (errno.ENOENT, errno.ENOTDIR) and \
+                        (root != path or not required):
+                    continue
+                raise OSError(error, os.strerror(error), root)
+            self.__watches[wd] = root
+
+    def wait(self, timeout=None):
+        """
+        Blocks until files were written or the timeout expired.
+
+        Params:
+            timeout (float): Seconds to wait, None to wait forever
+
+        Returns:
+            set: Paths of the changed files, empty on timeout
+        """
+        readable, _, _ = select.select([self.__fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        changed = set()
+        data = os.read(self.__fd, 64 * 1024)
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            # Events were lost, everything may have changed
+            if mask & IN_Q_OVERFLOW:
+                changed.update(self.__paths)
+                continue
+
+            if wd not in self.__watches:
+                continue
+            path = os.path.join(self.__watches[wd], os.fsdecode(name))
+
+            # New directories need a watch of their own,
+            # unless they have already been deleted again
+            if mask & IN_CREATE and mask & IN_ISDIR:
+                self.__watch_tree(path, False)
+
+            changed.add(path)
+
+        return changed
+
+    def close(self):
+        """
+        Closes the inotify descriptor, which removes all watches.
+        """
+        os.close(self.__fd)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class PollWatcher():
+    """
+    Class to watch directory trees by polling
+    """
+
+    def __init__(self, paths, interval):
+        self.__paths = paths
+        self.__interval = interval
+        self.__snapshot = self.__scan()
+
+    def __scan(self):
+        """
+        Returns:
+            dict: Size and modification time per file
+        """
+        snapshot = {}
+        for path in self.__paths:
+            if not os.path.isdir(path):
+                raise FileNotFoundError(path)
+            for root, _, files in os.walk(path):
+                for file in files:
+                    file_path = os.path.join(root, file)
+                    try:
+                        stat = os.stat(file_path)
+                    except FileNotFoundError:
+                        continue
+                    snapshot[file_path] = (stat.st_size, stat.st_mtime_ns)
+        return snapshot
+
+    def wait(self, timeout=None):
+        """
+        Blocks until files were written or the timeout expired.
+
+        Params:
+            timeout (float): Seconds to wait, None to wait forever
+
+        Returns:
+            set: Paths of the changed files, empty on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            delay = self.__interval
+            if deadline is not None:
+                delay = min(delay, deadline - time.monotonic())
+            if delay > 0:
+                time.sleep(delay)
+
+            snapshot = self.__scan()
+            changed = {
+                path for path in snapshot.keys() | self.__snapshot.keys()
+                if snapshot.get(path) != self.__snapshot.get(path)
+            }
+            self.__snapshot = snapshot
+
+            if changed or (
+                    deadline is not None and time.monotonic() >= deadline):
+                return changed
+
+    def close(self):
+        """
+        Nothing to release, exists for symmetry with InotifyWatcher.
+        """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def create_watcher(paths, poll_interval):
+    """
+    Watches the directories with inotify where possible,
+    otherwise by polling.
+
+    Params:
+        paths (list): Directories to watch, including subdirectories
+        poll_interval (float): Seconds between two polls
+
+    Returns:
+        InotifyWatcher or PollWatcher: Watcher of the directories
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(paths)
+        except (OSError, AttributeError):
+            pass
+
+    return PollWatcher(paths, poll_interval)
+
+
+def wait_for_save(watcher, debounce, is_relevant=None):
+    """
+    Blocks until relevant files were written and no further write
+    followed for 'debounce' seconds, so a save is only reported once
+    the game has finished writing it.
+
+    Params:
+        watcher (InotifyWatcher or PollWatcher): Watcher of the directories
+        debounce (float): Seconds without writes before a save has settled
+        is_relevant (function): Filter for the changed paths, None for all
+
+    Returns:
+        set: Paths of the changed files
+    """
+    def relevant(paths):
+        if is_relevant is None:
+            return paths
+        return {path for path in paths if is_relevant(path)}
+
+    changed = set()
+    while not changed:
+        changed = relevant(watcher.wait())
+
+    # Every further write restarts the debounce window
+    last_write = time.monotonic()
+    while True:
+        remaining = last_write + debounce - time.monotonic()
+        if remaining <= 0:
+            return changed
+        more = relevant(watcher.wait(remaining))
+        if more:
+            changed |= more
+            last_write = time.monotonic()
@@ -0,0 +1,330 @@
+"""
+Registry of the archive formats available for backups
+
+Each codec names a container (zip or tar) and its compression. On
+restore the container is detected from the magic bytes of the file,
+so backups of every codec can be restored regardless of the settings.
+Manifests of the chunk repository are detected the same way.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import functools
+import io
+import json
+import shutil
+import tarfile
+import time
+import zipfile
+import zlib
+from lzma import LZMAError
+from modules.misc.file_checksum import HashingReader
+from modules.repository_operation.restore_repository \
+    import read_manifest_member
+
+
+CODECS = {
+    "zip-deflate": {
+        "container": "zip",
+        "compression": zipfile.ZIP_DEFLATED,
+        "extension": ".zip"
+    },
+    "zip-lzma": {
+        "container": "zip",
+        "compression": zipfile.ZIP_LZMA,
+        "extension": ".zip"
+    },
+    "zip-bzip2": {
+        "container": "zip",
+        "compression": zipfile.ZIP_BZIP2,
+        "extension": ".zip"
+    },
+    "tar.xz": {
+        "container": "tar",
+        "compression": "xz",
+        "extension": ".tar.xz"
+    }
+}
+
+# Size of the blocks members are streamed in
+BLOCK_SIZE = 1024 * 1024
+
+# Errors of a damaged archive or member
+READ_ERRORS = (
+    OSError, EOFError, KeyError, ValueError,
+    zipfile.BadZipFile, tarfile.TarError, LZMAError, zlib.error
+)
+
+# Leading bytes of the supported containers
+MAGIC_BYTES = [
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"\xfd7zXZ\x00", "tar"),
+    (b"BZh", "tar"),
+    (b"\x1f\x8b", "tar"),
+    (b'{"format": "bwbackup-manifest"', "manifest")
+]
+
+
+def get_codec(name):
+    """
+    Looks up a codec by name.
+
+    Params:
+        name (str): Name of the codec, e.g. 'zip-deflate'
+
+    Returns:
+        dict: Container, compression and file extension of the codec
+    """
+    if name not in CODECS:
+        raise ValueError(
+            f"Unknown codec '{name}', available: {', '.join(CODECS)}")
+    return CODECS[name]
+
+
+def detect_container(archive_file):
+    """
+    Detects the container of an archive from its magic bytes.
+
+    Params:
+        archive_file (str): Path to the archive
+
+    Returns:
+        str: 'zip', 'tar' or 'manifest' (chunk repository),
+             None if the format is unknown
+    """
+    with open(archive_file, "rb") as archive:
+        head = archive.read(32)
+
+    for magic, container in MAGIC_BYTES:
+        if head.startswith(magic):
+            return container
+
+    # Uncompressed tar archives carry their magic at offset 257
+    if tarfile.is_tarfile(archive_file):
+        return "tar"
+
+    return None
+
+
+def read_member(archive_file, name):
+    """
+    Reads a single member of a zip or tar archive into memory.
+
+    Params:
+        archive_file (str): Path to the archive
+        name (str): Name of the member, separated by '/'
+
+    Returns:
+        bytes: Content of the member
+    """
+    container = detect_container(archive_file)
+
+    if container == "zip":
+        with zipfile.ZipFile(archive_file, "r") as zipf:
+            return zipf.read(name)
+
+    if container == "tar":
+        with tarfile.open(archive_file, "r:*") as tarf:
+            member = tarf.extractfile(name)
+            if member is None:
+                raise KeyError(name)
+            return member.read()
+
+    raise ValueError(f"Unknown archive format: {archive_file}")
+
+
+def read_backup_info(archive_file, backup_info):
+    """
+    Reads the backup information of an archive or repository
+    manifest without extracting anything else.
+
+    Params:
+        archive_file (str): Path to the archive or manifest
+        backup_info (str): Name of the backup information file
+
+    Returns:
+        dict: Content of backup_info.json
+    """
+    if detect_container(archive_file) == "manifest":
+        return json.loads(read_manifest_member(archive_file, backup_info))
+    return json.loads(read_member(archive_file, backup_info))
+
+
+def iter_members(archive_file, names=None):
+    """
+    Streams the regular file members of a zip or tar archive
+    in archive order, without extracting them.
+
+    Params:
+        archive_file (str): Path to the archive
+        names (list): Names of the members to stream, None for all
+
+    Yields:
+        tuple: Member name and an iterator over its content in blocks,
+               the blocks have to be consumed before the next member
+    """
+    container = detect_container(archive_file)
+    wanted = None if names is None else set(names)
+
+    if container == "zip":
+        with zipfile.ZipFile(archive_file, "r") as zipf:
+            for info in zipf.infolist():
+                if info.is_dir() or \
+                        (wanted is not None and info.filename not in wanted):
+                    continue
+                with zipf.open(info) as member:
+                    yield info.filename, iter(
+                        functools.partial(member.read, BLOCK_SIZE), b"")
+
+    elif container == "tar":
+        # Streaming mode reads the compressed archive only once
+        with tarfile.open(archive_file, "r|*") as tarf:
+            for info in tarf:
+                if not info.isfile() or \
+                        (wanted is not None and info.name not in wanted):
+                    continue
+                member = tarf.extractfile(info)
+                yield info.name, iter(
+                    functools.partial(member.read, BLOCK_SIZE), b"")
+
+    else:
+        raise ValueError(f"Unknown archive format: {archive_file}")
+
+
+def member_crcs(archive_file):
+    """
+    Reads size and CRC32 of the members of a zip archive from its
+    central directory. Tar archives and repository manifests carry
+    no such index.
+
+    Params:
+        archive_file (str): Path to the archive
+
+    Returns:
+        dict: Tuple of size and CRC32 per member name,
+              empty for other containers
+    """
+    if detect_container(archive_file) != "zip":
+        return {}
+
+    with zipfile.ZipFile(archive_file, "r") as zipf:
+        return {
+            info.filename: (info.file_size, info.CRC)
+            for info in zipf.infolist() if not info.is_dir()
+        }
+
+
+def extract_members(archive_file, names, target_dir):
+    """
+    Extracts selected members of a zip or tar archive.
+
+    Params:
+        archive_file (str): Path to the archive
+        names (list): Names of the members, separated by '/'
+        target_dir (str): Directory to extract the members to
+    """
+    container = detect_container(archive_file)
+
+    if container == "zip":
+        with zipfile.ZipFile(archive_file, "r") as zipf:
+            for name in names:
+                zipf.extract(name, target_dir)
+
+    elif container == "tar":
+        with tarfile.open(archive_file, "r:*") as tarf:
+            members = [tarf.getmember(name) for name in names]
+            if hasattr(tarfile, "data_filter"):
+                tarf.extractall(target_dir, members, filter="data")
+            else:
+                tarf.extractall(target_dir, members)
+
+    else:
+        raise ValueError(f"Unknown archive format: {archive_file}")
+
+
+class HashingZipFile(zipfile.ZipFile):
+    """
+    Class to write a zip archive whose write() returns the hash of
+    the member, like TarWriter and ParallelZipWriter
+    """
+
+    def write(self, filename, arcname=None, compress_type=None,
+              compresslevel=None):
+        """
+        Adds a file to the archive, like zipfile.ZipFile.write.
+
+        Returns:
+            str: BLAKE2b hash of the bytes stored
+        """
+        zinfo = zipfile.ZipInfo.from_file(filename, arcname)
+        zinfo.compress_type = \
+            self.compression if compress_type is None else compress_type
+        zinfo._compresslevel = \
+            self.compresslevel if compresslevel is None else compresslevel
+
+        with open(filename, "rb") as src, self.open(zinfo, "w") as dest:
+            reader = HashingReader(src)
+            shutil.copyfileobj(reader, dest, BLOCK_SIZE)
+
+        return reader.hexdigest()
+
+
+class TarWriter():
+    """
+    Class to write a compressed tar archive with the
+    interface of zipfile.ZipFile used by ZipBackup
+    """
+
+    def __init__(self, tar_file, compression):
+        self.__tar = tarfile.open(tar_file, "w:" + compression)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.__tar.close()
+
+    def write(self, filename, arcname, compress_type=None,
+              compresslevel=None):
+        """
+        Adds a file to the archive, the compression arguments
+        are ignored as the whole archive is compressed.
+
+        Returns:
+            str: BLAKE2b hash of the bytes stored
+        """
+        tar_info = self.__tar.gettarinfo(filename, arcname)
+        with open(filename, "rb") as src:
+            reader = HashingReader(src)
+            self.__tar.addfile(tar_info, reader)
+
+        return reader.hexdigest()
+
+    def writestr(self, arcname, data, compress_type=None,
+                 compresslevel=None):
+        """
+        Adds in-memory data to the archive.
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        tar_info = tarfile.TarInfo(arcname)
+        tar_info.size = len(data)
+        tar_info.mtime = int(time.time())
+        tar_info.mode = 0o600
+        self.__tar.addfile(tar_info, io.BytesIO(data))
@@ -0,0 +1,111 @@
+"""
+Chooses the compression of a backup member from a sample of its data
+
+A few blocks of the file (beginning, middle and end) are compressed on
+the fastest level. Data that barely shrinks is stored, highly redundant
+data is worth the maximum level, everything in between is deflated fast.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import zipfile
+import zlib
+
+
+# Size and number of the sampled blocks
+SAMPLE_SIZE = 64 * 1024
+SAMPLE_COUNT = 3
+
+# Trial ratios (compressed / uncompressed) separating the methods
+STORE_RATIO = 0.95
+MAX_RATIO = 0.5
+
+# Zip compression and zlib level per method
+METHODS = {
+    "stored": (zipfile.ZIP_STORED, None),
+    "fast": (zipfile.ZIP_DEFLATED, 1),
+    "max": (zipfile.ZIP_DEFLATED, 9)
+}
+
+
+class CompressionPolicy():
+    """
+    Class to choose the compression method of a file
+    """
+
+    def __init__(self):
+        self.__method = None
+        self.__sample_ratio = None
+
+    def choose(self, file_path):
+        """
+        Samples the file and chooses its compression method.
+
+        The method will be stored in 'self.__method'.
+
+        Params:
+            file_path (str): File to be archived
+        """
+        size = os.path.getsize(file_path)
+
+        # Small files are sampled as a whole
+        if size <= SAMPLE_SIZE * SAMPLE_COUNT:
+            offsets = [0]
+            sample_size = size
+        else:
+            offsets = [
+                (size - SAMPLE_SIZE) * i // (SAMPLE_COUNT - 1)
+                for i in range(SAMPLE_COUNT)
+            ]
+            sample_size = SAMPLE_SIZE
+
+        sampled = 0
+        compressed = 0
+        with open(file_path, "rb") as sample_file:
+            for offset in offsets:
+                sample_file.seek(offset)
+                data = sample_file.read(sample_size)
+                sampled += len(data)
+                compressed += len(zlib.compress(data, 1))
+
+        self.__sample_ratio = compressed / sampled if sampled else 1.0
+
+        if self.__sample_ratio >= STORE_RATIO:
+            self.__method = "stored"
+        elif self.__sample_ratio <= MAX_RATIO:
+            self.__method = "max"
+        else:
+            self.__method = "fast"
+
+    def get_method(self):
+        """
+        Getter
+
+        Returns:
+            str: 'stored', 'fast' or 'max'
+        """
+        return self.__method
+
+    def get_compression(self):
+        """
+        Getter
+
+        Returns:
+            tuple: Zip compression type and zlib level of the method
+        """
+        return METHODS[self.__method]
@@ -0,0 +1,525 @@
+"""
+Restores a backup directly into the game directory
+
+Every member is streamed out of the archive (or the chunk repository)
+next to its final location, so no temporary directory is needed. Each
+file is written under a temporary name and only moved over its target
+once the whole backup has been read without error, a damaged archive
+leaves the game directory as it was. The registry file is kept in
+memory for the import, backup_info.json has already been read and is
+skipped. Files of an incremental backup that are held by parent
+archives are streamed from those archives. A file recorded in
+backup_info.json but missing from its archive, or a parent chain that
+loops, fails the restore.
+
+Before existing profile data is deleted, check_backup() reads the
+selected members once without writing them. Zip members are checked
+against their CRC32, repository chunks against their hash and members
+with a checksum in backup_info.json against that checksum. In a
+differential restore only the members that differ from the files on
+disk are read.
+
+Only the selected components (profile directory, creature files,
+registry key) are restored, other members are skipped without being
+decompressed.
+
+A differential restore leaves files alone that already match the
+backup, compared by size and the CRC32 of the zip central directory or
+the hash stored in backup_info.json. Files of the profile directory
+that are not part of the backup are deleted.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+import tarfile
+import uuid
+import zipfile
+import zlib
+from modules.misc.file_checksum import CHECKSUM_ALGORITHM
+from modules.misc.file_checksum import crc_file
+from modules.misc.file_checksum import hash_blocks
+from modules.misc.file_checksum import hash_file
+from modules.repository_operation.restore_repository \
+    import iter_manifest_members
+from modules.zip_operation.archive_codecs import detect_container
+from modules.zip_operation.archive_codecs import iter_members
+from modules.zip_operation.archive_codecs import member_crcs
+from modules.zip_operation.archive_codecs import read_member
+
+# Parts of a backup that can be restored on their own
+COMPONENTS = ("profile", "creature", "registry")
+
+
+def member_component(name, backup_info, reg_file):
+    """
+    Assigns an archive member to the component it belongs to.
+
+    Params:
+        name (str): Name of the member, separated by '/'
+        backup_info (dict): Content of backup_info.json
+        reg_file (str): Name of the registry file in the backup
+
+    Returns:
+        str: Name of the component, None for other members
+    """
+    if name == reg_file:
+        return "registry"
+
+    if name in (backup_info["creature_mind"],
+                backup_info["creature_physique"]):
+        return "creature"
+
+    if name.startswith(backup_info["backup_profile"] + "/"):
+        return "profile"
+
+    return None
+
+
+def is_safe_name(parts):
+    """
+    Params:
+        parts (list): Components of a member name
+
+    Returns:
+        bool: True if every component is a plain file or directory name
+    """
+    return bool(parts) and not any(
+        part in ("", ".", "..") or os.path.isabs(part) or
+        os.sep in part or (os.altsep is not None and os.altsep in part) or
+        ":" in part for part in parts)
+
+
+class ExtractDirect():
+    """
+    Class to extract a backup to its final locations
+    """
+
+    def __init__(self):
+        self.__backup_file = None
+        self.__backup_info = None
+        self.__profile_dir = None
+        self.__mind_dir = None
+        self.__reg_file = None
+        self.__info_file = None
+        self.__components = COMPONENTS
+        self.__differential = False
+        self.__expected = None
+        self.__restored = None
+        self.__reg_data = None
+        self.__staged = None
+        self.__written = None
+        self.__skipped = None
+        self.__deleted = None
+
+    def check_backup(self):
+        """
+        Attempts to read the selected members of the backup without
+        writing them, nothing in the game directory is changed.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            checksums = self.__known_checksums()
+            self.__expected = \
+                self.__expected_files() if self.__differential else {}
+            found = set()
+
+            for members in self.__member_sources():
+                for name, blocks in members:
+                    if not self.__is_selected(name):
+                        continue
+
+                    found.add(name)
+                    if name != self.__reg_file:
+                        target_path = self.__target_path(name)
+
+                        # Files that already match are left alone by a
+                        # differential restore and are not decompressed
+                        if self.__differential and \
+                                self.__is_identical(name, target_path):
+                            continue
+
+                    # Reading to the end checks the CRC32 of zip members
+                    # and the hash of repository chunks
+                    digest, _ = hash_blocks(blocks)
+                    if name in checksums and checksums[name] != digest:
+                        raise ValueError(f"Checksum mismatch: {name}")
+
+            self.__check_complete(found)
+
+            result["success"] = True
+
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile,
+                tarfile.TarError, zlib.error) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def extract_direct(self):
+        """
+        Attempts to extract the backup.
+
+        If successful, the content of the registry file will be stored
+        in 'self.__reg_data', the number of bytes written and skipped in
+        'self.__written' and 'self.__skipped' and the number of deleted
+        files in 'self.__deleted'.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            self.__reg_data = None
+            self.__written = 0
+            self.__skipped = 0
+            self.__deleted = 0
+            self.__restored = set()
+            self.__staged = []
+            self.__expected = \
+                self.__expected_files() if self.__differential else {}
+
+            found = set()
+            for members in self.__member_sources():
+                for name, blocks in members:
+                    if self.__is_selected(name):
+                        found.add(name)
+                        self.__extract_member(name, blocks)
+
+            self.__check_complete(found)
+
+            # The whole backup has been read, the files are moved
+            # to their final names
+            while self.__staged:
+                temp_path, target_path = self.__staged.pop()
+                os.replace(temp_path, target_path)
+
+            if self.__differential and "profile" in self.__components:
+                self.__delete_extraneous()
+
+            result["success"] = True
+
+        except (OSError, KeyError, ValueError, EOFError, zipfile.BadZipFile,
+                tarfile.TarError, zlib.error) as e:
+            result["message"] = str(f"Excpetion: {e}")
+            self.__discard_staged()
+
+        return result
+
+    def __check_complete(self, found):
+        """
+        Raises an error if a selected member was not in the backup.
+
+        Params:
+            found (set): Names of the selected members that were read
+        """
+        if self.__reg_file not in found and "registry" in self.__components:
+            raise KeyError(self.__reg_file)
+
+        # Every file the backup records has to be in one of its archives
+        missing = {
+            name for name in self.__known_checksums()
+            if self.__is_selected(name)
+        } - found
+        if missing:
+            raise ValueError(
+                f"Missing from the backup: {', '.join(sorted(missing))}")
+
+    def __discard_staged(self):
+        """
+        Deletes the temporary files of members not moved into place.
+        """
+        for temp_path, _ in self.__staged:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+        self.__staged = []
+
+    def __known_checksums(self):
+        """
+        Returns:
+            dict: Hash per member name recorded in backup_info.json
+        """
+        checksums = {}
+
+        if self.__backup_info.get("checksum_algorithm") == \
+                CHECKSUM_ALGORITHM:
+            checksums.update(self.__backup_info["checksums"])
+
+        for name, entry in self.__backup_info.get("files", {}).items():
+            checksums[name] = entry["hash"]
+
+        return checksums
+
+    def __member_sources(self):
+        """
+        Lists the archives to stream members from.
+
+        Returns:
+            list: Iterators over member names and their content
+        """
+        if detect_container(self.__backup_file) == "manifest":
+            return [iter_manifest_members(self.__backup_file)]
+
+        sources = [iter_members(self.__backup_file)]
+
+        # Unchanged files of an incremental backup are in its parents
+        own_archive = os.path.basename(self.__backup_file)
+        needed = {}
+        for name, entry in self.__backup_info.get("files", {}).items():
+            if entry["archive"] != own_archive and self.__is_selected(name):
+                needed.setdefault(entry["archive"], []).append(name)
+
+        backup_dir = os.path.dirname(os.path.abspath(self.__backup_file))
+        chain = self.__backup_chain(backup_dir) if needed else set()
+        for archive, names in needed.items():
+            if archive not in chain:
+                raise ValueError(f"{archive} is not part of the backup chain")
+            sources.append(
+                iter_members(os.path.join(backup_dir, archive), names))
+
+        return sources
+
+    def __backup_chain(self, backup_dir):
+        """
+        Follows the parent references back to the full backup.
+
+        Returns:
+            set: File names of the archives of the chain
+        """
+        chain = {os.path.basename(self.__backup_file)}
+        parent = self.__backup_info.get("parent")
+        while parent is not None:
+            if parent in chain:
+                raise ValueError(f"Backup chain loops at {parent}")
+            chain.add(parent)
+            parent = json.loads(read_member(
+                os.path.join(backup_dir, parent), self.__info_file
+            )).get("parent")
+
+        return chain
+
+    def __expected_files(self):
+        """
+        Collects what is known about the content of the members
+        without reading them.
+
+        Returns:
+            dict: Size, CRC32 and hash per member name, where known
+        """
+        expected = {
+            name: {"hash": digest}
+            for name, digest in self.__known_checksums().items()
+        }
+
+        for name, entry in self.__backup_info.get("files", {}).items():
+            expected[name]["size"] = entry["size"]
+
+        for name, (size, crc) in member_crcs(self.__backup_file).items():
+            expected.setdefault(name, {}).update({"size": size, "crc": crc})
+
+        return expected
+
+    def __is_identical(self, name, target_path):
+        """
+        Compares a file in the game directory with the member
+        it would be restored from.
+
+        Returns:
+            bool: True if the file already has the member's content
+        """
+        expected = self.__expected.get(name)
+        if not expected or not os.path.isfile(target_path):
+            return False
+
+        if "size" in expected and \
+                os.path.getsize(target_path) != expected["size"]:
+            return False
+
+        # The CRC32 is cheaper to compute than the hash
+        if "crc" in expected:
+            return crc_file(target_path) == expected["crc"]
+        if "hash" in expected:
+            return hash_file(target_path) == expected["hash"]
+
+        return False
+
+    def __delete_extraneous(self):
+        """
+        Deletes the files of the profile directory that are not
+        part of the backup and the directories left empty.
+        """
+        profile = self.__backup_info["backup_profile"]
+        for root, dirs, files in os.walk(self.__profile_dir, topdown=False):
+            for file in files:
+                file_path = os.path.join(root, file)
+                name = "/".join([profile] + os.path.relpath(
+                    file_path, self.__profile_dir).split(os.sep))
+                if name not in self.__restored:
+                    os.remove(file_path)
+                    self.__deleted += 1
+
+            for directory in dirs:
+                dir_path = os.path.join(root, directory)
+                if not os.listdir(dir_path):
+                    os.rmdir(dir_path)
+
+    def __is_selected(self, name):
+        """
+        Returns:
+            bool: True if the member belongs to a selected component
+        """
+        return member_component(
+            name, self.__backup_info, self.__reg_file) in self.__components
+
+    def __target_path(self, name):
+        """
+        Params:
+            name (str): Name of the member, separated by '/'
+
+        Returns:
+            str: Final location of the member
+        """
+        # Members must not leave the profile or creature directory,
+        # creature files are a single plain file name
+        if member_component(
+                name, self.__backup_info, self.__reg_file) == "creature":
+            target_dir = self.__mind_dir
+            parts = [name]
+        else:
+            target_dir = self.__profile_dir
+            parts = name.split("/")[1:]
+
+        if not is_safe_name(parts):
+            raise ValueError(f"Unsafe member path: {name}")
+
+        return os.path.join(target_dir, *parts)
+
+    def __extract_member(self, name, blocks):
+        """
+        Writes a selected member to its final location, keeps the
+        registry file in memory.
+        """
+        if name == self.__reg_file:
+            self.__reg_data = b"".join(blocks)
+            return
+
+        target_path = self.__target_path(name)
+        self.__restored.add(name)
+
+        # Files that already match are left alone
+        if self.__differential and self.__is_identical(name, target_path):
+            self.__skipped += os.path.getsize(target_path)
+            return
+
+        # Written under a temporary name until the backup is read
+        target_dir, target_name = os.path.split(target_path)
+        os.makedirs(target_dir, exist_ok=True)
+        temp_path = os.path.join(
+            target_dir, f".{target_name}.{uuid.uuid4().hex}.part")
+        self.__staged.append((temp_path, target_path))
+        with open(temp_path, "xb") as target:
+            for block in blocks:
+                target.write(block)
+                self.__written += len(block)
+
+    def get_reg_data(self):
+        """
+        Getter
+
+        Returns:
+            bytes: Content of the registry file
+        """
+        return self.__reg_data
+
+    def get_written(self):
+        """
+        Getter
+
+        Returns:
+            int: Bytes written to the game directory
+        """
+        return self.__written
+
+    def get_skipped(self):
+        """
+        Getter
+
+        Returns:
+            int: Bytes of identical files that were not rewritten
+        """
+        return self.__skipped
+
+    def get_deleted(self):
+        """
+        Getter
+
+        Returns:
+            int: Number of files deleted from the profile directory
+        """
+        return self.__deleted
+
+    def set_data(self, backup_file, backup_info, game_dir, profile_dir,
+                 mind_files, reg_file, info_file):
+        """
+        Setter
+
+        Params:
+            backup_file (str): Backup archive or repository manifest
+            backup_info (dict): Content of backup_info.json
+            game_dir (str): Game directory to restore into
+            profile_dir (str): Profile directory inside the game directory
+            mind_files (str): Creature directory inside the game directory
+            reg_file (str): Name of the registry file in the backup
+            info_file (str): Name of the backup information file
+        """
+        self.__backup_file = backup_file
+        self.__backup_info = backup_info
+        self.__profile_dir = os.path.join(
+            game_dir, profile_dir, backup_info["backup_profile"])
+        self.__mind_dir = os.path.join(game_dir, mind_files)
+        self.__reg_file = reg_file
+        self.__info_file = info_file
+
+    def set_components(self, components):
+        """
+        Setter
+
+        Params:
+            components (tuple): Components to restore, see COMPONENTS
+        """
+        self.__components = components
+
+    def set_differential(self, differential):
+        """
+        Setter
+
+        Params:
+            differential (bool): Only rewrite files that differ from
+                                 the backup and delete extraneous ones
+        """
+        self.__differential = differential
@@ -0,0 +1,338 @@
+"""
+Writes a standard Zip archive whose members are deflated in parallel
+
+Every member is split into blocks that are compressed concurrently in a
+thread pool (zlib releases the GIL while compressing). Each block is
+primed with the last 32 KiB of the previous block and flushed to a byte
+boundary, so the concatenated blocks form one ordinary deflate stream.
+The blocks are written in order, followed by the central directory.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import collections
+import io
+import os
+import struct
+import time
+import zipfile
+import zlib
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from modules.misc.file_checksum import HashingReader
+
+
+# Size of the blocks compressed by a single worker
+BLOCK_SIZE = 1024 * 1024
+
+# Deflate window, used as dictionary for the following block
+WINDOW_SIZE = 32 * 1024
+
+# Members and offsets must stay below the limits of the
+# classic (non Zip64) format
+ZIP_LIMIT = 0xFFFFFFFF
+ZIP_MAX_MEMBERS = 0xFFFF
+
+# Zip record layouts
+LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+CENTRAL_HEADER = struct.Struct("<4s4B4HL2L5H2L")
+END_RECORD = struct.Struct("<4s4H2LH")
+
+ZIP_VERSION = 20
+CREATE_SYSTEM = 0 if os.name == "nt" else 3
+FLAG_UTF8 = 0x800
+
+
+def fits_classic_zip(file_paths):
+    """
+    Checks whether the files fit into a Zip archive without Zip64.
+
+    Params:
+        file_paths (list): Paths of the files to be archived
+
+    Returns:
+        bool: True if the parallel writer can archive the files
+    """
+    if len(file_paths) >= ZIP_MAX_MEMBERS:
+        return False
+
+    # Deflate adds at most a few bytes per block, headers are small
+    total = sum(os.path.getsize(path) + 1024 for path in file_paths)
+    return total < ZIP_LIMIT // 2
+
+
+def compress_block(data, level, zdict, last):
+    """
+    Compresses one block into a raw deflate fragment.
+
+    Params:
+        data (bytes): Uncompressed block
+        level (int): zlib compression level
+        zdict (bytes): Preceding 32 KiB of the member, may be empty
+        last (bool): Whether this block ends the member
+
+    Returns:
+        bytes: Deflate data, byte aligned
+    """
+    if zdict:
+        compressor = zlib.compressobj(
+            level, zlib.DEFLATED, -zlib.MAX_WBITS, zdict=zdict)
+    else:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+
+    flush_mode = zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH
+    return compressor.compress(data) + compressor.flush(flush_mode)
+
+
+class ParallelZipWriter():
+    """
+    Class to write a Zip archive with parallel deflate compression
+    """
+
+    def __init__(self, zip_file, workers, block_size=BLOCK_SIZE):
+        self.__zip_file = zip_file
+        self.__workers = workers
+        self.__block_size = block_size
+        self.__fp = None
+        self.__pool = None
+        self.__pending = collections.deque()
+        self.__members = []
+
+    def __enter__(self):
+        self.__fp = open(self.__zip_file, "wb")
+        self.__pool = ThreadPoolExecutor(max_workers=self.__workers)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self.close()
+        finally:
+            self.__pool.shutdown(wait=True, cancel_futures=True)
+            self.__fp.close()
+
+    def write(self, filename, arcname, compress_type=zipfile.ZIP_DEFLATED,
+              compresslevel=None):
+        """
+        Adds a file to the archive, like zipfile.ZipFile.write.
+
+        The blocks are queued for compression, at most two blocks per
+        worker are held in memory at any time.
+
+        Params:
+            filename (str): File to be archived
+            arcname (str): Name inside the archive
+            compress_type (int): zipfile.ZIP_DEFLATED or zipfile.ZIP_STORED
+            compresslevel (int): zlib compression level
+
+        Returns:
+            str: BLAKE2b hash of the bytes stored
+        """
+        stat = os.stat(filename)
+        member = self.__new_member(
+            arcname, compress_type, time.localtime(stat.st_mtime)[:6],
+            (stat.st_mode & 0xFFFF) << 16)
+
+        with open(filename, "rb") as src:
+            reader = HashingReader(src)
+            self.__write_stream(reader, member, compresslevel)
+
+        return reader.hexdigest()
+
+    def writestr(self, arcname, data, compress_type=zipfile.ZIP_DEFLATED,
+                 compresslevel=None):
+        """
+        Adds in-memory data to the archive, like zipfile.ZipFile.writestr.
+
+        Params:
+            arcname (str): Name inside the archive
+            data (bytes|str): Content of the member
+            compress_type (int): zipfile.ZIP_DEFLATED or zipfile.ZIP_STORED
+            compresslevel (int): zlib compression level
+        """
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+
+        member = self.__new_member(
+            arcname, compress_type, time.localtime()[:6], 0o600 << 16)
+        self.__write_stream(io.BytesIO(data), member, compresslevel)
+
+    def getinfo(self, name):
+        """
+        Getter
+
+        Waits until all queued blocks are written.
+
+        Returns:
+            zipfile.ZipInfo: Sizes and CRC of the member
+        """
+        while self.__pending:
+            self.__write_next()
+
+        for member in self.__members:
+            if member["name"] == name.replace(os.sep, "/"):
+                info = zipfile.ZipInfo(member["name"], member["date_time"])
+                info.compress_type = member["method"]
+                info.CRC = member["crc"]
+                info.file_size = member["file_size"]
+                info.compress_size = member["compress_size"]
+                return info
+
+        raise KeyError(name)
+
+    def __new_member(self, arcname, compress_type, date_time, external_attr):
+        """
+        Returns:
+            dict: Header values of a new member
+        """
+        return {
+            "name": arcname.replace(os.sep, "/"),
+            "method": compress_type,
+            "date_time": date_time,
+            "external_attr": external_attr,
+            "crc": 0,
+            "file_size": 0,
+            "compress_size": 0,
+            "offset": None
+        }
+
+    def __write_stream(self, src, member, level):
+        """
+        Reads a member block by block and queues the blocks.
+        """
+        if level is None:
+            level = zlib.Z_DEFAULT_COMPRESSION
+
+        zdict = b""
+        data = src.read(self.__block_size)
+        while True:
+            next_data = src.read(self.__block_size)
+            last = not next_data
+
+            member["crc"] = zlib.crc32(data, member["crc"])
+            member["file_size"] += len(data)
+
+            # Stored blocks are written as they are
+            if member["method"] == zipfile.ZIP_STORED:
+                future = Future()
+                future.set_result(data)
+            else:
+                future = self.__pool.submit(
+                    compress_block, data, level, zdict, last)
+            self.__queue(member, future, last)
+
+            if last:
+                break
+            zdict = data[-WINDOW_SIZE:]
+            data = next_data
+
+    def close(self):
+        """
+        Writes the outstanding blocks and the central directory.
+        """
+        while self.__pending:
+            self.__write_next()
+
+        start_dir = self.__fp.tell()
+        for member in self.__members:
+            name, flags = self.__encode_name(member["name"])
+            self.__fp.write(CENTRAL_HEADER.pack(
+                b"PK\x01\x02",
+                ZIP_VERSION, CREATE_SYSTEM, ZIP_VERSION, 0,
+                flags, member["method"],
+                *self.__dos_time(member["date_time"]),
+                member["crc"], member["compress_size"], member["file_size"],
+                len(name), 0, 0, 0, 0,
+                member["external_attr"], member["offset"]
+            ))
+            self.__fp.write(name)
+
+        size_dir = self.__fp.tell() - start_dir
+        self.__fp.write(END_RECORD.pack(
+            b"PK\x05\x06", 0, 0,
+            len(self.__members), len(self.__members),
+            size_dir, start_dir, 0
+        ))
+
+    def __queue(self, member, future, last):
+        """
+        Queues a compression job, writes finished blocks once the
+        number of blocks in flight exceeds the limit.
+        """
+        self.__pending.append((member, future, last))
+        while len(self.__pending) > 2 * self.__workers:
+            self.__write_next()
+
+    def __write_next(self):
+        """
+        Writes the oldest queued block, including the local header
+        before the first and its final values after the last block.
+        """
+        member, future, last = self.__pending.popleft()
+
+        if member["offset"] is None:
+            member["offset"] = self.__fp.tell()
+            self.__fp.write(self.__local_header(member))
+
+        data = future.result()
+        self.__fp.write(data)
+        member["compress_size"] += len(data)
+
+        if last:
+            end = self.__fp.tell()
+            self.__fp.seek(member["offset"])
+            self.__fp.write(self.__local_header(member))
+            self.__fp.seek(end)
+            self.__members.append(member)
+
+    def __local_header(self, member):
+        """
+        Returns:
+            bytes: Local file header including the file name
+        """
+        name, flags = self.__encode_name(member["name"])
+        return LOCAL_HEADER.pack(
+            b"PK\x03\x04", ZIP_VERSION, 0,
+            flags, member["method"], *self.__dos_time(member["date_time"]),
+            member["crc"], member["compress_size"], member["file_size"],
+            len(name), 0
+        ) + name
+
+    @staticmethod
+    def __encode_name(name):
+        """
+        Returns:
+            tuple: Encoded name and the general purpose flags
+        """
+        try:
+            return name.encode("ascii"), 0
+        except UnicodeEncodeError:
+            return name.encode("utf-8"), FLAG_UTF8
+
+    @staticmethod
+    def __dos_time(date_time):
+        """
+        Returns:
+            tuple: MS-DOS time and date, clamped to 1980 as zipfile does
+        """
+        year, month, day, hour, minute, second = date_time
+        if year < 1980:
+            year, month, day, hour, minute, second = 1980, 1, 1, 0, 0, 0
+        return (
+            hour << 11 | minute << 5 | second // 2,
+            (year - 1980) << 9 | month << 5 | day
+        )
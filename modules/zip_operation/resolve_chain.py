@@ -0,0 +1,122 @@
+"""
+Resolves the chain of an incremental backup
+
+An incremental archive only contains the files that changed since its
+parent. Its manifest names the archive holding each file, so the
+remaining files are extracted from the archives along the parent chain
+back to the full backup.
+"""
+
+# This file is part of Black & White Savegame Backup.
+#
+# Black & White Savegame Backup is free software: you can redistribute it
+# and/or modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of the License,
+# or (at your option) any later version.
+#
+# Black & White Savegame Backup is distributed in the hope that it will be
+# useful, but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE. See the  GNU General
+# Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with Black & White Savegame Backup.
+# If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+from modules.zip_operation.archive_codecs import extract_members
+from modules.zip_operation.archive_codecs import read_member
+
+
+class ResolveChain():
+    """
+    Class to complete an extracted incremental backup from its parents
+    """
+
+    def __init__(self):
+        self.__backup_file = None
+        self.__temp_dir = None
+        self.__backup_info = None
+        self.__selected = None
+
+    def resolve_chain(self):
+        """
+        Attempts to extract the files held by parent archives.
+
+        Returns a dictionary with 'success" true/false and a message on error.
+        """
+        result = {
+            "success": False,
+            "message": None
+        }
+
+        try:
+            with open(os.path.join(self.__temp_dir, self.__backup_info),
+                      encoding="UTF-8") as json_file:
+                backup_info = json.load(json_file)
+
+            # Full backups without manifest are complete
+            if "files" not in backup_info:
+                result["success"] = True
+                return result
+
+            backup_dir = os.path.dirname(os.path.abspath(self.__backup_file))
+
+            # Follows the parent references back to the full backup
+            chain = {os.path.basename(self.__backup_file)}
+            parent = backup_info.get("parent")
+            while parent is not None:
+                if parent in chain:
+                    raise ValueError(f"Backup chain loops at {parent}")
+                chain.add(parent)
+                parent = json.loads(read_member(
+                    os.path.join(backup_dir, parent), self.__backup_info
+                )).get("parent")
+
+            # Groups the files by the archive holding them
+            needed = {}
+            for name, entry in backup_info["files"].items():
+                if entry["archive"] == os.path.basename(self.__backup_file):
+                    continue
+                if self.__selected is not None and \
+                        not self.__selected(name):
+                    continue
+                if entry["archive"] not in chain:
+                    raise ValueError(
+                        f"{entry['archive']} is not part of the backup chain")
+                needed.setdefault(entry["archive"], []).append(name)
+
+            for archive, names in needed.items():
+                extract_members(
+                    os.path.join(backup_dir, archive), names, self.__temp_dir)
+
+            result["success"] = True
+
+        except (FileNotFoundError, KeyError, ValueError) as e:
+            result["message"] = str(f"Excpetion: {e}")
+
+        return result
+
+    def set_data(self, backup_file, temp_dir, backup_info):
+        """
+        Setter
+
+        Params:
+            backup_file (str): Incremental backup archive
+            temp_dir (str): Directory the archive was extracted to
+            backup_info (str): Name of the backup information file
+        """
+        self.__backup_file = backup_file
+        self.__temp_dir = temp_dir
+        self.__backup_info = backup_info
+
+    def set_filter(self, selected):
+        """
+        Setter
+
+        Params:
+            selected (function): Returns True for the file names to
+                                 extract, None to extract everything
+        """
+        self.__selected = selected
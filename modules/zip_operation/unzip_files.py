@@ -1,5 +1,12 @@
 """
 Unzip the zip backup archive
+
+The format of the archive (zip or compressed tar) is
+detected from its magic bytes. Manifests of the chunk
+repository are reassembled by RestoreRepository.
+
+Files of an incremental backup that are held by its
+parent archives are extracted by ResolveChain.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,7 +25,12 @@ Unzip the zip backup archive
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import tarfile
 import zipfile
+from modules.repository_operation.restore_repository \
+    import RestoreRepository
+from modules.zip_operation.archive_codecs import detect_container
+from modules.zip_operation.resolve_chain import ResolveChain
 
 
 class UnzipBackup():
@@ -29,6 +41,8 @@ class UnzipBackup():
     def __init__(self):
         self.__backup_file = None
         self.__temp_dir = None
+        self.__backup_info = None
+        self.__selected = None
 
     def unzip_backup(self):
         """
@@ -42,24 +56,89 @@ class UnzipBackup():
         }
 
         try:
-            # Unpack the zip archive
-            with zipfile.ZipFile(self.__backup_file, "r") as zipf:
-                zipf.extractall(self.__temp_dir)
+            container = detect_container(self.__backup_file)
+
+            # Unpack the zip archive, the central directory
+            # locates the selected members
+            if container == "zip":
+                with zipfile.ZipFile(self.__backup_file, "r") as zipf:
+                    zipf.extractall(self.__temp_dir, self.__members(
+                        zipf.namelist()))
+
+            # Unpack the tar archive, rejecting unsafe member paths
+            elif container == "tar":
+                with tarfile.open(self.__backup_file, "r:*") as tarf:
+                    wanted = set(self.__members(tarf.getnames()))
+                    members = [
+                        info for info in tarf.getmembers()
+                        if info.name in wanted
+                    ]
+                    if hasattr(tarfile, "data_filter"):
+                        tarf.extractall(
+                            self.__temp_dir, members, filter="data")
+                    else:
+                        tarf.extractall(self.__temp_dir, members)
+
+            # Reassemble the files from the chunk repository
+            elif container == "manifest":
+                restore_repository = RestoreRepository()
+                restore_repository.set_data(
+                    self.__backup_file, self.__temp_dir, self.__backup_info)
+                restore_repository.set_filter(self.__selected)
+                return restore_repository.restore_backup()
 
-            result["success"] = True
+            else:
+                result["message"] = "Unknown archive format"
+                return result
 
-        except FileNotFoundError as e:
+            # Completes incremental backups from their parents
+            resolve_chain = ResolveChain()
+            resolve_chain.set_data(
+                self.__backup_file, self.__temp_dir, self.__backup_info)
+            resolve_chain.set_filter(self.__selected)
+            return resolve_chain.resolve_chain()
+
+        except (FileNotFoundError, zipfile.BadZipFile, tarfile.TarError) as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
 
-    def set_data(self, backup_file, temp_dir):
+    def __members(self, names):
+        """
+        Params:
+            names (list): Names of all members of the archive
+
+        Returns:
+            list: Names of the members to extract, always
+                  including the backup information
+        """
+        if self.__selected is None:
+            return names
+
+        return [
+            name for name in names
+            if name == self.__backup_info or self.__selected(name)
+        ]
+
+    def set_data(self, backup_file, temp_dir, backup_info):
         """
         Setter
 
         Params:
             backup_file (str): Backup zip file
             temp_dir (str): Temporary directory path
+            backup_info (str): Name of the backup information file
         """
         self.__backup_file = backup_file
         self.__temp_dir = temp_dir
+        self.__backup_info = backup_info
+
+    def set_filter(self, selected):
+        """
+        Setter
+
+        Params:
+            selected (function): Returns True for the member names to
+                                 extract, None to extract everything
+        """
+        self.__selected = selected
@@ -1,5 +1,9 @@
 """
 Creates a Zip archive of the data
+
+By default the contents of the temporary directory are archived. If
+sources are set, the files are instead written as zip members straight
+from their original locations, without staging a copy first.
 """
 
 # This file is part of Black & White Savegame Backup.
@@ -18,8 +22,18 @@ Creates a Zip archive of the data
 # along with Black & White Savegame Backup.
 # If not, see <http://www.gnu.org/licenses/>.
 
+import json
 import os
+import uuid
 import zipfile
+from modules.misc.file_checksum import add_checksums
+from modules.misc.file_checksum import collect_files
+from modules.zip_operation.archive_codecs import HashingZipFile
+from modules.zip_operation.archive_codecs import TarWriter
+from modules.zip_operation.archive_codecs import get_codec
+from modules.zip_operation.compression_policy import CompressionPolicy
+from modules.zip_operation.parallel_zip import ParallelZipWriter
+from modules.zip_operation.parallel_zip import fits_classic_zip
 
 
 class ZipBackup():
@@ -32,6 +46,13 @@ class ZipBackup():
         self.__backup_profile = None
         self.__desktop_dir = None
         self.__temp_dir = None
+        self.__sources = None
+        self.__archive_name = None
+        self.__codec = "zip-deflate"
+        self.__workers = 1
+        self.__use_policy = False
+        self.__backup_info = None
+        self.__overwrite = None
         self.__backup_file = None
 
     def zip_backup(self):
@@ -52,18 +73,27 @@ class ZipBackup():
             do_zip = True
 
             # Path to the created zip file
-            zip_file = \
-                self.__desktop_dir + "\\" + self.__backup_profile + ".zip"
+            zip_file = os.path.join(
+                self.__desktop_dir,
+                (self.__archive_name or self.__backup_profile) +
+                get_codec(self.__codec)["extension"]
+                )
 
-            # Check if the zip file already exists
-            if os.path.exists(zip_file):
+            # Check if the zip file already exists, ask
+            # the user unless the decision was made beforehand
+            if os.path.exists(zip_file) and self.__overwrite is not None:
+                if self.__overwrite:
+                    print(self.__backup_exists[1])
+                else:
+                    do_zip = False
+                    result["message"] = self.__backup_exists[2]
+            elif os.path.exists(zip_file):
                 while True:
                     # If file already exists let user decide
                     user_query = input(self.__backup_exists[0])
                     # if 'y' overwrite
                     if user_query == "y":
                         print(self.__backup_exists[1])
-                        os.remove(zip_file)
                         break
                     # if 'n' abort
                     elif user_query == "n":
@@ -74,27 +104,114 @@ class ZipBackup():
                     else:
                         print(self.__backup_exists[3])
 
-            # If do_zip is True, create the zip file
+            # If do_zip is True, create the zip file under a temporary
+            # name, an existing backup is only replaced once the new
+            # one is complete
             if do_zip:
-                with zipfile.ZipFile(
-                        (zip_file), "w", zipfile.ZIP_DEFLATED) as zipf:
-                    for root, _, files in os.walk(self.__temp_dir):
-                        for file in files:
-                            file_path = os.path.join(root, file)
-                            zipf.write(file_path, os.path.relpath(
-                                file_path, self.__temp_dir)
-                            )
+                temp_file = os.path.join(
+                    self.__desktop_dir,
+                    f".{os.path.basename(zip_file)}.{uuid.uuid4().hex}.tmp"
+                    )
+                try:
+                    self.__write_archive(temp_file, self.__collect_members())
+                    os.replace(temp_file, zip_file)
+                finally:
+                    if os.path.exists(temp_file):
+                        os.remove(temp_file)
 
                 # Set the path to the created backup file
                 self.__backup_file = zip_file
 
                 result["success"] = True
 
-        except FileNotFoundError as e:
+        except (FileNotFoundError, ValueError) as e:
             result["message"] = str(f"Excpetion: {e}")
 
         return result
 
+    def __write_archive(self, zip_file, members):
+        """
+        Compresses the members into the zip file.
+
+        Params:
+            zip_file (str): Path of the zip file to be created
+            members (list): Tuples of file path and archive name
+        """
+        codec = get_codec(self.__codec)
+        use_policy = self.__use_policy and self.__codec == "zip-deflate"
+
+        # The backup information is held back to record the checksums
+        # and compression of the members written before it
+        info_member = None
+        for member in members:
+            if member[1] == self.__backup_info:
+                info_member = member
+        if info_member is not None:
+            members.remove(info_member)
+
+        # Tar container, parallel deflate as long as no Zip64
+        # is needed, otherwise zipfile with the codec's compression
+        if codec["container"] == "tar":
+            zipf = TarWriter(zip_file, codec["compression"])
+        elif self.__codec == "zip-deflate" and self.__workers > 1 and \
+                fits_classic_zip([file_path for file_path, _ in members]):
+            zipf = ParallelZipWriter(zip_file, self.__workers)
+        else:
+            zipf = HashingZipFile(zip_file, "w", codec["compression"])
+
+        with zipf:
+            methods = {}
+            checksums = {}
+            for file_path, arcname in members:
+                compress_type, level = codec["compression"], None
+                if use_policy:
+                    policy = CompressionPolicy()
+                    policy.choose(file_path)
+                    compress_type, level = policy.get_compression()
+                    methods[arcname] = policy.get_method()
+
+                # Each member is hashed while it is compressed
+                checksums[arcname.replace(os.sep, "/")] = zipf.write(
+                    file_path, arcname, compress_type, level)
+
+            if info_member is not None:
+                with open(info_member[0], encoding="UTF-8") as json_file:
+                    backup_info = json.load(json_file)
+                add_checksums(backup_info, checksums)
+
+                # Adds the decision and achieved ratio of every member
+                if use_policy:
+                    compression = {}
+                    for arcname, method in methods.items():
+                        info = zipf.getinfo(arcname.replace(os.sep, "/"))
+                        compression[arcname.replace(os.sep, "/")] = {
+                            "method": method,
+                            "ratio": round(
+                                info.compress_size / info.file_size, 3
+                            ) if info.file_size else 1.0
+                        }
+                    backup_info["compression"] = compression
+
+                # The catalog reads the completed file
+                with open(info_member[0], "w", encoding="UTF-8") \
+                        as json_file:
+                    json.dump(backup_info, json_file)
+                zipf.writestr(info_member[1], json.dumps(backup_info))
+
+    def __collect_members(self):
+        """
+        Lists the files to be archived. Without sources, the temporary
+        directory is archived as a whole.
+
+        Returns:
+            list: Tuples of file path and archive name
+        """
+        sources = self.__sources
+        if sources is None:
+            sources = [(self.__temp_dir, "")]
+
+        return collect_files(sources)
+
     def get_backup_file(self):
         """
         Getter
@@ -118,3 +235,71 @@ class ZipBackup():
         self.__backup_profile = backup_profile
         self.__desktop_dir = desktop_dir
         self.__temp_dir = temp_dir
+
+    def set_sources(self, sources):
+        """
+        Setter
+
+        Params:
+            sources (list): Tuples of source path (file or directory)
+                            and name inside the archive
+        """
+        self.__sources = sources
+
+    def set_workers(self, workers):
+        """
+        Setter
+
+        Params:
+            workers (int): Number of compression threads,
+                           0 uses one thread per CPU core
+        """
+        self.__workers = workers or os.cpu_count() or 1
+
+    def set_archive_name(self, archive_name):
+        """
+        Setter
+
+        Params:
+            archive_name (str): File name of the archive without extension,
+                                defaults to the profile name
+        """
+        self.__archive_name = archive_name
+
+    def set_codec(self, codec):
+        """
+        Setter
+
+        Params:
+            codec (str): Name of the codec in the codec registry
+        """
+        self.__codec = codec
+
+    def set_overwrite(self, overwrite):
+        """
+        Setter
+
+        Params:
+            overwrite (bool): Replace an existing archive (True), keep it
+                              (False) or ask the user (None, default)
+        """
+        self.__overwrite = overwrite
+
+    def set_policy(self, use_policy):
+        """
+        Setter
+
+        Params:
+            use_policy (bool): Choose the compression per member
+        """
+        self.__use_policy = use_policy
+
+    def set_backup_info(self, backup_info):
+        """
+        Setter
+
+        Params:
+            backup_info (str): Name of the backup information file,
+                               written last with the checksums
+        """
+        self.__backup_info = backup_info